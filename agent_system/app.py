@@ -8,7 +8,10 @@ for AI-powered sports quest generation with ESPN API integration.
 import uvicorn
 import os
 import sys
+import math
 import asyncio
+import inspect
+import importlib.util
 from pathlib import Path
 from dotenv import load_dotenv
 from loguru import logger
@@ -79,10 +82,98 @@ async def initialize_database():
         # Don't exit - let the app start even if DB init fails
         logger.warning("⚠️  Continuing without database initialization")
 
-def create_app():
-    """Create and configure the FastAPI application"""
-    from src.api.main import app
-    return app
+async def run_startup_tasks_once():
+    """
+    Startup work that must not run once per worker: sample data, schema and
+    inbox backfill. Runs in the launcher before the workers start; the
+    workers see STARTUP_TASKS_DONE=1 and skip it in their lifespan.
+    """
+    from src.api.main import run_startup_tasks
+    from src.models.database import engine
+
+    try:
+        await initialize_database()
+        await run_startup_tasks()
+    finally:
+        # Connections opened here belong to this event loop; workers open their own
+        await engine.dispose()
+    os.environ["STARTUP_TASKS_DONE"] = "1"
+
+
+def available_cpus() -> int:
+    """CPUs this process may use: affinity mask, capped by a cgroup v2 CPU quota (docker --cpus)"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        quota, period = Path("/sys/fs/cgroup/cpu.max").read_text().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+def worker_count(environment: str) -> int:
+    """WEB_CONCURRENCY if set, else one worker per available CPU in production (one for SERVICE_ROLE=worker)"""
+    from src.core.service_role import service_role
+
+    if service_role() == "worker":
+        # Background loops run once per process; more processes would only repeat them
+        return 1
+    configured = os.getenv("WEB_CONCURRENCY")
+    if configured:
+        return max(1, int(configured))
+    return available_cpus() if environment == "production" else 1
+
+
+def serve_uvicorn(host: str, port: int, workers: int):
+    """uvicorn's own supervisor: restarts workers that exit, including after MAX_REQUESTS"""
+    options = {
+        "host": host,
+        "port": port,
+        "workers": workers,
+        "loop": "auto",  # uvloop when installed
+        "http": "auto",  # httptools when installed
+        "limit_max_requests": int(os.getenv("MAX_REQUESTS", "10000")) or None,
+        "timeout_graceful_shutdown": int(os.getenv("GRACEFUL_TIMEOUT", "30")),
+        "timeout_keep_alive": int(os.getenv("KEEPALIVE_TIMEOUT", "5")),
+        "log_level": os.getenv("LOG_LEVEL", "info").lower(),
+        "access_log": True,
+    }
+    if "limit_max_requests_jitter" in inspect.signature(uvicorn.Config).parameters:
+        options["limit_max_requests_jitter"] = int(os.getenv("MAX_REQUESTS_JITTER", "1000"))
+    uvicorn.run("src.api.main:app", **options)
+
+
+def serve_gunicorn(host: str, port: int, workers: int):
+    """gunicorn master with uvicorn workers"""
+    from gunicorn.app.base import BaseApplication
+
+    options = {
+        "bind": f"{host}:{port}",
+        "workers": workers,
+        "worker_class": "uvicorn_worker.UvicornWorker" if importlib.util.find_spec("uvicorn_worker") else "uvicorn.workers.UvicornWorker",
+        "max_requests": int(os.getenv("MAX_REQUESTS", "10000")),
+        "max_requests_jitter": int(os.getenv("MAX_REQUESTS_JITTER", "1000")),
+        "graceful_timeout": int(os.getenv("GRACEFUL_TIMEOUT", "30")),
+        "timeout": int(os.getenv("WORKER_TIMEOUT", "120")),
+        "keepalive": int(os.getenv("KEEPALIVE_TIMEOUT", "5")),
+        "accesslog": "-",
+        "loglevel": os.getenv("LOG_LEVEL", "info").lower(),
+    }
+
+    class StandaloneApplication(BaseApplication):
+        def load_config(self):
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from src.api.main import app
+            return app
+
+    StandaloneApplication().run()
 
 def main():
     """Main application entry point"""
@@ -94,27 +185,27 @@ def main():
         # Validate environment
         validate_environment()
         
-        # Initialize database
-        asyncio.run(initialize_database())
-        
         # Get configuration
         host = os.getenv("API_HOST", "0.0.0.0")
         port = int(os.getenv("API_PORT", 8000))
         environment = os.getenv("ENVIRONMENT", "development")
         reload = environment == "development"
+        workers = 1 if reload else worker_count(environment)
+        server = os.getenv("SERVER", "uvicorn").lower()
         
         logger.info(f"🌐 Server configuration:")
         logger.info(f"   Host: {host}")
         logger.info(f"   Port: {port}")
         logger.info(f"   Environment: {environment}")
+        logger.info(f"   Role: {os.getenv('SERVICE_ROLE') or 'all'}")
         logger.info(f"   Reload: {reload}")
         
-        # Create FastAPI app
-        app = create_app()
-        
         # Start server
-        logger.info("🎯 Starting uvicorn server...")
         if reload:
+            # Initialize database (the app's lifespan does the rest in this single process)
+            asyncio.run(initialize_database())
+            
+            logger.info("🎯 Starting uvicorn server...")
             # Use import string for reload mode
             uvicorn.run(
                 "src.api.main:app",
@@ -125,15 +216,16 @@ def main():
                 access_log=True
             )
         else:
-            # Use app object for production
-            uvicorn.run(
-                app,
-                host=host,
-                port=port,
-                reload=reload,
-                log_level=os.getenv("LOG_LEVEL", "info").lower(),
-                access_log=True
-            )
+            # Once here, not in every worker
+            asyncio.run(run_startup_tasks_once())
+            
+            logger.info(f"   Server: {server}, {workers} workers")
+            logger.info(f"   Event loop: {'uvloop' if importlib.util.find_spec('uvloop') else 'asyncio'}, HTTP parser: {'httptools' if importlib.util.find_spec('httptools') else 'h11'}")
+            logger.info(f"🎯 Starting {server} server...")
+            if server == "gunicorn":
+                serve_gunicorn(host, port, workers)
+            else:
+                serve_uvicorn(host, port, workers)
         
     except KeyboardInterrupt:
         logger.info("👋 Shutting down gracefully...")
@@ -0,0 +1,7 @@
+"""
+Offline benchmark suite - Local ESPN and LLM stand-ins driving the real pipelines
+
+Run from agent_system/:
+    python -m benchmarks.run_benchmarks --scale smoke
+    python -m benchmarks.compare benchmarks/results/base.json benchmarks/results/head.json
+"""
@@ -0,0 +1,123 @@
+"""
+ESPN cassettes for offline load tests - Synthesize scaled scoreboards, inspect a cassette
+
+A synthesized cassette holds one scoreboard per league and one team document
+per team: the recorded scoreboards in benchmarks/fixtures are the templates,
+and every team pair from dataset.fixture_pairs() gets one fixture per
+matchday. Dates are relative to a fixed reference time, so the same arguments
+always produce the same responses; replay with time warp (the default) to make
+the fixtures upcoming. Benchmarks must use the same --teams as the cassette.
+
+    python -m benchmarks.cassette synthesize --teams 5000 --matchdays 4 --output benchmarks/cassettes/5k.jsonl.gz
+    python -m benchmarks.cassette info benchmarks/cassettes/5k.jsonl.gz
+    python -m benchmarks.run_benchmarks --teams 5000 --scenarios sync --espn-cassette benchmarks/cassettes/5k.jsonl.gz
+"""
+import argparse
+import json
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from src.services.espn_cassette import Cassette, ReplayTransport
+
+from .dataset import BenchTeam, build_teams, fixture_pairs
+from .fake_espn import _synthetic_event, _team_payload, load_recorded_scoreboards
+
+
+REFERENCE_TIME = datetime(2025, 1, 1, tzinfo=timezone.utc)
+CASSETTE_BASE_URL = "http://espn.cassette"
+
+
+def synthesize_cassette(
+    teams: List[BenchTeam],
+    matchdays: int = 1,
+    latency_ms: float = 0.0,
+    recorded_at: datetime = REFERENCE_TIME
+) -> Cassette:
+    """Scoreboards and team documents for a synthetic league setup"""
+    scoreboards = load_recorded_scoreboards(recorded_at)
+    recorded_teams = {}
+    for league_code, scoreboard in scoreboards.items():
+        for event in scoreboard.get("events", []):
+            for competitor in event["competitions"][0]["competitors"]:
+                recorded_teams[(league_code, str(competitor["team"]["id"]))] = competitor["team"]
+
+    for offset, (home, away) in enumerate(fixture_pairs(teams)):
+        scoreboard = scoreboards.setdefault(home.league_code, {"leagues": [{"slug": home.league_code}], "events": []})
+        for matchday in range(matchdays):
+            # Alternate home and away, one week apart
+            first, second = (home, away) if matchday % 2 == 0 else (away, home)
+            event = _synthetic_event(first, second, recorded_at + timedelta(days=2 + 7 * matchday, minutes=15 * offset))
+            event["id"] = event["competitions"][0]["id"] = f"{event['id']}{matchday:02d}"
+            scoreboard["events"].append(event)
+
+    cassette = Cassette(recorded_at=recorded_at)
+
+    def add(endpoint: str, payload):
+        cassette.add({
+            "method": "GET",
+            "endpoint": endpoint,
+            "status": 200,
+            "content_type": "application/json",
+            "body": json.dumps(payload, separators=(",", ":")),
+            "latency_ms": latency_ms,
+        })
+
+    for league_code, scoreboard in sorted(scoreboards.items()):
+        add(f"{league_code}/scoreboard", scoreboard)
+    for (league_code, team_id), team in sorted(recorded_teams.items()):
+        add(f"{league_code}/teams/{team_id}", {"team": team})
+    for team in teams:
+        add(f"{team.league_code}/teams/{team.espn_id}", {"team": _team_payload(team)})
+    return cassette
+
+
+class CassetteESPN:
+    """Stands in for FakeESPNServer: the ESPN service talks to a replay transport instead of a socket"""
+
+    def __init__(self, path: str, latency_scale: float = 0.0, warp_to: Optional[datetime] = None):
+        self.cassette = Cassette.load(path)
+        self.transport = ReplayTransport(
+            self.cassette, CASSETTE_BASE_URL,
+            warp_to=warp_to or datetime.now(timezone.utc), latency_scale=latency_scale
+        )
+
+    @property
+    def base_url(self) -> str:
+        return CASSETTE_BASE_URL
+
+    @property
+    def request_count(self) -> int:
+        return self.transport.request_count
+
+    async def __aenter__(self) -> "CassetteESPN":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        if self.transport.misses:
+            print(f"{self.transport.misses} requests were not in the cassette", flush=True)
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Synthesize or inspect ESPN cassettes")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    synthesize = commands.add_parser("synthesize", help="write a cassette for a synthetic league setup")
+    synthesize.add_argument("--teams", type=int, default=1000, help="synthetic teams (spread over the benchmark leagues)")
+    synthesize.add_argument("--matchdays", type=int, default=1, help="fixtures per team pair, one week apart")
+    synthesize.add_argument("--latency-ms", type=float, default=0.0, help="latency recorded for every response")
+    synthesize.add_argument("--output", required=True, help="cassette file (.jsonl.gz)")
+
+    info = commands.add_parser("info", help="summarize a cassette")
+    info.add_argument("path")
+
+    args = parser.parse_args(argv)
+    if args.command == "synthesize":
+        cassette = synthesize_cassette(build_teams(args.teams), matchdays=args.matchdays, latency_ms=args.latency_ms)
+        cassette.save(args.output)
+        print(json.dumps({"output": args.output, **cassette.summary()}, indent=2))
+    else:
+        print(json.dumps(Cassette.load(args.path).summary(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
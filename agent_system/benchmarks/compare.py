@@ -0,0 +1,52 @@
+"""
+Compare two benchmark result files (base first, then head)
+
+    python -m benchmarks.compare benchmarks/results/base.json benchmarks/results/head.json
+"""
+import json
+import sys
+from typing import Any, Dict, Iterator, Tuple
+
+
+def _operations(report: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    for scenario, result in report["scenarios"].items():
+        if "latency_ms" in result:
+            yield scenario, result
+        else:
+            for label, item in result.items():
+                yield f"{scenario} {label}", item
+
+
+def _change(base: float, head: float) -> str:
+    if not base:
+        return "n/a"
+    return f"{(head - base) / base * 100:+.1f}%"
+
+
+def compare(base: Dict[str, Any], head: Dict[str, Any]):
+    head_operations = dict(_operations(head))
+    print(f"base {base['meta']['commit']}  ->  head {head['meta']['commit']}")
+    print(f"{'benchmark':<48} {'p50 ms':>19} {'p99 ms':>19} {'ops/s':>19}")
+    for label, base_result in _operations(base):
+        head_result = head_operations.get(label)
+        if head_result is None:
+            continue
+        cells = []
+        for base_value, head_value in (
+            (base_result["latency_ms"]["p50"], head_result["latency_ms"]["p50"]),
+            (base_result["latency_ms"]["p99"], head_result["latency_ms"]["p99"]),
+            (base_result["throughput_per_second"] or 0, head_result["throughput_per_second"] or 0),
+        ):
+            cells.append(f"{head_value:>10.2f} {_change(base_value, head_value):>8}")
+        print(f"{label:<48} " + " ".join(cells))
+
+
+def main():
+    if len(sys.argv) != 3:
+        raise SystemExit("usage: python -m benchmarks.compare BASE.json HEAD.json")
+    with open(sys.argv[1], encoding="utf-8") as base_file, open(sys.argv[2], encoding="utf-8") as head_file:
+        compare(json.load(base_file), json.load(head_file))
+
+
+if __name__ == "__main__":
+    main()
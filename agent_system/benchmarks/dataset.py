@@ -0,0 +1,152 @@
+"""
+Synthetic dataset - Teams, users, fan links and quests seeded at benchmark scale
+"""
+import json
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Tuple
+
+from sqlalchemy import func, insert, select
+
+
+LEAGUE_CODES = ["esp.1", "fra.1", "eng.1", "ger.1", "uefa.champions", "uefa.europa", "fifa.cwc", "fifa.friendly"]
+
+SCALES = {
+    "smoke": {"teams": 40, "quests": 2_000, "users": 10_000},
+    "medium": {"teams": 200, "quests": 20_000, "users": 100_000},
+    "full": {"teams": 1_000, "quests": 100_000, "users": 1_000_000},
+}
+
+CHUNK_SIZE = 20_000
+
+
+@dataclass(frozen=True)
+class BenchTeam:
+    """A synthetic team as known to both the database and the fake ESPN server"""
+    index: int
+    name: str
+    espn_id: str
+    league_code: str
+
+    @property
+    def db_id(self) -> int:
+        return self.index + 1
+
+
+def build_teams(count: int) -> List[BenchTeam]:
+    """Deterministic team list; names are fixed width so ILIKE lookups stay unambiguous"""
+    return [
+        BenchTeam(
+            index=index,
+            name=f"Bench United {index:04d}",
+            espn_id=str(100000 + index),
+            league_code=LEAGUE_CODES[index % len(LEAGUE_CODES)],
+        )
+        for index in range(count)
+    ]
+
+
+def fixture_pairs(teams: List[BenchTeam]) -> List[Tuple[BenchTeam, BenchTeam]]:
+    """Home/away pairs scheduled by the fake ESPN scoreboard: consecutive teams of each league"""
+    pairs = []
+    for league_code in LEAGUE_CODES:
+        league_teams = [team for team in teams if team.league_code == league_code]
+        for home, away in zip(league_teams[0::2], league_teams[1::2]):
+            pairs.append((home, away))
+    return pairs
+
+
+def team_mappings(teams: List[BenchTeam]) -> Dict[str, Dict[str, str]]:
+    """Entries for espn_football_service.team_mappings"""
+    return {team.name: {"league": team.league_code, "id": team.espn_id} for team in teams}
+
+
+async def dataset_size(engine) -> Dict[str, int]:
+    """Row counts of an existing benchmark database (empty dict if not seeded)"""
+    from src.models.quest import Quest
+    from src.models.team import Team
+    from src.models.user import User
+
+    try:
+        async with engine.connect() as conn:
+            return {
+                "teams": (await conn.execute(select(func.count()).select_from(Team))).scalar_one(),
+                "quests": (await conn.execute(select(func.count()).select_from(Quest))).scalar_one(),
+                "users": (await conn.execute(select(func.count()).select_from(User))).scalar_one(),
+            }
+    except Exception:
+        return {}
+
+
+async def seed_database(engine, teams: List[BenchTeam], quest_count: int, user_count: int, seed: int = 7):
+    """Create the schema and bulk insert the dataset with Core executemany statements"""
+    from src.models.database import Base
+    from src.models.quest import Quest, QuestStatus, QuestType
+    from src.models.team import Team
+    from src.models.user import User
+    from src.models.user_team import UserTeam
+
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    team_count = len(teams)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+        await conn.execute(insert(Team.__table__), [
+            {
+                "id": team.db_id,
+                "name": team.name,
+                "display_name": team.name,
+                "sport": "football",
+                "league": team.league_code,
+                "country": "Benchland",
+                "is_active": True,
+                "external_id": team.espn_id,
+            }
+            for team in teams
+        ])
+
+        for start in range(0, user_count, CHUNK_SIZE):
+            stop = min(start + CHUNK_SIZE, user_count)
+            await conn.execute(insert(User.__table__), [
+                {"id": user_id, "address": f"0x{user_id:040x}"} for user_id in range(start + 1, stop + 1)
+            ])
+
+            fan_rows = []
+            for user_id in range(start + 1, stop + 1):
+                fan_rows.append({"user_id": user_id, "team_id": user_id % team_count + 1, "is_favorite": True, "notification_enabled": True})
+                if user_id % 3 == 0:
+                    fan_rows.append({"user_id": user_id, "team_id": (user_id * 7 + 3) % team_count + 1, "is_favorite": False, "notification_enabled": user_id % 2 == 0})
+            await conn.execute(insert(UserTeam.__table__), fan_rows)
+
+        quest_types = [QuestType.INDIVIDUAL, QuestType.CLASH, QuestType.COLLECTIVE]
+        statuses = [QuestStatus.ACTIVE, QuestStatus.PENDING, QuestStatus.COMPLETED]
+        for start in range(0, quest_count, CHUNK_SIZE):
+            rows = []
+            for quest_id in range(start + 1, min(start + CHUNK_SIZE, quest_count) + 1):
+                target_value = rng.randint(1, 10)
+                rows.append({
+                    "id": quest_id,
+                    "title": f"🎯 Bench quest {quest_id}",
+                    "description": "Support your team this weekend. Complete this quest by tweeting your prediction.",
+                    "quest_type": quest_types[quest_id % 3],
+                    "status": statuses[quest_id % 3],
+                    "user_id": (quest_id * 7919) % user_count + 1 if quest_id % 3 == 0 else None,
+                    "team_id": quest_id % team_count + 1,
+                    "target_metric": "tweets",
+                    "target_value": target_value,
+                    "current_progress": rng.randint(0, target_value),
+                    "start_time": now - timedelta(days=1),
+                    "end_time": now + timedelta(days=rng.randint(1, 14)),
+                    "quest_metadata": json.dumps({"difficulty": "easy", "rewards": {"points": target_value * 10}}),
+                    "is_active": True,
+                })
+            await conn.execute(insert(Quest.__table__), rows)
+
+    # Inboxes: every personal quest, and the newest quests of each team fanned out to its followers
+    from src.services.quest_fanout import quest_fanout
+    await quest_fanout.backfill_inboxes()
+    await quest_fanout.fan_out(list(range(max(1, quest_count - 2 * team_count + 1), quest_count + 1)))
@@ -0,0 +1,164 @@
+"""
+Fake ESPN server - Replays recorded scoreboard fixtures and serves synthetic teams over HTTP
+
+Recorded fixtures live in benchmarks/fixtures/<league>_scoreboard.json. Their
+dates are shifted so the first event starts one day from now, then a synthetic
+fixture is added for every pair returned by dataset.fixture_pairs().
+"""
+import asyncio
+import copy
+import json
+import socket
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import uvicorn
+from fastapi import FastAPI, HTTPException
+
+from .dataset import BenchTeam, fixture_pairs
+
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+def _parse_date(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _format_date(value: datetime) -> str:
+    return value.strftime("%Y-%m-%dT%H:%MZ")
+
+
+def _team_payload(team: BenchTeam) -> Dict[str, Any]:
+    return {
+        "id": team.espn_id,
+        "uid": f"s:600~t:{team.espn_id}",
+        "location": team.name,
+        "name": team.name,
+        "abbreviation": f"B{team.index:04d}",
+        "displayName": team.name,
+        "shortDisplayName": team.name,
+        "color": "1d428a",
+        "logos": [{"href": f"https://bench.local/logos/{team.espn_id}.png"}],
+    }
+
+
+def _synthetic_event(home: BenchTeam, away: BenchTeam, kickoff: datetime) -> Dict[str, Any]:
+    event_id = f"9{home.espn_id}{away.espn_id[-3:]}"
+    competitors = []
+    for team, side in ((home, "home"), (away, "away")):
+        competitors.append({"id": team.espn_id, "homeAway": side, "score": "0", "team": _team_payload(team)})
+    return {
+        "id": event_id,
+        "date": _format_date(kickoff),
+        "name": f"{away.name} at {home.name}",
+        "season": {"slug": home.league_code},
+        "competitions": [{"id": event_id, "venue": {"fullName": f"{home.name} Stadium"}, "competitors": competitors}],
+        "status": {"type": {"id": "1", "name": "STATUS_SCHEDULED", "state": "pre", "completed": False}},
+    }
+
+
+def load_recorded_scoreboards(now: datetime) -> Dict[str, Dict[str, Any]]:
+    """Recorded scoreboards keyed by league code, time-shifted into the future"""
+    scoreboards = {}
+    for path in sorted(FIXTURES_DIR.glob("*_scoreboard.json")):
+        league_code = path.name[: -len("_scoreboard.json")]
+        data = json.loads(path.read_text(encoding="utf-8"))
+        events = data.get("events", [])
+        if events:
+            first = min(_parse_date(event["date"]) for event in events)
+            shift = (now + timedelta(days=1)) - first
+            for event in events:
+                event["date"] = _format_date(_parse_date(event["date"]) + shift)
+        scoreboards[league_code] = data
+    return scoreboards
+
+
+def build_scoreboards(teams: List[BenchTeam], now: Optional[datetime] = None) -> Dict[str, Dict[str, Any]]:
+    """Recorded fixtures plus one upcoming synthetic fixture per team pair"""
+    now = now or datetime.now(timezone.utc)
+    scoreboards = load_recorded_scoreboards(now)
+    for offset, (home, away) in enumerate(fixture_pairs(teams)):
+        scoreboard = scoreboards.setdefault(home.league_code, {"leagues": [{"slug": home.league_code}], "events": []})
+        scoreboard["events"].append(_synthetic_event(home, away, now + timedelta(days=2, minutes=15 * offset)))
+    return scoreboards
+
+
+def create_app(teams: List[BenchTeam], latency_ms: float = 0.0) -> FastAPI:
+    """ASGI app answering the two ESPN routes the service uses"""
+    scoreboards = build_scoreboards(teams)
+    teams_by_id = {(team.league_code, team.espn_id): team for team in teams}
+    recorded_teams = {}
+    for league_code, scoreboard in scoreboards.items():
+        for event in scoreboard.get("events", []):
+            for competitor in event["competitions"][0]["competitors"]:
+                recorded_teams[(league_code, str(competitor["team"]["id"]))] = competitor["team"]
+
+    app = FastAPI()
+    app.state.requests = 0
+
+    async def simulate_latency():
+        app.state.requests += 1
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+
+    @app.get("/{league}/scoreboard")
+    async def scoreboard(league: str):
+        await simulate_latency()
+        return copy.deepcopy(scoreboards.get(league, {"leagues": [], "events": []}))
+
+    @app.get("/{league}/teams/{team_id}")
+    async def team(league: str, team_id: str):
+        await simulate_latency()
+        bench_team = teams_by_id.get((league, team_id))
+        if bench_team:
+            return {"team": _team_payload(bench_team)}
+        if (league, team_id) in recorded_teams:
+            return {"team": recorded_teams[(league, team_id)]}
+        raise HTTPException(status_code=404, detail="Team not found")
+
+    return app
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class FakeESPNServer:
+    """Runs the fake ESPN app with uvicorn on a local port inside the current event loop"""
+
+    def __init__(self, teams: List[BenchTeam], latency_ms: float = 0.0):
+        self.app = create_app(teams, latency_ms)
+        self.port = _free_port()
+        self.server = uvicorn.Server(uvicorn.Config(
+            self.app, host="127.0.0.1", port=self.port, log_level="warning", lifespan="off", access_log=False
+        ))
+        self.task = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    @property
+    def transport(self):
+        """Real sockets: the ESPN service keeps its default transport"""
+        return None
+
+    @property
+    def request_count(self) -> int:
+        return self.app.state.requests
+
+    async def __aenter__(self) -> "FakeESPNServer":
+        self.task = asyncio.create_task(self.server.serve())
+        while not self.server.started:
+            if self.task.done():
+                self.task.result()
+            await asyncio.sleep(0.01)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.server.should_exit = True
+        await self.task
@@ -0,0 +1,243 @@
+"""
+Fake Runner - Deterministic stand-in for agents.Runner.run with simulated latency and usage
+
+Outputs are derived from a hash of the agent name and input, so two runs of the
+suite see the same responses. Token counts use the usual 4 characters per token
+estimate over the instructions and input.
+
+Prompt caching follows the OpenAI rules: a prompt whose first 1024+ tokens were
+seen before has its longest seen prefix (in 128-token blocks) counted as cached
+input. Uncached input adds prefill latency; cached input is billed at a discount.
+
+Agents with a structured output_type get their reply validated through it, as
+Runner does; the research agent answers one brief per requested topic key. malformed_rate damages that share of structured replies (prose
+around the JSON, fences, trailing commas, truncation) to exercise the repair
+path. Runner.run_streamed is faked too: the reply arrives in text deltas
+spread over the model latency after the prefill delay.
+"""
+import asyncio
+import hashlib
+import json
+import random
+import re
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Any, Dict, Set, Tuple
+
+from agents import AgentOutputSchemaBase
+from agents.usage import Usage
+from openai.types.responses.response_usage import InputTokensDetails, OutputTokensDetails
+
+
+SEARCH_TEXT = (
+    "{subject}: preview of the upcoming final and tournament fixtures. The manager confirmed the squad "
+    "after training, the captain is fit again and the transfer deadline is approaching. Head-to-head record "
+    "favours the hosts, who won the last derby 2-1 in front of a sold-out crowd."
+)
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+@dataclass
+class AgentStats:
+    """Totals for one agent name"""
+    runs: int = 0
+    input_tokens: int = 0
+    cached_tokens: int = 0
+    output_tokens: int = 0
+    quests: int = 0
+
+
+class FakeStreamedRun:
+    """Stand-in for RunResultStreaming: the reply arrives in small text deltas after the prefill delay"""
+
+    chunk_chars = 16
+
+    def __init__(self, runner: "FakeRunner", output: str, final_output, usage: Usage, first_token_ms: float, decode_ms: float):
+        self.runner = runner
+        self.output = output
+        self._final_output = final_output
+        self.context_wrapper = SimpleNamespace(usage=usage)
+        self.first_token_ms = first_token_ms
+        self.decode_ms = decode_ms
+        self.final_output = None
+        self.is_complete = False
+
+    async def stream_events(self):
+        chunks = [self.output[index:index + self.chunk_chars] for index in range(0, len(self.output), self.chunk_chars)]
+        await asyncio.sleep(self.first_token_ms / 1000)
+        for chunk in chunks:
+            if self.is_complete:
+                return
+            await asyncio.sleep(self.decode_ms / len(chunks) / 1000)
+            yield SimpleNamespace(type="raw_response_event", data=SimpleNamespace(type="response.output_text.delta", delta=chunk))
+        try:
+            self.final_output = self._final_output()
+        finally:
+            self.is_complete = True
+
+    def cancel(self):
+        if not self.is_complete:
+            self.runner.cancelled_streams += 1
+        self.is_complete = True
+
+
+@dataclass
+class FakeRunner:
+    """Replacement for Runner.run and Runner.run_streamed; install() patches the agents SDK in place"""
+    latency_ms: float = 50.0
+    jitter_ms: float = 0.0
+    prefill_ms_per_1k_tokens: float = 0.0
+    cache_min_tokens: int = 1024
+    cache_block_tokens: int = 128
+    cached_price_ratio: float = 0.5
+    malformed_rate: float = 0.0
+    stats: Dict[str, AgentStats] = field(default_factory=dict)
+    cancelled_streams: int = 0
+    prefix_cache: Set[str] = field(default_factory=set)
+
+    def _cached_tokens(self, prompt: str) -> int:
+        """Longest previously seen block-aligned prefix, then remember this prompt's prefixes"""
+        total_tokens = estimate_tokens(prompt)
+        cached = 0
+        for tokens in range(self.cache_min_tokens, total_tokens + 1, self.cache_block_tokens):
+            key = hashlib.sha1(prompt[: tokens * 4].encode()).hexdigest()
+            if key in self.prefix_cache:
+                cached = tokens
+            else:
+                self.prefix_cache.add(key)
+        return cached
+
+    def _rng(self, agent_name: str, prompt: str) -> random.Random:
+        digest = hashlib.sha256(f"{agent_name}\n{prompt}".encode()).digest()
+        return random.Random(int.from_bytes(digest[:8], "big"))
+
+    def _output(self, agent_name: str, prompt: str, rng: random.Random) -> Tuple[str, int]:
+        """Response text and the number of quests in it"""
+        subject = prompt[:80]
+        if agent_name == "ClashQuestGenerator":
+            team_a = re.search(r"^Team A: (.+)$", prompt, re.MULTILINE)
+            team_b = re.search(r"^Team B: (.+)$", prompt, re.MULTILINE)
+            team_a, team_b = (team_a.group(1), team_b.group(1)) if team_a and team_b else ("Team A", "Team B")
+            return json.dumps({"quests": [
+                {"title": f"⚔️ {team_a} Matchday Roar", "description": f"The clash with {team_b} is here. Complete this quest by tweeting your prediction.", "target_value": rng.randint(1, 5), "difficulty": "easy", "team_side": "A"},
+                {"title": f"🛡️ {team_b} Hold The Line", "description": f"{team_a} are coming. Complete this quest by tweeting support for your side.", "target_value": rng.randint(1, 5), "difficulty": "easy", "team_side": "B"},
+            ]}), 2
+        if agent_name == "CommunityQuestGenerator":
+            return json.dumps({"title": "🌍 Global Football Moment", "description": "The final unites every fan. Complete this quest by tweeting your prediction.", "target_value": rng.randint(1000, 5000), "difficulty": "medium", "event_context": "Tournament final"}), 1
+        if agent_name == "BatchQuestGenerator":
+            teams = [
+                {"key": key, "quests": [
+                    {"title": f"🎯 {team} Quest {index + 1}", "description": f"Big week for {team}. Complete this quest by tweeting about the squad.", "target_value": rng.randint(1, 5), "difficulty": "easy"}
+                    for index in range(rng.randint(2, 3))
+                ]}
+                for key, team in re.findall(r"^\[(\w+)\] Team: (.+)$", prompt, re.MULTILINE)
+            ]
+            return json.dumps({"teams": teams}), sum(len(entry["quests"]) for entry in teams)
+        if agent_name == "SmartQuestGenerator":
+            team = re.search(r"^Team: (.+)$", prompt, re.MULTILINE)
+            team = team.group(1) if team else "Team"
+            count = rng.randint(2, 3)
+            return json.dumps({"quests": [
+                {"title": f"🎯 {team} Quest {index + 1}", "description": f"Big week for {team}. Complete this quest by tweeting about the squad.", "target_value": rng.randint(1, 5), "difficulty": "easy"}
+                for index in range(count)
+            ]}), count
+        if agent_name == "FootballResearchAgent":
+            return json.dumps({"briefs": [
+                {"key": key, "content": SEARCH_TEXT.format(subject=topic)}
+                for key, topic in re.findall(r"^\[(\w+)\] (.+)$", prompt, re.MULTILINE)
+            ]}), 0
+        return SEARCH_TEXT.format(subject=subject), 0
+
+    def _malform(self, output: str, rng: random.Random) -> str:
+        """Typical ways a model breaks JSON"""
+        damage = rng.choice(["prose", "fence", "trailing_comma", "truncate"])
+        if damage == "prose":
+            return f"Here are the quests:\n{output}\nHope the fans enjoy them!"
+        if damage == "fence":
+            return f"```json\n{output}\n```"
+        if damage == "trailing_comma":
+            return output[:-1] + ",}" if output.endswith("}") else output
+        return output[: int(len(output) * rng.uniform(0.6, 0.95))]
+
+    def _prepare(self, agent, input: Any):
+        """Reply text, what to return as final_output, usage and the (time to first token, total) delays in ms"""
+        agent_name = getattr(agent, "name", "unknown")
+        prompt = input if isinstance(input, str) else json.dumps(input, default=str)
+        rng = self._rng(agent_name, prompt)
+
+        instructions = getattr(agent, "instructions", "") or ""
+        full_prompt = f"{instructions}\n{prompt}"
+        input_tokens = estimate_tokens(full_prompt)
+        cached_tokens = self._cached_tokens(full_prompt)
+
+        prefill = self.prefill_ms_per_1k_tokens * (input_tokens - cached_tokens) / 1000
+        delay = self.latency_ms + (rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0) + prefill
+
+        output, quests = self._output(agent_name, prompt, rng)
+        output_schema = getattr(agent, "output_type", None)
+        structured = isinstance(output_schema, AgentOutputSchemaBase) and not output_schema.is_plain_text()
+        if structured and self.malformed_rate and rng.random() < self.malformed_rate:
+            output = self._malform(output, rng)
+        output_tokens = estimate_tokens(output)
+        usage = Usage(
+            requests=1,
+            input_tokens=input_tokens,
+            input_tokens_details=InputTokensDetails.model_construct(cached_tokens=cached_tokens),
+            output_tokens=output_tokens,
+            output_tokens_details=OutputTokensDetails.model_construct(reasoning_tokens=0),
+            total_tokens=input_tokens + output_tokens,
+        )
+
+        totals = self.stats.setdefault(agent_name, AgentStats())
+        totals.runs += 1
+        totals.input_tokens += input_tokens
+        totals.cached_tokens += cached_tokens
+        totals.output_tokens += output_tokens
+        totals.quests += quests
+
+        def final_output():
+            return output_schema.validate_json(output) if structured else output
+
+        return output, final_output, usage, (prefill, delay)
+
+    async def run(self, agent, input: Any = "", **kwargs):
+        _, final_output, usage, (_, delay) = self._prepare(agent, input)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        return SimpleNamespace(final_output=final_output(), context_wrapper=SimpleNamespace(usage=usage))
+
+    def run_streamed(self, agent, input: Any = "", **kwargs) -> "FakeStreamedRun":
+        output, final_output, usage, (prefill, delay) = self._prepare(agent, input)
+        return FakeStreamedRun(self, output, final_output, usage, prefill, max(0.0, delay - prefill))
+
+    def install(self):
+        """Route every Runner.run call through this fake"""
+        from agents import Runner
+
+        fake = self
+
+        async def run(cls, agent, input, **kwargs):
+            return await fake.run(agent, input, **kwargs)
+
+        def run_streamed(cls, agent, input, **kwargs):
+            return fake.run_streamed(agent, input, **kwargs)
+
+        Runner.run = classmethod(run)
+        Runner.run_streamed = classmethod(run_streamed)
+
+    def token_report(self) -> Dict[str, Dict[str, Any]]:
+        """Per-agent totals with cache hit ratio, billed input (cached at a discount) and cost per quest"""
+        report = {}
+        for name, stats in sorted(self.stats.items()):
+            entry: Dict[str, Any] = vars(stats).copy()
+            billed_input = stats.input_tokens - stats.cached_tokens * (1 - self.cached_price_ratio)
+            entry["cache_hit_ratio"] = round(stats.cached_tokens / stats.input_tokens, 3) if stats.input_tokens else 0.0
+            entry["billed_input_tokens"] = round(billed_input)
+            if stats.quests:
+                entry["billed_input_tokens_per_quest"] = round(billed_input / stats.quests, 1)
+                entry["output_tokens_per_quest"] = round(stats.output_tokens / stats.quests, 1)
+            report[name] = entry
+        return report
@@ -0,0 +1,129 @@
+"""
+Import time report - Cold start cost of the API process, from python -X importtime
+
+Each target is imported in a fresh interpreter. The report lists the total
+import time, the slowest packages, peak RSS and which of the heavy generation
+dependencies (Agents SDK, OpenAI SDK) got loaded. Serving reads must not load
+them; the "generation" target shows what the first generation request pays.
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --check   # exit 1 if the API import loads a lazy module
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .run_benchmarks import RESULTS_DIR, git_commit
+
+
+TARGETS = {
+    "api": "import src.api.main",
+    "generation": "import src.api.main; import src.ai_agents.individual_quest_generator",
+}
+# Modules that must only load on the first use of a generation route
+LAZY_MODULES = ["agents", "openai", "mcp", "src.ai_agents.individual_quest_generator"]
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+_PROBE = (
+    "{statement}\n"
+    "import json, resource, sys\n"
+    "peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss\n"
+    "print(json.dumps({{'modules': sorted(sys.modules), "
+    "'max_rss_mb': peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024}}))\n"
+)
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int, int]]:
+    """(module, depth, self_us, cumulative_us) for every line of -X importtime output"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        if not self_us.strip().isdigit():
+            continue  # header line
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+    return entries
+
+
+def measure_import(statement: str, top: int = 15) -> Dict[str, Any]:
+    """Run one import statement in a fresh interpreter and summarize its import cost"""
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(PROJECT_ROOT), env.get("PYTHONPATH")]))
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE.format(statement=statement)],
+        cwd=PROJECT_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    probe = json.loads(completed.stdout.strip().splitlines()[-1])
+    entries = parse_importtime(completed.stderr)
+
+    # Self time summed per top-level package (all of sqlalchemy.*), so nothing is counted twice
+    packages: Dict[str, int] = {}
+    for name, _, self_us, _ in entries:
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0) + self_us
+
+    loaded = set(probe["modules"])
+    return {
+        "statement": statement,
+        "total_ms": round(sum(cumulative for _, depth, _, cumulative in entries if depth == 0) / 1000, 1),
+        "modules_loaded": len(loaded),
+        "max_rss_mb": round(probe["max_rss_mb"], 1),
+        "lazy_modules_loaded": [module for module in LAZY_MODULES if module in loaded],
+        "slowest_packages_ms": {
+            package: round(self_us / 1000, 1)
+            for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[:top]
+        },
+        "slowest_modules_self_ms": {
+            name: round(self_us / 1000, 1)
+            for name, _, self_us, _ in sorted(entries, key=lambda entry: -entry[2])[:top]
+        },
+    }
+
+
+def print_report(report: Dict[str, Any]):
+    for target, result in report["targets"].items():
+        print(f"\n{target}: {result['statement']}")
+        print(f"  {result['total_ms']:.1f} ms, {result['modules_loaded']} modules, peak RSS {result['max_rss_mb']:.1f} MB")
+        print(f"  lazy modules loaded: {', '.join(result['lazy_modules_loaded']) or 'none'}")
+        for package, ms in result["slowest_packages_ms"].items():
+            print(f"    {package:<40} {ms:>8.1f} ms")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Cold start import time of the API process")
+    parser.add_argument("--targets", default=",".join(TARGETS), help=f"comma separated subset of {','.join(TARGETS)}")
+    parser.add_argument("--top", type=int, default=15, help="packages and modules listed per target")
+    parser.add_argument("--check", action="store_true", help="fail if importing the API loads any lazy module")
+    parser.add_argument("--output", help="result file (default: benchmarks/results/<timestamp>-<commit>-importtime.json)")
+    args = parser.parse_args(argv)
+
+    report = {
+        "meta": {"commit": git_commit(), "python": sys.version.split()[0], "timestamp": datetime.now().isoformat()},
+        "targets": {target: measure_import(TARGETS[target], args.top) for target in args.targets.split(",")},
+    }
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}-{report['meta']['commit']}-importtime.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    print_report(report)
+    print(f"\nResults saved to {output}")
+
+    if args.check and report["targets"].get("api", {}).get("lazy_modules_loaded"):
+        print(f"\nFAIL: importing the API loads {', '.join(report['targets']['api']['lazy_modules_loaded'])}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
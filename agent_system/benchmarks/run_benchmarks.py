@@ -0,0 +1,346 @@
+"""
+Benchmark runner - Drives the sync pipeline, the three generators and the read endpoints
+
+Everything runs against a local SQLite database, the fake ESPN server (or an
+ESPN cassette, see benchmarks.cassette) and the fake Runner, so results are
+comparable between commits. Results are written as JSON to benchmarks/results/
+(or --output).
+
+    python -m benchmarks.run_benchmarks --scale full --scenarios read
+    python -m benchmarks.run_benchmarks --scale smoke --llm-latency 200
+    python -m benchmarks.run_benchmarks --teams 5000 --scenarios sync --espn-cassette benchmarks/cassettes/5k.jsonl.gz
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from .dataset import SCALES, build_teams, dataset_size, fixture_pairs, seed_database, team_mappings
+from .cassette import CassetteESPN
+from .fake_espn import FakeESPNServer
+from .fake_runner import FakeRunner
+from .stats import max_rss_mb, measure
+
+
+SCENARIOS = ["sync", "individual", "individual_batch", "clash", "collective", "read"]
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline Sports Quest AI benchmarks")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="smoke", help="dataset preset (full: 1k teams, 100k quests, 1M users)")
+    parser.add_argument("--teams", type=int, help="override the number of teams")
+    parser.add_argument("--quests", type=int, help="override the number of quests")
+    parser.add_argument("--users", type=int, help="override the number of users")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"comma separated subset of {','.join(SCENARIOS)}")
+    parser.add_argument("--db", default="benchmarks/bench.db", help="SQLite file; reused while its row counts match the scale")
+    parser.add_argument("--reseed", action="store_true", help="rebuild the database even if it matches")
+    parser.add_argument("--llm-latency", type=float, default=50.0, help="fake model latency per run (ms)")
+    parser.add_argument("--llm-jitter", type=float, default=0.0, help="uniform +/- jitter on the model latency (ms)")
+    parser.add_argument("--llm-prefill", type=float, default=20.0, help="fake prefill latency per 1k uncached input tokens (ms)")
+    parser.add_argument("--llm-malformed", type=float, default=0.0, help="share of structured model replies returned as malformed JSON")
+    parser.add_argument("--espn-latency", type=float, default=0.0, help="fake ESPN latency per request (ms)")
+    parser.add_argument("--espn-cassette", help="replay ESPN responses from this cassette instead of the fake server")
+    parser.add_argument("--espn-latency-scale", type=float, default=0.0, help="replay the cassette's recorded latency times this factor")
+    parser.add_argument("--espn-record", help="record the ESPN traffic of this run into a cassette")
+    parser.add_argument("--sample-teams", type=int, default=20, help="teams (and clash pairs) driven through the generators")
+    parser.add_argument("--batch-teams", type=int, default=8, help="teams per operation in the individual_batch scenario")
+    parser.add_argument("--collective-runs", type=int, default=5, help="collective pipeline runs")
+    parser.add_argument("--requests", type=int, default=200, help="requests per read endpoint")
+    parser.add_argument("--concurrency", type=int, default=10, help="concurrent operations per scenario")
+    parser.add_argument("--trace-memory", action="store_true", help="also report the tracemalloc peak (slower)")
+    parser.add_argument("--sql-echo", action="store_true", help="keep SQLAlchemy statement logging on")
+    parser.add_argument("--output", help="result file (default: benchmarks/results/<timestamp>-<commit>.json)")
+    return parser.parse_args(argv)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def configure_environment(args: argparse.Namespace):
+    """Point the app at the benchmark database before any src module is imported"""
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{Path(args.db).resolve()}"
+    os.environ.setdefault("TRACE_EXPORTER", "none")
+    os.environ.setdefault("ENABLE_EVENT_SCHEDULER", "false")
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+    from loguru import logger
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+
+async def bench_sync(context: Dict[str, Any]) -> Dict[str, Any]:
+    """Full ESPN sync: team sync, upcoming fixtures, event creation (one pass over every team)"""
+    from src.core.tracing import start_run
+    from src.services.espn_football_service import espn_football_service
+
+    async def run_sync():
+        with start_run("benchmark.sync") as run:
+            context["sync_result"] = await espn_football_service.sync_events_and_trigger_quests()
+        context["sync_stages"] = run.breakdown()["by_stage"]
+
+    requests_before = context["espn"].request_count
+    result = await measure([run_sync], concurrency=1, trace_memory=context["args"].trace_memory)
+    sync_result = context.get("sync_result") or {}
+    result["espn_requests"] = context["espn"].request_count - requests_before
+    result["stages"] = context.get("sync_stages", {})
+    result["teams_synced"] = sync_result.get("sync_result", {}).get("synced")
+    result["events_created"] = sync_result.get("events_created", {}).get("created")
+    return result
+
+
+async def bench_individual(context: Dict[str, Any]) -> Dict[str, Any]:
+    """fetch_team_news -> generate_individual_quests -> save_individual_quests per sampled team"""
+    from src.ai_agents.individual_quest_generator import fetch_team_news, generate_individual_quests, save_individual_quests
+
+    def operation(team):
+        async def run():
+            news = await fetch_team_news(team.name)
+            quests = await generate_individual_quests(team.name, news)
+            if quests:
+                await save_individual_quests(team.db_id, team.name, quests)
+        return run
+
+    return await measure([operation(team) for team in context["sample_teams"]], context["args"].concurrency, context["args"].trace_memory)
+
+
+async def bench_individual_batch(context: Dict[str, Any]) -> Dict[str, Any]:
+    """fetch_team_news per team -> generate_individual_quests_batch -> save_individual_quests, --batch-teams teams per operation"""
+    from src.ai_agents.individual_quest_generator import fetch_team_news, generate_individual_quests_batch, save_individual_quests
+
+    def operation(teams):
+        async def run():
+            news = [(team.name, await fetch_team_news(team.name)) for team in teams]
+            quests_by_team = await generate_individual_quests_batch(news)
+            for team in teams:
+                if quests_by_team.get(team.name):
+                    await save_individual_quests(team.db_id, team.name, quests_by_team[team.name])
+        return run
+
+    size = max(1, context["args"].batch_teams)
+    teams = context["sample_teams"]
+    groups = [teams[index:index + size] for index in range(0, len(teams), size)]
+    result = await measure([operation(group) for group in groups], context["args"].concurrency, context["args"].trace_memory)
+    result["teams_per_operation"] = size
+    return result
+
+
+async def bench_clash(context: Dict[str, Any]) -> Dict[str, Any]:
+    """search_team_match -> generate_clash_quests -> save_clash_quests per scheduled pair"""
+    from src.ai_agents.clash_quest_generator import generate_clash_quests, save_clash_quests, search_team_match
+
+    def operation(home, away):
+        async def run():
+            content, match_exists = await search_team_match(home.name, away.name)
+            if not match_exists:
+                raise RuntimeError(f"no fixture for {home.name} vs {away.name}")
+            team_a_quests, team_b_quests = await generate_clash_quests(home.name, away.name, content)
+            await save_clash_quests(home.db_id, away.db_id, home.name, away.name, team_a_quests, team_b_quests)
+        return run
+
+    requests_before = context["espn"].request_count
+    result = await measure([operation(home, away) for home, away in context["sample_pairs"]], context["args"].concurrency, context["args"].trace_memory)
+    result["espn_requests"] = context["espn"].request_count - requests_before
+    return result
+
+
+async def bench_collective(context: Dict[str, Any]) -> Dict[str, Any]:
+    """search_global_football_events -> generate_community_quest -> save_community_quest"""
+    from src.ai_agents.collective_quest_generator import generate_community_quest, save_community_quest, search_global_football_events
+
+    async def run():
+        content, found = await search_global_football_events()
+        if found:
+            quest = await generate_community_quest(content)
+            if quest:
+                await save_community_quest(quest)
+
+    return await measure([run] * context["args"].collective_runs, 1, context["args"].trace_memory)
+
+
+async def bench_read(context: Dict[str, Any]) -> Dict[str, Any]:
+    """Read endpoints through the full ASGI stack (middleware included)"""
+    import httpx
+    from src.api.main import app
+
+    args = context["args"]
+    sizes = context["sizes"]
+    rng = random.Random(11)
+    endpoints: Dict[str, Callable[[], str]] = {
+        "GET /api/feed/missions": lambda: "/api/feed/missions",
+        "GET /api/feed/missions?team_id": lambda: f"/api/feed/missions?team_id={rng.randint(1, sizes['teams'])}",
+        "GET /api/quests/": lambda: "/api/quests/?limit=100",
+        "GET /api/quests/?team_id": lambda: f"/api/quests/?team_id={rng.randint(1, sizes['teams'])}",
+        "GET /api/quests/{user_id}": lambda: f"/api/quests/{rng.randint(1, sizes['users'])}",
+        "GET /api/teams/": lambda: "/api/teams/",
+        "GET /api/teams/{team_id}/community": lambda: f"/api/teams/{rng.randint(1, sizes['teams'])}/community",
+        "GET /api/events/": lambda: "/api/events/",
+        "GET /api/teams/{team_id}": lambda: f"/api/teams/{rng.randint(1, sizes['teams'])}",
+    }
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for label, make_path in endpoints.items():
+            def operation(path):
+                async def run():
+                    response = await client.get(path)
+                    if response.status_code >= 400:
+                        raise RuntimeError(f"{path}: HTTP {response.status_code}")
+                return run
+
+            results[label] = await measure([operation(make_path()) for _ in range(args.requests)], args.concurrency, args.trace_memory)
+    return results
+
+
+BENCHMARKS = {
+    "sync": bench_sync,
+    "individual": bench_individual,
+    "individual_batch": bench_individual_batch,
+    "clash": bench_clash,
+    "collective": bench_collective,
+    "read": bench_read,
+}
+
+
+def structured_output_report() -> Dict[str, Dict[str, int]]:
+    """Validation outcomes per generator output schema"""
+    from src.tools.structured_output import structured_output_parses
+
+    report = {}
+    for schema in ("IndividualQuestList", "BatchIndividualQuests", "ClashQuestList", "CommunityQuest"):
+        counts = {outcome: int(structured_output_parses.get(schema=schema, outcome=outcome)) for outcome in ("ok", "repaired", "failed")}
+        if any(counts.values()):
+            report[schema] = counts
+    return report
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    configure_environment(args)
+    from src.models.database import engine, init_db
+    from src.services.espn_cassette import RecordingTransport
+    from src.services.espn_football_service import espn_football_service
+
+    engine.echo = args.sql_echo
+    scale = dict(SCALES[args.scale])
+    for key in ("teams", "quests", "users"):
+        if getattr(args, key):
+            scale[key] = getattr(args, key)
+
+    # A reused --db may predate newer tables and columns; init_db adds them without touching the rows
+    await init_db()
+    teams = build_teams(scale["teams"])
+    if args.reseed or await dataset_size(engine) != scale:
+        print(f"Seeding {scale['teams']} teams, {scale['quests']} quests, {scale['users']} users into {args.db}...", file=sys.stderr)
+        start = time.perf_counter()
+        await seed_database(engine, teams, scale["quests"], scale["users"])
+        print(f"Seeded in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+    fake_runner = FakeRunner(
+        latency_ms=args.llm_latency, jitter_ms=args.llm_jitter, prefill_ms_per_1k_tokens=args.llm_prefill,
+        malformed_rate=args.llm_malformed
+    )
+    fake_runner.install()
+    espn_football_service.team_mappings.update(team_mappings(teams))
+
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(scenarios) - set(BENCHMARKS)
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    results: Dict[str, Any] = {}
+    if args.espn_cassette:
+        espn_backend = CassetteESPN(args.espn_cassette, latency_scale=args.espn_latency_scale)
+        # Nothing to rate limit: the sync runs at the speed of the pipeline itself
+        espn_football_service.request_delay = 0.0
+    else:
+        espn_backend = FakeESPNServer(teams, latency_ms=args.espn_latency)
+    async with espn_backend as espn:
+        espn_football_service.base_url = espn.base_url
+        espn_football_service.transport = (
+            RecordingTransport(args.espn_record, espn.base_url, transport=espn.transport) if args.espn_record else espn.transport
+        )
+        context = {
+            "args": args,
+            "espn": espn,
+            "sizes": scale,
+            "sample_teams": teams[: args.sample_teams],
+            "sample_pairs": fixture_pairs(teams)[: args.sample_teams],
+        }
+        for name in scenarios:
+            print(f"Running {name}...", file=sys.stderr)
+            results[name] = await BENCHMARKS[name](context)
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "scale": scale,
+            "config": {key: value for key, value in vars(args).items() if key not in ("output",)},
+            "max_rss_mb": round(max_rss_mb(), 1),
+        },
+        "llm_tokens": fake_runner.token_report(),
+        "structured_output": structured_output_report(),
+        "scenarios": results,
+    }
+
+
+def print_summary(report: Dict[str, Any]):
+    """One line per measured operation"""
+    rows = []
+    for scenario, result in report["scenarios"].items():
+        if "latency_ms" in result:
+            rows.append((scenario, result))
+        else:
+            rows.extend((f"{scenario} {label}", item) for label, item in result.items())
+
+    print(f"{'benchmark':<48} {'ops':>6} {'err':>4} {'ops/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'rss MB':>8}")
+    for label, result in rows:
+        print(
+            f"{label:<48} {result['operations']:>6} {result['errors']:>4} {result['throughput_per_second'] or 0:>9.2f} "
+            f"{result['latency_ms']['p50']:>9.2f} {result['latency_ms']['p99']:>9.2f} {result['memory']['max_rss_mb']:>8.1f}"
+        )
+
+    if report["llm_tokens"]:
+        print(f"\n{'agent':<28} {'runs':>6} {'input':>10} {'cached':>10} {'hit':>6} {'in/quest':>9} {'out/quest':>9}")
+        for agent_name, tokens in report["llm_tokens"].items():
+            print(
+                f"{agent_name:<28} {tokens['runs']:>6} {tokens['input_tokens']:>10} {tokens['cached_tokens']:>10} "
+                f"{tokens['cache_hit_ratio']:>6.2f} {tokens.get('billed_input_tokens_per_quest', 0):>9.1f} "
+                f"{tokens.get('output_tokens_per_quest', 0):>9.1f}"
+            )
+
+    if report["structured_output"]:
+        print(f"\n{'output schema':<28} {'ok':>6} {'repaired':>9} {'failed':>7}")
+        for schema, counts in report["structured_output"].items():
+            print(f"{schema:<28} {counts['ok']:>6} {counts['repaired']:>9} {counts['failed']:>7}")
+
+
+def main(argv: List[str] = None):
+    args = parse_args(argv)
+    report = asyncio.run(run(args))
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}-{report['meta']['commit']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2, default=str) + "\n", encoding="utf-8")
+
+    print_summary(report)
+    print(f"\nResults saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
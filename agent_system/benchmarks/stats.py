@@ -0,0 +1,79 @@
+"""
+Benchmark statistics - Latency percentiles, throughput and memory snapshots
+"""
+import asyncio
+import math
+import resource
+import sys
+import time
+import tracemalloc
+from typing import Any, Awaitable, Callable, Dict, Iterable, List
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def max_rss_mb() -> float:
+    """Peak resident set size of this process so far"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def summarize(latencies: List[float], wall_seconds: float, errors: int = 0) -> Dict[str, Any]:
+    """p50/p95/p99 in milliseconds plus throughput over the wall time"""
+    values = sorted(latencies)
+    return {
+        "operations": len(values),
+        "errors": errors,
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_per_second": round(len(values) / wall_seconds, 2) if wall_seconds > 0 else None,
+        "latency_ms": {
+            "mean": round(sum(values) / len(values) * 1000, 2) if values else 0.0,
+            "p50": round(percentile(values, 0.50) * 1000, 2),
+            "p95": round(percentile(values, 0.95) * 1000, 2),
+            "p99": round(percentile(values, 0.99) * 1000, 2),
+            "max": round(values[-1] * 1000, 2) if values else 0.0,
+        },
+    }
+
+
+async def measure(
+    operations: Iterable[Callable[[], Awaitable[Any]]],
+    concurrency: int = 1,
+    trace_memory: bool = False,
+) -> Dict[str, Any]:
+    """Run the operations with bounded concurrency and summarize latency, throughput and memory"""
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    latencies: List[float] = []
+    errors = 0
+
+    async def timed(operation):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await operation()
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    if trace_memory:
+        tracemalloc.start()
+    rss_before = max_rss_mb()
+    start = time.perf_counter()
+    await asyncio.gather(*(timed(operation) for operation in operations))
+    wall_seconds = time.perf_counter() - start
+
+    result = summarize(latencies, wall_seconds, errors)
+    result["memory"] = {"max_rss_mb": round(max_rss_mb(), 1), "max_rss_growth_mb": round(max_rss_mb() - rss_before, 1)}
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result["memory"]["python_peak_mb"] = round(peak / (1024 * 1024), 1)
+    return result
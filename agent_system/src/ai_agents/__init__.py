@@ -1,13 +1,29 @@
 """
 AI Agents for Sports Quest System - New simple architecture
+
+The generator modules build their Agent objects and pull in the Agents and
+OpenAI SDKs at import time, so they are loaded on first attribute access
+rather than with the package: processes that only serve reads never pay for
+them.
 """
+import importlib
 
-from .individual_quest_generator import individual_quest_agent
-from .clash_quest_generator import clash_quest_agent
-from .collective_quest_generator import community_quest_agent
+_LAZY_EXPORTS = {
+    "individual_quest_agent": ".individual_quest_generator",
+    "clash_quest_agent": ".clash_quest_generator",
+    "community_quest_agent": ".collective_quest_generator",
+}
 
 __all__ = [
     "individual_quest_agent",
     "clash_quest_agent",
     "community_quest_agent"
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    if name not in _LAZY_EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
@@ -1,12 +1,39 @@
 """
 Générateur de Quêtes Individuelles - Approche Simple
-Logique : Agent search news → Generate list of quests based on content
+Logique : Research service news → Generate list of quests based on content
+
+Batched mode: several teams' news go into one request that returns quests
+keyed by team. Batches are cut on a token budget, a failed batch is split in
+half and retried, and teams still missing afterwards get a per-team call.
 """
-from agents import Agent, WebSearchTool, Runner
+import asyncio
+import os
+from agents import Agent, ModelSettings
 from pydantic import BaseModel
-from typing import List
+from typing import AsyncIterator, Dict, List, Tuple
 from loguru import logger
 from ..tools.database_tools import create_quest
+from ..tools.structured_output import ArrayItemStream, TolerantOutputSchema
+from ..services.research_service import research_service
+from ..core.instrumentation import run_agent, stream_agent
+from ..core.metrics import metrics_registry
+from ..core.tracing import traced
+from .quest_prompts import (
+    BATCH_INDIVIDUAL_INSTRUCTIONS, INDIVIDUAL_INSTRUCTIONS,
+    batch_individual_input, estimate_tokens, individual_input
+)
+
+
+# Teams per batched request, and the token budget for their news (the shared instructions come on top)
+BATCH_MAX_TEAMS = int(os.getenv("INDIVIDUAL_BATCH_MAX_TEAMS", "8"))
+BATCH_MAX_INPUT_TOKENS = int(os.getenv("INDIVIDUAL_BATCH_MAX_INPUT_TOKENS", "12000"))
+BATCH_CONCURRENCY = int(os.getenv("INDIVIDUAL_BATCH_CONCURRENCY", "4"))
+
+batch_generation_teams = metrics_registry.counter(
+    "quest_batch_generation_teams_total",
+    "Teams handled by batched individual generation (outcome: batched, fallback)",
+    ["outcome"],
+)
 
 
 class IndividualQuest(BaseModel):
@@ -17,155 +44,167 @@ class IndividualQuest(BaseModel):
     difficulty: str
 
 
-# Create search agent with WebSearchTool
-search_agent = Agent(
-    name="NewsSearchAgent",
-    instructions="""
-    You are a sports news research agent. Your job is to search for current, relevant football news.
-    
-    When given a team name, search for:
-    - Recent match results and upcoming fixtures
-    - Player transfers, injuries, and updates
-    - Team news and training updates
-    - Goals, records, and achievements
-    - Current season performance
-    
-    Focus on RECENT and SPECIFIC news (last 7 days preferred).
-    Return comprehensive news content that can be used for quest generation.
-    
-    Search thoroughly and return detailed, current information.
-    """,
-    tools=[WebSearchTool()],
-    output_type=str
+class IndividualQuestList(BaseModel):
+    """Réponse du générateur individuel"""
+    quests: List[IndividualQuest]
+
+
+class TeamQuests(BaseModel):
+    """Quêtes d'une équipe dans une réponse groupée"""
+    key: str
+    quests: List[IndividualQuest]
+
+
+class BatchIndividualQuests(BaseModel):
+    """Réponse du générateur groupé, une entrée par clé d'équipe"""
+    teams: List[TeamQuests]
+
+
+# Quest writer shared by all teams (must stay free of per-request text)
+individual_generation_agent = Agent(
+    name="SmartQuestGenerator",
+    instructions=INDIVIDUAL_INSTRUCTIONS,
+    output_type=TolerantOutputSchema(IndividualQuestList),
+    model_settings=ModelSettings(extra_args={"prompt_cache_key": "quest-generation-individual"})
 )
 
+# Same writer for several teams per call; answers with a JSON object keyed by team
+batch_generation_agent = Agent(
+    name="BatchQuestGenerator",
+    instructions=BATCH_INDIVIDUAL_INSTRUCTIONS,
+    output_type=TolerantOutputSchema(BatchIndividualQuests),
+    model_settings=ModelSettings(extra_args={"prompt_cache_key": "quest-generation-individual-batch"})
+)
+
+
+def fallback_team_news(team_name: str) -> str:
+    """Generic news used when research returns nothing"""
+    return f"Recent {team_name} updates: Team preparing for upcoming fixtures, player training updates, and fan engagement activities."
 
-async def agent_search(team_name: str) -> str:
-    """Use search agent to fetch news for a team"""
+
+@traced()
+async def fetch_teams_news(team_names: List[str]) -> Dict[str, str]:
+    """News per team from the research service (several teams per search, stored documents reused)"""
     try:
-        logger.info(f"🔍 Agent searching news for {team_name}")
-        
-        # Run the search agent
-        result = await Runner.run(
-            search_agent, 
-            input=f"Search for current football news about {team_name}. Focus on recent matches, transfers, player updates, and team news from the last week."
-        )
-        
-        if hasattr(result, 'final_output') and result.final_output:
-            news_content = str(result.final_output)
-            logger.success(f"✅ Agent found {len(news_content)} characters of news for {team_name}")
-            return news_content
-        else:
-            logger.warning(f"⚠️ Agent returned no news for {team_name}")
-            return f"Recent {team_name} updates: Team preparing for upcoming fixtures, player training updates, and fan engagement activities."
-            
+        news = await research_service.team_news(team_names)
     except Exception as e:
-        logger.error(f"❌ Agent search error for {team_name}: {e}")
-        return f"Recent {team_name} updates: Team preparing for upcoming fixtures, player training updates, and fan engagement activities."
+        logger.error(f"❌ Error fetching news for {len(team_names)} teams: {e}")
+        news = {}
+    found = sum(1 for content in news.values() if content)
+    logger.success(f"✅ News for {found}/{len(team_names)} teams")
+    return {team_name: news.get(team_name) or fallback_team_news(team_name) for team_name in team_names}
 
 
 async def fetch_team_news(team_name: str) -> str:
-    """Fetch real news for a specific team using agent search"""
+    """Fetch real news for a specific team from the research service"""
+    return (await fetch_teams_news([team_name]))[team_name]
+
+
+def plan_batches(
+    teams: List[Tuple[str, str]],
+    max_teams: int = BATCH_MAX_TEAMS,
+    max_input_tokens: int = BATCH_MAX_INPUT_TOKENS
+) -> List[List[Tuple[str, str]]]:
+    """Group (team_name, news_content) pairs into batches within the team count and token budget"""
+    batches: List[List[Tuple[str, str]]] = []
+    current: List[Tuple[str, str]] = []
+    current_tokens = 0
+    for team_name, news_content in teams:
+        tokens = estimate_tokens(individual_input(team_name, news_content))
+        if current and (len(current) >= max_teams or current_tokens + tokens > max_input_tokens):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append((team_name, news_content))
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+async def _run_batch(batch: List[Tuple[str, str]]) -> Dict[str, List[IndividualQuest]]:
+    """One batched request; teams without quests in the reply are left out of the result"""
+    keys = [f"t{index + 1}" for index in range(len(batch))]
+    result = await run_agent(
+        batch_generation_agent,
+        input=batch_individual_input([(key, team_name, news) for key, (team_name, news) in zip(keys, batch)])
+    )
+
+    if not isinstance(result.final_output, BatchIndividualQuests):
+        raise ValueError("no output in batched response")
+
+    team_names = dict(zip(keys, (team_name for team_name, _ in batch)))
+    return {
+        team_names[entry.key]: entry.quests
+        for entry in result.final_output.teams
+        if entry.key in team_names and entry.quests
+    }
+
+
+async def _generate_batch(batch: List[Tuple[str, str]], limiter: asyncio.Semaphore) -> Dict[str, List[IndividualQuest]]:
+    """Run a batch; on failure (context overflow, unusable output) split it in half and retry"""
     try:
-        # Use agent_search instead of direct WebSearchTool call
-        news_content = await agent_search(team_name)
-        return news_content
-        
+        async with limiter:
+            return await _run_batch(batch)
     except Exception as e:
-        logger.error(f"❌ Error fetching news for {team_name}: {e}")
-        return f"Recent {team_name} updates: Team preparing for upcoming fixtures, player training updates, and fan engagement activities."
+        if len(batch) == 1:
+            logger.warning(f"⚠️ Batched generation failed for {batch[0][0]}: {e}")
+            return {}
+        logger.warning(f"⚠️ Batched generation failed for {len(batch)} teams, splitting: {e}")
+        middle = len(batch) // 2
+        left, right = await asyncio.gather(
+            _generate_batch(batch[:middle], limiter),
+            _generate_batch(batch[middle:], limiter)
+        )
+        return {**left, **right}
+
+
+@traced()
+async def generate_individual_quests_batch(teams: List[Tuple[str, str]]) -> Dict[str, List[IndividualQuest]]:
+    """Generate individual quests for several (team_name, news_content) pairs with batched calls"""
+    if not teams:
+        return {}
+
+    limiter = asyncio.Semaphore(BATCH_CONCURRENCY)
+    batches = plan_batches(teams)
+    logger.info(f"🧠 Batched generation: {len(teams)} teams in {len(batches)} requests")
+
+    quests_by_team: Dict[str, List[IndividualQuest]] = {}
+    for batch_result in await asyncio.gather(*(_generate_batch(batch, limiter) for batch in batches)):
+        quests_by_team.update(batch_result)
+
+    # Per-team calls for whatever the batches did not cover
+    missing = [(team_name, news) for team_name, news in teams if team_name not in quests_by_team]
+    if missing:
+        logger.info(f"🔄 Falling back to per-team generation for {len(missing)} teams")
+
+        async def generate_one(team_name: str, news_content: str):
+            async with limiter:
+                return team_name, await generate_individual_quests(team_name, news_content)
 
+        for team_name, quests in await asyncio.gather(*(generate_one(name, news) for name, news in missing)):
+            quests_by_team[team_name] = quests
 
+    batch_generation_teams.inc(len(teams) - len(missing), outcome="batched")
+    batch_generation_teams.inc(len(missing), outcome="fallback")
+    logger.success(f"✅ Batched generation: {sum(len(q) for q in quests_by_team.values())} quests for {len(teams)} teams")
+    return quests_by_team
+
+
+@traced()
 async def generate_individual_quests(team_name: str, news_content: str) -> List[IndividualQuest]:
     """Generate smart individual quests using agent with news analysis"""
     try:
-        from agents import Agent, Runner
-        
         logger.info(f"🧠 Using smart agent to generate quests for {team_name}")
         logger.info(f"📰 News content length: {len(news_content)} characters")
         
-        # Create smart quest agent with system prompt containing the news
-        smart_agent = Agent(
-            name="SmartQuestGenerator",
-            instructions=f"""
-            You are generating individual football fan quests for {team_name} based on REAL current news.
-            
-            CURRENT NEWS TO ANALYZE:
-            {news_content}
-            
-            Based on this news content, analyze for specific events (goals, transfers, matches, injuries, records, etc.) and generate 2-3 engaging quests that reference these REAL events.
-            
-            Available actions for quests:
-            - Tweet about specific events/players (if social media)
-            - Retweet official content with comments (if social media)
-            - Follow official team accounts on Twitter (if social media)
-            - Watch match highlights or team videos
-            - Read articles about the team/players
-            - Celebrate team victories in your own way
-            - Support the team during matches
-            - Learn about team history or players
-            - Engage with team content online
-            
-            IMPORTANT: If the action involves social media posting/sharing, use ONLY Twitter.
-            
-            Quest creation rules:
-            1. Write immersive descriptions like a Community Manager would
-            2. Reference specific players, scores, opponents, dates from the news
-            3. Keep it simple: maximum 1-2 concrete actions only
-            4. Use engaging, storytelling language that connects fans emotionally
-            5. Make it feel like exclusive insider content
-            
-            Return exactly 2-3 quests in this JSON format:
-            [
-              {{
-                "title": "🎯 Engaging Quest Title",
-                "description": "Immersive, well-written description that tells a story and mentions specific news context. Then clearly state: Complete this quest by [1-2 simple actions]. Join the conversation and show your passion!",
-                "target_value": 2,
-                "difficulty": "easy"
-              }}
-            ]
-            
-            Generate the quests now based on the news content provided above.
-            """
-        )
+        # Static instructions, team and news in the input: every call shares the cached prompt prefix
+        result = await run_agent(individual_generation_agent, input=individual_input(team_name, news_content))
         
-        # Run the agent with minimal input since news is in system instructions
-        result = await Runner.run(smart_agent, input=f"Generate individual quests for {team_name}")
-        
-        if hasattr(result, 'final_output') and result.final_output:
-            # Parse the JSON response from the agent
-            import json
-            try:
-                # Get the response text
-                response_text = str(result.final_output)
-                logger.info(f"🔍 Agent response for {team_name}: {response_text[:200]}...")
-                
-                # Try to find and parse JSON
-                import re
-                json_match = re.search(r'\[.*\]', response_text, re.DOTALL)
-                if json_match:
-                    json_str = json_match.group(0)
-                    quest_data = json.loads(json_str)
-                    
-                    # Convert to IndividualQuest objects
-                    quests = []
-                    for quest in quest_data:
-                        quests.append(IndividualQuest(
-                            title=quest.get('title', f'📱 {team_name} Fan Quest'),
-                            description=quest.get('description', f'Support {team_name}!'),
-                            target_value=quest.get('target_value', 3),
-                            difficulty=quest.get('difficulty', 'easy')
-                        ))
-                    
-                    logger.success(f"✅ Smart agent generated {len(quests)} quests for {team_name}")
-                    return quests
-                else:
-                    logger.warning(f"⚠️ No JSON found in agent response for {team_name}")
-                    return []
-                    
-            except json.JSONDecodeError as e:
-                logger.error(f"❌ JSON parsing error for {team_name}: {e}")
-                return []
+        # Validated against IndividualQuestList by the output schema (malformed JSON is repaired there)
+        if isinstance(result.final_output, IndividualQuestList):
+            quests = result.final_output.quests
+            logger.success(f"✅ Smart agent generated {len(quests)} quests for {team_name}")
+            return quests
         else:
             logger.warning(f"⚠️ Smart agent returned no output for {team_name}")
             return []
@@ -174,16 +213,45 @@ async def generate_individual_quests(team_name: str, news_content: str) -> List[
         logger.error(f"❌ Error with smart agent for {team_name}: {e}")
         # Fallback to simple quest generation
         logger.info(f"🔄 Falling back to simple quest generation for {team_name}")
-        
-        quest = IndividualQuest(
-            title=f"🏆 {team_name} Inside Story",
-            description=f"Step into the heart of {team_name}'s journey this season. Every match tells a story, every player has a moment to shine. As a true supporter, you're part of this incredible narrative. Complete this quest by tweeting one message about what makes {team_name} special to you. Your voice matters in our community!",
-            target_value=1,
-            difficulty="easy"
-        )
-        return [quest]
+        return [fallback_individual_quest(team_name)]
+
+
+def fallback_individual_quest(team_name: str) -> IndividualQuest:
+    """Generic quest used when the generator fails"""
+    return IndividualQuest(
+        title=f"🏆 {team_name} Inside Story",
+        description=f"Step into the heart of {team_name}'s journey this season. Every match tells a story, every player has a moment to shine. As a true supporter, you're part of this incredible narrative. Complete this quest by tweeting one message about what makes {team_name} special to you. Your voice matters in our community!",
+        target_value=1,
+        difficulty="easy"
+    )
+
+
+async def stream_individual_quests(team_name: str, news_content: str) -> AsyncIterator[IndividualQuest]:
+    """Like generate_individual_quests, but yields each quest as soon as the model has written it"""
+    emitted = 0
+    items = ArrayItemStream()
+    try:
+        async for kind, payload in stream_agent(individual_generation_agent, input=individual_input(team_name, news_content)):
+            if kind == "delta":
+                for item in items.feed(payload):
+                    try:
+                        quest = IndividualQuest.model_validate(item)
+                    except ValueError:
+                        continue
+                    emitted += 1
+                    yield quest
+            elif isinstance(payload, IndividualQuestList):
+                # Anything the incremental reader could not use (e.g. repaired output)
+                for quest in payload.quests[emitted:]:
+                    emitted += 1
+                    yield quest
+    except Exception as e:
+        logger.error(f"❌ Streaming generation error for {team_name}: {e}")
+        if not emitted:
+            yield fallback_individual_quest(team_name)
 
 
+@traced()
 async def save_individual_quests(team_id: int, team_name: str, quests: List[IndividualQuest]) -> str:
     """Save individual quests to database"""
     try:
@@ -1,33 +1,112 @@
 """
 Sports Quest AI Backend API - Main FastAPI application
 """
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Response
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.ext.asyncio import AsyncSession
 from contextlib import asynccontextmanager
-import uvicorn
 import os
 from dotenv import load_dotenv
 
-from ..models.database import init_db, get_db
-from .routes import users, teams, quests, events, sync, espn
+from ..models.database import init_db, get_db, engine
+from ..core.metrics import metrics_registry, PROMETHEUS_CONTENT_TYPE
+from ..core.instrumentation import PrometheusMiddleware, install_sqlalchemy_instrumentation
+from ..core.tracing import TracingMiddleware
+from ..core.loop_monitor import loop_monitor
+from ..core.offload import cpu_offload
+from ..core.response_cache import ResponseCacheMiddleware, response_cache, install_cache_invalidation
+from ..services.mission_feed import mission_feed
+from ..services.leaderboard import leaderboard_service
+from ..services.progress_ingestion import progress_ingestor
+from ..services.quest_lifecycle import quest_lifecycle
+from ..services.quest_fanout import quest_fanout
+from ..services.league_registry import league_registry
+from ..services.event_scheduler import start_event_scheduler, stop_event_scheduler
+from ..core.service_role import service_role, runs
+from .routes import users, teams, quests, events, sync, espn, debug, feed, leaderboard, progress, new_quest_generation
 
 load_dotenv()
 
 
+async def run_startup_tasks():
+    """Schema, indexes, cache generation rows, league registry seed and inbox backfill; app.py runs this once before starting workers"""
+    await init_db()
+    await response_cache.ensure_generation_rows()
+    await league_registry.ensure_defaults()
+    await quest_fanout.backfill_inboxes()
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Initialize database on startup
-    await init_db()
+    # Initialize database on startup (unless the launcher already did it for all workers)
+    if os.getenv("STARTUP_TASKS_DONE") != "1":
+        await run_startup_tasks()
+    
+    # Measure event loop lag and report code that blocks the loop
+    await loop_monitor.start()
+    
+    # Offload pool for CPU-bound steps of the API roles (feed snapshots, scoreboard parsing)
+    if runs("read") or runs("write"):
+        await cpu_offload.start()
+    
+    # League and team mappings for the ESPN endpoints and the scheduler
+    if runs("write") or runs("worker"):
+        await league_registry.load()
+    
+    if runs("write"):
+        # Coalesce quest progress events into bulk writes
+        await progress_ingestor.start()
+    
+    if runs("worker"):
+        # Activate and expire quests on their start and end times
+        await quest_lifecycle.start()
+        
+        # Poll ESPN on the elected leader (or on every shard worker), see ENABLE_EVENT_SCHEDULER
+        await start_event_scheduler()
     
-    # Start event scheduler on startup (disabled to avoid rate limiting)
-    # from ..services.event_scheduler import start_event_scheduler, stop_event_scheduler
-    # await start_event_scheduler()
+    if runs("read"):
+        # Build the mission feed snapshot and keep it fresh
+        await mission_feed.start()
+        
+        # Load XP rankings from the ledger
+        await leaderboard_service.start()
+        
+        # Follow cache generations bumped by syncs in other processes
+        await response_cache.start()
     
     yield
     
-    # Stop event scheduler on shutdown
-    # await stop_event_scheduler()
+    await stop_event_scheduler()
+    await progress_ingestor.stop()
+    await quest_lifecycle.stop()
+    await mission_feed.stop()
+    await leaderboard_service.stop()
+    await response_cache.stop()
+    await cpu_offload.stop()
+    await loop_monitor.stop()
+
+
+def include_role_routers(app: FastAPI, role: str):
+    """Mount the routers served by a SERVICE_ROLE (all, api-read, api-write, worker)"""
+    if runs("read", role):
+        app.include_router(users.router, prefix="/api/users", tags=["users"])
+        app.include_router(teams.router, prefix="/api/teams", tags=["teams"])  
+        app.include_router(quests.router, prefix="/api/quests", tags=["quests"])
+        app.include_router(events.router, prefix="/api/events", tags=["events"])
+        app.include_router(feed.router, prefix="/api/feed", tags=["feed"])
+        app.include_router(leaderboard.router, prefix="/api/leaderboard", tags=["leaderboard"])
+    
+    if runs("write", role):
+        app.include_router(quests.generation_router, prefix="/api/quests", tags=["quests"])
+        app.include_router(leaderboard.write_router, prefix="/api/leaderboard", tags=["leaderboard"])
+        app.include_router(progress.router, prefix="/api/progress", tags=["progress"])
+        app.include_router(sync.router, prefix="/api/sync", tags=["sync"])
+        app.include_router(espn.router, tags=["espn"])
+        
+        # New simple quest generation
+        app.include_router(new_quest_generation.router, prefix="/api/quests/new", tags=["new-quests"])
+    
+    app.include_router(debug.router, prefix="/debug", tags=["debug"])
 
 
 app = FastAPI(
@@ -37,6 +116,10 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Catalog responses (teams, events) from memory until a write bumps their generation
+app.add_middleware(ResponseCacheMiddleware)
+install_cache_invalidation()
+
 # CORS configuration
 app.add_middleware(
     CORSMiddleware,
@@ -46,17 +129,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Include routers
-app.include_router(users.router, prefix="/api/users", tags=["users"])
-app.include_router(teams.router, prefix="/api/teams", tags=["teams"])  
-app.include_router(quests.router, prefix="/api/quests", tags=["quests"])
-app.include_router(events.router, prefix="/api/events", tags=["events"])
-app.include_router(sync.router, prefix="/api/sync", tags=["sync"])
-app.include_router(espn.router, tags=["espn"])
+# Per-route latency histograms and DB query timings, exposed on /metrics
+app.add_middleware(PrometheusMiddleware)
+install_sqlalchemy_instrumentation(engine)
 
-# New simple quest generation
-from .routes import new_quest_generation
-app.include_router(new_quest_generation.router, prefix="/api/quests/new", tags=["new-quests"])
+# Trace runs of the generation pipelines (X-Run-Id header, /debug/runs/{id})
+app.add_middleware(TracingMiddleware)
+
+# Include the routers of this process's role
+include_role_routers(app, service_role())
 
 
 @app.get("/")
@@ -66,6 +147,7 @@ async def root():
         "message": "Sports Quest AI Backend API",
         "version": "1.0.0",
         "status": "running",
+        "role": service_role(),
         "agent_system": "OpenAI Agents Python"
     }
 
@@ -86,7 +168,15 @@ async def health_check(db: AsyncSession = Depends(get_db)):
         raise HTTPException(status_code=503, detail=f"Health check failed: {str(e)}")
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics endpoint"""
+    return Response(content=metrics_registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
 if __name__ == "__main__":
+    import uvicorn
+
     host = os.getenv("API_HOST", "0.0.0.0")
     port = int(os.getenv("API_PORT", 8000))
     
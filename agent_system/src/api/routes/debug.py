@@ -0,0 +1,58 @@
+"""
+Debug API endpoints - Trace timelines of recent pipeline runs, event loop health, coalesced generation calls, research documents
+"""
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
+from ...core.tracing import trace_store
+from ...core.loop_monitor import loop_monitor
+from ...core.offload import cpu_offload
+from ...core.single_flight import single_flight
+from ...services.research_service import research_service
+
+router = APIRouter()
+
+
+@router.get("/runs")
+async def list_runs():
+    """List the most recent traced runs, newest first"""
+    return {"runs": trace_store.list_runs()}
+
+
+@router.get("/runs/{run_id}")
+async def get_run(run_id: str, format: str = "json"):
+    """Stage breakdown of one run; format=text renders a waterfall, format=otlp the raw spans"""
+    run = trace_store.get(run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Run not found")
+
+    if format == "text":
+        return PlainTextResponse(run.render_timeline())
+    if format == "otlp":
+        return run.to_otlp()
+    return run.breakdown()
+
+
+@router.get("/loop")
+async def loop_status():
+    """Event loop lag totals and CPU offload pool usage"""
+    return {"loop": loop_monitor.get_status(), "offload": cpu_offload.get_status()}
+
+
+@router.get("/single-flight")
+async def single_flight_status():
+    """Generation runs in flight and how many calls joined them"""
+    return single_flight.get_status()
+
+
+@router.get("/research")
+async def research_status():
+    """Cached research documents and how topics were served (memory, stored, joined, searched)"""
+    return research_service.get_status()
+
+
+@router.get("/research/{entity_type}/{entity_key}")
+async def research_documents(entity_type: str, entity_key: str):
+    """Research documents indexed under a team name, ESPN event id (fixture) or league code (competition)"""
+    if entity_type not in ("team", "fixture", "competition"):
+        raise HTTPException(status_code=400, detail="entity_type must be team, fixture or competition")
+    return {"documents": await research_service.documents_for(entity_type, entity_key)}
@@ -0,0 +1,44 @@
+"""
+Feed API endpoints - Precomputed mission feed for page loads (never starts agents)
+"""
+import json
+from typing import Optional
+from fastapi import APIRouter, Request, Response
+from ...services.mission_feed import mission_feed, etag_matches
+
+router = APIRouter()
+
+FEED_CACHE_CONTROL = "no-cache"  # always revalidate; unchanged feeds cost a 304
+
+
+@router.get("/missions")
+async def get_mission_feed(request: Request, team_id: Optional[int] = None):
+    """Active missions from the latest snapshot, optionally sliced to one team"""
+    snapshot, feed_slice = await mission_feed.get_slice(team_id)
+
+    if feed_slice is None:
+        body = json.dumps({
+            "version": snapshot.version,
+            "generated_at": snapshot.built_at.isoformat(),
+            "team_id": team_id,
+            "total": 0,
+            "missions": []
+        }).encode()
+        etag = f'"{snapshot.content_hash[:20]}:empty:{team_id}"'
+    else:
+        body, etag = feed_slice.body, feed_slice.etag
+
+    headers = {
+        "ETag": etag,
+        "Cache-Control": FEED_CACHE_CONTROL,
+        "X-Feed-Version": str(snapshot.version)
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("/status")
+async def get_feed_status():
+    """Snapshot version and size"""
+    return mission_feed.get_status()
@@ -0,0 +1,131 @@
+"""
+Leaderboard API endpoints - XP rankings and quest completion awards
+
+Rankings are reads (router); awards and winner snapshots write the ledger
+and the contract batches, so they are served by the write role (write_router).
+"""
+from datetime import datetime
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+from typing import Optional
+from sqlalchemy import select
+from ...models.database import async_session
+from ...models.quest import Quest, QuestStatus, QuestType
+from ...models.quest_assignment import QuestAssignment
+from ...models.user import User
+from ...services.leaderboard import leaderboard_service
+from ...services.winner_snapshot import winner_snapshot_service, CONTRACT_MAX_WINNERS
+
+router = APIRouter()
+write_router = APIRouter()
+
+
+class AwardRequest(BaseModel):
+    """Request model for awarding a quest completion"""
+    quest_id: int
+    user_id: Optional[int] = None
+    address: Optional[str] = None
+
+
+class SnapshotRequest(BaseModel):
+    """Request model for a period-end winner snapshot"""
+    label: Optional[str] = None
+    period_start: Optional[datetime] = None
+    period_end: Optional[datetime] = None
+    winner_count: Optional[int] = None
+
+
+@router.get("/top")
+async def get_top(limit: int = 10, offset: int = 0):
+    """Top of the leaderboard (limit capped at 100)"""
+    entries = await leaderboard_service.top(min(max(limit, 1), 100), max(offset, 0))
+    return {
+        "entries": await leaderboard_service.attach_addresses(entries),
+        "total_users": len(leaderboard_service.ranking)
+    }
+
+
+@router.get("/users/{user_id}")
+async def get_user_rank(user_id: int, radius: int = 5):
+    """Rank of a user and the players around them"""
+    entry = await leaderboard_service.rank_of(user_id)
+    if not entry:
+        raise HTTPException(status_code=404, detail="User has no XP yet")
+
+    around = await leaderboard_service.around(user_id, min(max(radius, 0), 50))
+    return {
+        "user": entry,
+        "around": await leaderboard_service.attach_addresses(around),
+        "total_users": len(leaderboard_service.ranking)
+    }
+
+
+@write_router.post("/award")
+async def award_quest_completion(request: AwardRequest):
+    """Record a completed quest in the XP ledger (idempotent per user and quest)"""
+    async with async_session() as session:
+        if request.user_id is not None:
+            user = (await session.execute(select(User).where(User.id == request.user_id))).scalar_one_or_none()
+        elif request.address:
+            user = (await session.execute(select(User).where(User.address == request.address))).scalar_one_or_none()
+        else:
+            raise HTTPException(status_code=400, detail="user_id or address is required")
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+
+        quest = (await session.execute(select(Quest).where(Quest.id == request.quest_id))).scalar_one_or_none()
+        if not quest:
+            raise HTTPException(status_code=404, detail="Quest not found")
+        if quest.user_id is not None and quest.user_id != user.id:
+            raise HTTPException(status_code=403, detail="Quest belongs to another user")
+        if quest.user_id is None and quest.quest_type != QuestType.COLLECTIVE:
+            # Team quests complete per fan, on the fan's inbox row
+            assignment = (await session.execute(
+                select(QuestAssignment).where(QuestAssignment.user_id == user.id, QuestAssignment.quest_id == quest.id)
+            )).scalar_one_or_none()
+            if not assignment:
+                raise HTTPException(status_code=403, detail="Quest is not in the user's inbox")
+            completed = assignment.completed_at is not None or (
+                quest.target_value is not None and assignment.progress >= quest.target_value
+            )
+        else:
+            completed = quest.status == QuestStatus.COMPLETED
+        if not completed:
+            raise HTTPException(status_code=409, detail="Quest is not completed")
+
+    amount = await leaderboard_service.award_quest_completion(user.id, quest)
+    return {
+        "awarded": amount is not None,
+        "xp": amount or 0,
+        "user": await leaderboard_service.rank_of(user.id)
+    }
+
+
+@write_router.post("/snapshot")
+async def create_winner_snapshot(request: SnapshotRequest):
+    """Snapshot the period winners and write setWinners batches for the contract scripts"""
+    if request.label and not request.label.replace("-", "").replace("_", "").isalnum():
+        raise HTTPException(status_code=400, detail="label may only contain letters, digits, - and _")
+    if request.winner_count is not None and not 1 <= request.winner_count <= 100 * CONTRACT_MAX_WINNERS:
+        raise HTTPException(status_code=400, detail="winner_count out of range")
+
+    snapshot = await winner_snapshot_service.create_snapshot(
+        label=request.label,
+        period_start=request.period_start,
+        period_end=request.period_end,
+        winner_count=request.winner_count
+    )
+    return {
+        "label": snapshot["label"],
+        "path": snapshot["path"],
+        "merkle_root": snapshot["merkle_root"],
+        "winners": [{key: value for key, value in winner.items() if key != "proof"} for winner in snapshot["winners"]],
+        "batches": [{key: value for key, value in batch.items() if key != "calldata"} for batch in snapshot["batches"]],
+        "skipped_invalid_addresses": snapshot["skipped_invalid_addresses"]
+    }
+
+
+@router.get("/status")
+async def get_leaderboard_status():
+    """Ranking size and ledger position"""
+    return {**leaderboard_service.get_status(), "snapshots": winner_snapshot_service.get_status()}
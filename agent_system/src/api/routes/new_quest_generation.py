@@ -2,21 +2,36 @@
 New Simple Quest Generation API
 Logique simple : Fetch content → Generate quests → Save to DB
 """
-from fastapi import APIRouter, HTTPException, Depends
+import asyncio
+import json
+import time
+from typing import Any, Dict
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from ...models.database import get_db
-from ...tools.database_tools import get_all_active_teams
+from ...core.single_flight import coalesce
+from ...tools.database_tools import check_team_exists, get_all_active_teams
 from loguru import logger
 
 router = APIRouter()
 
+# Keep proxies from buffering the event stream
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    """One Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
 
 @router.get("/individual")
-async def generate_individual_quests(db: AsyncSession = Depends(get_db)):
-    """Generate individual quests using simple approach"""
+@coalesce()
+async def generate_individual_quests(batch: bool = True, db: AsyncSession = Depends(get_db)):
+    """Generate individual quests using simple approach (several teams per model call unless batch=false)"""
     try:
         from ...ai_agents.individual_quest_generator import (
-            fetch_team_news, generate_individual_quests, save_individual_quests
+            fetch_teams_news, generate_individual_quests, generate_individual_quests_batch, save_individual_quests
         )
         
         # Get all teams
@@ -29,15 +44,22 @@ async def generate_individual_quests(db: AsyncSession = Depends(get_db)):
         results = []
         total_quests_created = 0
         
+        # Step 1: Fetch news (several teams per search, documents shared with the clash run)
+        news_by_team = await fetch_teams_news([team['name'] for team in all_teams])
+        
+        # Step 2: Generate quests (batched requests, per-team fallback inside)
+        quests_by_team = {}
+        if batch:
+            quests_by_team = await generate_individual_quests_batch(list(news_by_team.items()))
+        
         for team in all_teams:
             try:
                 logger.info(f"📝 Processing {team['name']}...")
                 
-                # Step 1: Fetch news
-                news_content = await fetch_team_news(team['name'])
-                
-                # Step 2: Generate quests
-                quests = await generate_individual_quests(team['name'], news_content)
+                if batch:
+                    quests = quests_by_team.get(team['name'], [])
+                else:
+                    quests = await generate_individual_quests(team['name'], news_by_team[team['name']])
                 
                 # Step 3: Save to database
                 if quests:
@@ -74,7 +96,7 @@ async def generate_individual_quests(db: AsyncSession = Depends(get_db)):
         
         return {
             "success": True,
-            "approach": "simple_individual_generation",
+            "approach": "batched_individual_generation" if batch else "simple_individual_generation",
             "total_teams": len(all_teams),
             "total_quests_created": total_quests_created,
             "results": results,
@@ -87,6 +109,7 @@ async def generate_individual_quests(db: AsyncSession = Depends(get_db)):
 
 
 @router.get("/test-individual/{team_name}")
+@coalesce()
 async def test_individual_for_team(team_name: str, db: AsyncSession = Depends(get_db)):
     """Test individual quest generation for a specific team"""
     try:
@@ -117,7 +140,57 @@ async def test_individual_for_team(team_name: str, db: AsyncSession = Depends(ge
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/test-individual/{team_name}/stream")
+async def stream_individual_for_team(team_name: str, request: Request, save: bool = False):
+    """
+    Server-Sent Events version of test-individual: "stage" events (searching,
+    generating, saving), one "quest" event per quest as soon as the model has
+    written it, then "done". The model run is cancelled if the client leaves.
+    """
+    from ...ai_agents.individual_quest_generator import (
+        fetch_team_news, save_individual_quests, stream_individual_quests
+    )
+
+    async def events():
+        start = time.perf_counter()
+
+        def elapsed_ms() -> int:
+            return round((time.perf_counter() - start) * 1000)
+
+        quests = []
+        try:
+            yield sse_event("stage", {"stage": "searching", "team": team_name})
+            news_content = await fetch_team_news(team_name)
+            if await request.is_disconnected():
+                return
+
+            yield sse_event("stage", {"stage": "generating", "news_content_length": len(news_content), "elapsed_ms": elapsed_ms()})
+            async for quest in stream_individual_quests(team_name, news_content):
+                quests.append(quest)
+                yield sse_event("quest", {"index": len(quests) - 1, "elapsed_ms": elapsed_ms(), **quest.model_dump()})
+
+            save_result = None
+            if save and quests:
+                yield sse_event("stage", {"stage": "saving", "elapsed_ms": elapsed_ms()})
+                team = await check_team_exists(team_name)
+                save_result = (
+                    await save_individual_quests(team["team_id"], team["name"], quests)
+                    if team["exists"] else f"ERROR|Team {team_name} not found"
+                )
+
+            yield sse_event("done", {"success": True, "team": team_name, "quests_generated": len(quests), "save_result": save_result, "elapsed_ms": elapsed_ms()})
+        except asyncio.CancelledError:
+            logger.info(f"🔌 Client left the individual quest stream for {team_name} after {len(quests)} quests")
+            raise
+        except Exception as e:
+            logger.error(f"❌ Stream error for {team_name}: {e}")
+            yield sse_event("error", {"detail": str(e)})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
 @router.get("/clash")
+@coalesce()
 async def generate_clash_quests(db: AsyncSession = Depends(get_db)):
     """Generate clash quests between team pairs"""
     try:
@@ -224,6 +297,7 @@ async def generate_clash_quests(db: AsyncSession = Depends(get_db)):
 
 
 @router.get("/test-clash/{team_a}/{team_b}")
+@coalesce()
 async def test_clash_for_teams(team_a: str, team_b: str, db: AsyncSession = Depends(get_db)):
     """Test clash quest generation for specific teams"""
     try:
@@ -274,7 +348,58 @@ async def test_clash_for_teams(team_a: str, team_b: str, db: AsyncSession = Depe
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/test-clash/{team_a}/{team_b}/stream")
+async def stream_clash_for_teams(team_a: str, team_b: str, request: Request, save: bool = False):
+    """Server-Sent Events version of test-clash (same events as the individual stream)"""
+    from ...ai_agents.clash_quest_generator import save_clash_quests, search_team_match, stream_clash_quests
+
+    async def events():
+        start = time.perf_counter()
+
+        def elapsed_ms() -> int:
+            return round((time.perf_counter() - start) * 1000)
+
+        quests = []
+        try:
+            yield sse_event("stage", {"stage": "searching", "team_a": team_a, "team_b": team_b})
+            match_content, match_exists = await search_team_match(team_a, team_b)
+            if not match_exists:
+                yield sse_event("done", {"success": False, "total_quests": 0, "message": f"No real match found between {team_a} and {team_b}, no clash quest generated", "elapsed_ms": elapsed_ms()})
+                return
+            if await request.is_disconnected():
+                return
+
+            yield sse_event("stage", {"stage": "generating", "match_content_length": len(match_content), "elapsed_ms": elapsed_ms()})
+            async for quest in stream_clash_quests(team_a, team_b, match_content):
+                quests.append(quest)
+                yield sse_event("quest", {"index": len(quests) - 1, "team": team_a if quest.team_side == "A" else team_b, "elapsed_ms": elapsed_ms(), **quest.model_dump()})
+
+            save_result = None
+            if save and quests:
+                yield sse_event("stage", {"stage": "saving", "elapsed_ms": elapsed_ms()})
+                team_a_info, team_b_info = await check_team_exists(team_a), await check_team_exists(team_b)
+                if team_a_info["exists"] and team_b_info["exists"]:
+                    save_result = await save_clash_quests(
+                        team_a_info["team_id"], team_b_info["team_id"], team_a_info["name"], team_b_info["name"],
+                        [quest for quest in quests if quest.team_side == "A"],
+                        [quest for quest in quests if quest.team_side != "A"]
+                    )
+                else:
+                    save_result = f"ERROR|Team {team_a if not team_a_info['exists'] else team_b} not found"
+
+            yield sse_event("done", {"success": True, "total_quests": len(quests), "save_result": save_result, "elapsed_ms": elapsed_ms()})
+        except asyncio.CancelledError:
+            logger.info(f"🔌 Client left the clash quest stream for {team_a} vs {team_b} after {len(quests)} quests")
+            raise
+        except Exception as e:
+            logger.error(f"❌ Stream error for {team_a} vs {team_b}: {e}")
+            yield sse_event("error", {"detail": str(e)})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
 @router.get("/collective")
+@coalesce()
 async def generate_collective_quest(db: AsyncSession = Depends(get_db)):
     """Generate one community quest based on global football events"""
     try:
@@ -332,6 +457,7 @@ async def generate_collective_quest(db: AsyncSession = Depends(get_db)):
 
 
 @router.get("/test-collective")
+@coalesce()
 async def test_collective_generation(db: AsyncSession = Depends(get_db)):
     """Test community quest generation without saving"""
     try:
@@ -0,0 +1,49 @@
+"""
+Progress API endpoints - Batched quest progress ingestion
+"""
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+from typing import List, Optional
+from ...services.progress_ingestion import progress_ingestor, ProgressEvent
+
+router = APIRouter()
+
+MAX_BATCH_EVENTS = 5000
+
+
+class ProgressEventRequest(BaseModel):
+    """One progress report (user by id or wallet address)"""
+    quest_id: int
+    delta: int = 1
+    user_id: Optional[int] = None
+    address: Optional[str] = None
+
+
+class ProgressBatchRequest(BaseModel):
+    """Request model for a batch of progress events"""
+    events: List[ProgressEventRequest]
+
+
+@router.post("/events", status_code=202)
+async def ingest_progress_events(request: ProgressBatchRequest, wait: bool = False):
+    """
+    Buffer progress events for the next coalesced flush. With wait=true the
+    response is sent after the flush that wrote them.
+    """
+    if len(request.events) > MAX_BATCH_EVENTS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_EVENTS} events per batch")
+
+    counts = progress_ingestor.submit([
+        ProgressEvent(quest_id=event.quest_id, delta=event.delta, user_id=event.user_id, address=event.address)
+        for event in request.events
+    ])
+    response = {**counts, "pending_events": progress_ingestor.pending_events}
+    if wait and counts["accepted"]:
+        response["flush"] = await progress_ingestor.wait_for_flush()
+    return response
+
+
+@router.get("/status")
+async def get_progress_status():
+    """Buffer size and flush totals"""
+    return progress_ingestor.get_status()
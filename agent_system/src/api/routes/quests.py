@@ -10,12 +10,17 @@ from typing import List, Optional
 from datetime import datetime
 from ...models.database import get_db
 from ...models.quest import Quest, QuestType, QuestStatus
+from ...models.quest_assignment import QuestAssignment
 from ...models.team import Team
 from ...models.user import User
+from ...services.quest_lifecycle import quest_lifecycle
+from ...core.single_flight import coalesce
 import json
 from loguru import logger
 
 router = APIRouter()
+# Agent runs and bulk writes: mounted by the api-write role only (see core.service_role)
+generation_router = APIRouter()
 
 # Include ultra-simple generation
 from .simple_quest_generation import router as simple_router
@@ -112,29 +117,48 @@ async def get_all_quests(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/lifecycle/status")
+async def get_lifecycle_status():
+    """Scheduled start/end transitions and sweep totals"""
+    return quest_lifecycle.get_status()
+
+
 @router.get("/{user_id}")
 async def get_user_quests(
     user_id: int,
     status: Optional[str] = None,
     quest_type: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
     db: AsyncSession = Depends(get_db)
 ):
-    """Fetch user-specific quests"""
+    """Fetch user-specific quests (the user's inbox: personal quests and quests of followed teams)"""
     try:
-        stmt = select(Quest).options(selectinload(Quest.team)).where(Quest.user_id == user_id)
+        stmt = (
+            select(Quest, QuestAssignment.progress, QuestAssignment.completed_at)
+            .join(QuestAssignment, QuestAssignment.quest_id == Quest.id)
+            .options(selectinload(Quest.team))
+            .where(QuestAssignment.user_id == user_id)
+        )
         
         if status:
             stmt = stmt.where(Quest.status == QuestStatus(status))
         if quest_type:
             stmt = stmt.where(Quest.quest_type == QuestType(quest_type))
             
+        # Newest first, walking the (user_id, quest_id) inbox index backwards
+        stmt = stmt.order_by(QuestAssignment.quest_id.desc()).offset(skip).limit(limit)
+        
         result = await db.execute(stmt)
-        quests = result.scalars().all()
+        quests = result.all()
         
         quest_data = []
         total_xp_available = 0
         
-        for quest in quests:
+        for quest, own_progress, completed_at in quests:
+            # Team quests are counted and completed per fan; show this user's own run
+            per_fan = quest.user_id is None and quest.quest_type != QuestType.COLLECTIVE
+            quest_status = QuestStatus.COMPLETED if per_fan and completed_at else quest.status
             # Extract rewards and XP from metadata
             metadata = json.loads(quest.quest_metadata) if quest.quest_metadata else {}
             rewards = metadata.get("rewards", {})
@@ -151,11 +175,11 @@ async def get_user_quests(
                 "title": quest.title,
                 "description": quest.description,
                 "quest_type": quest.quest_type.value,
-                "status": quest.status.value,
+                "status": quest_status.value,
                 "team_name": quest.team.name if quest.team else "Unknown Team",
                 "target_metric": quest.target_metric,
                 "target_value": quest.target_value,
-                "current_progress": quest.current_progress,
+                "current_progress": own_progress if per_fan else quest.current_progress,
                 "xp_reward": xp_reward,
                 "points_reward": points_reward,
                 "badges": badges,
@@ -186,7 +210,7 @@ class QuestGenerationRequest(BaseModel):
     event_id: Optional[int] = None
 
 
-@router.get("/test/individual")
+@generation_router.get("/test/individual")
 async def test_individual_agent(db: AsyncSession = Depends(get_db)):
     """Test individual quest agent"""
     try:
@@ -209,7 +233,7 @@ async def test_individual_agent(db: AsyncSession = Depends(get_db)):
         return {"success": False, "error": str(e), "traceback": traceback.format_exc()}
 
 
-@router.get("/test/clash")
+@generation_router.get("/test/clash")
 async def test_clash_agent(db: AsyncSession = Depends(get_db)):
     """Test clash quest agent"""
     try:
@@ -232,7 +256,7 @@ async def test_clash_agent(db: AsyncSession = Depends(get_db)):
         return {"success": False, "error": str(e), "traceback": traceback.format_exc()}
 
 
-@router.get("/test/collective")
+@generation_router.get("/test/collective")
 async def test_collective_agent(db: AsyncSession = Depends(get_db)):
     """Test collective quest agent"""
     try:
@@ -255,7 +279,7 @@ async def test_collective_agent(db: AsyncSession = Depends(get_db)):
         return {"success": False, "error": str(e), "traceback": traceback.format_exc()}
 
 
-@router.get("/test/research")
+@generation_router.get("/test/research")
 async def test_research_orchestrator(db: AsyncSession = Depends(get_db)):
     """Test football research orchestrator with sub-agents"""
     try:
@@ -278,7 +302,7 @@ async def test_research_orchestrator(db: AsyncSession = Depends(get_db)):
         return {"success": False, "error": str(e), "traceback": traceback.format_exc()}
 
 
-@router.get("/test/orchestrator")
+@generation_router.get("/test/orchestrator")
 async def test_orchestrator_agent(db: AsyncSession = Depends(get_db)):
     """Test quest orchestrator agent"""
     try:
@@ -301,7 +325,7 @@ async def test_orchestrator_agent(db: AsyncSession = Depends(get_db)):
         return {"success": False, "error": str(e), "traceback": traceback.format_exc()}
 
 
-@router.delete("/purge")
+@generation_router.delete("/purge")
 async def purge_all_quests(db: AsyncSession = Depends(get_db)):
     """Purge all existing quests from database"""
     try:
@@ -322,7 +346,8 @@ async def purge_all_quests(db: AsyncSession = Depends(get_db)):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/generate/simple")
+@generation_router.get("/generate/simple")
+@coalesce()
 async def generate_simple_quests(db: AsyncSession = Depends(get_db)):
     """Generate quests using simple direct approach"""
     try:
@@ -431,7 +456,8 @@ async def generate_simple_quests(db: AsyncSession = Depends(get_db)):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/generate/all")
+@generation_router.get("/generate/all")
+@coalesce()
 async def generate_all_quests(db: AsyncSession = Depends(get_db)):
     """Generate all types of quests using new simple architecture"""
     try:
@@ -449,7 +475,7 @@ async def generate_all_quests(db: AsyncSession = Depends(get_db)):
         # Generate Individual Quests
         logger.info(f"📝 Step 1: Generating Individual Quests...")
         try:
-            individual_result = await new_quest_generation.generate_individual_quests(db)
+            individual_result = await new_quest_generation.generate_individual_quests(db=db)
             results["individual"] = individual_result
             if individual_result.get("success"):
                 total_quests_created += individual_result.get("total_quests_created", 0)
@@ -685,7 +711,7 @@ async def generate_all_quests(db: AsyncSession = Depends(get_db)):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/generate")
+@generation_router.post("/generate")
 async def generate_quest(
     request: QuestGenerationRequest,
     db: AsyncSession = Depends(get_db)
@@ -11,6 +11,7 @@ from ...models.database import get_db, async_session
 from ...models.user import User
 from ...models.user_team import UserTeam
 from ...models.team import Team
+from ...services.quest_fanout import quest_fanout
 import json
 
 router = APIRouter()
@@ -235,6 +236,10 @@ async def add_team_trigger(
         
         await db.commit()
         
+        # New followers get the team's open quests in their inbox
+        if not existing:
+            await quest_fanout.assign_open_team_quests(user_id, team_preference.team_id)
+        
         return {
             "message": "Team trigger added successfully",
             "user_id": user_id,
@@ -7,6 +7,7 @@ from ..models.team import Team
 from ..models.user import User
 from ..models.event import SportsEvent
 from ..models.user_team import UserTeam
+from ..services.quest_fanout import quest_fanout
 from datetime import datetime, timedelta
 import json
 
@@ -169,7 +170,10 @@ async def create_user_team_preferences():
                 session.add(user_team)
         
         await session.commit()
-        print("Created user-team preferences")
+        
+    # Followers see their teams' open quests
+    await quest_fanout.backfill_inboxes()
+    print("Created user-team preferences")
 
 
 async def initialize_sample_data():
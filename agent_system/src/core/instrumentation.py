@@ -0,0 +1,223 @@
+"""
+Instrumentation - Request latency middleware, agent run timing, ESPN and DB query metrics
+"""
+import time
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+from loguru import logger
+from sqlalchemy import event
+from .metrics import metrics_registry
+from .tracing import span
+
+
+http_request_duration = metrics_registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+)
+http_requests_in_progress = metrics_registry.gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being served",
+    ["method"],
+)
+agent_run_duration = metrics_registry.histogram(
+    "agent_run_duration_seconds",
+    "Runner.run duration per agent",
+    ["agent", "outcome"],
+)
+agent_tokens = metrics_registry.counter(
+    "agent_tokens_total",
+    "LLM tokens used per agent (kind: input, cached_input, output)",
+    ["agent", "kind"],
+)
+agent_prompt_cache_ratio = metrics_registry.histogram(
+    "agent_prompt_cache_ratio",
+    "Share of input tokens served from the provider prompt cache, per run",
+    ["agent"],
+    buckets=(0.0, 0.1, 0.25, 0.5, 0.75, 0.9, 1.0),
+)
+agent_llm_requests = metrics_registry.counter(
+    "agent_llm_requests_total",
+    "LLM API requests made per agent",
+    ["agent"],
+)
+espn_request_duration = metrics_registry.histogram(
+    "espn_request_duration_seconds",
+    "ESPN API HTTP request latency",
+    ["resource", "outcome"],
+)
+db_query_duration = metrics_registry.histogram(
+    "db_query_duration_seconds",
+    "Database statement latency (the _count series is the query count)",
+    ["operation"],
+)
+
+
+def route_template(scope) -> str:
+    """
+    Route label for a request: the template of the matched route, so
+    /api/teams/3 and /api/teams/4 share one series. Responses served by the
+    response cache never reach the router and use the name of their cache rule.
+    """
+    route = scope.get("route")
+    if route is None:
+        return scope.get("cache_route", "unmatched")
+    return getattr(route, "path", None) or scope.get("path", "")
+
+
+class PrometheusMiddleware:
+    """ASGI middleware recording per-route latency histograms"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope.get("method", "GET")
+        status_holder = {"status": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_holder["status"] = message["status"]
+            await send(message)
+
+        http_requests_in_progress.inc(method=method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_progress.dec(method=method)
+            http_request_duration.observe(
+                time.perf_counter() - start,
+                method=method,
+                route=route_template(scope),
+                status=str(status_holder["status"]),
+            )
+
+
+def usage_summary(result: Any) -> Optional[Dict[str, Any]]:
+    """Token usage of a finished run, with the prompt cache hit ratio"""
+    usage = getattr(getattr(result, "context_wrapper", None), "usage", None)
+    if usage is None:
+        return None
+
+    input_tokens = usage.input_tokens or 0
+    cached = getattr(getattr(usage, "input_tokens_details", None), "cached_tokens", 0) or 0
+    return {
+        "requests": usage.requests or 0,
+        "input_tokens": input_tokens,
+        "cached_input_tokens": cached,
+        "output_tokens": usage.output_tokens or 0,
+        "cache_hit_ratio": round(cached / input_tokens, 3) if input_tokens else 0.0,
+    }
+
+
+def record_agent_usage(agent_name: str, result: Any) -> Optional[Dict[str, Any]]:
+    """Add the token usage of a finished run to the agent counters and return it"""
+    summary = usage_summary(result)
+    if summary is None:
+        return None
+
+    agent_tokens.inc(summary["input_tokens"], agent=agent_name, kind="input")
+    agent_tokens.inc(summary["cached_input_tokens"], agent=agent_name, kind="cached_input")
+    agent_tokens.inc(summary["output_tokens"], agent=agent_name, kind="output")
+    agent_llm_requests.inc(summary["requests"], agent=agent_name)
+    if summary["input_tokens"]:
+        agent_prompt_cache_ratio.observe(summary["cache_hit_ratio"], agent=agent_name)
+    return summary
+
+
+async def run_agent(agent, input: Any, **kwargs):
+    """Runner.run with duration and token usage recorded per agent and traced as a span"""
+    from agents import Runner
+
+    agent_name = getattr(agent, "name", "unknown")
+    start = time.perf_counter()
+    outcome = "error"
+    with span("agent.run", agent=agent_name) as run_span:
+        try:
+            result = await Runner.run(agent, input=input, **kwargs)
+            outcome = "ok"
+            summary = record_agent_usage(agent_name, result)
+            if summary:
+                logger.debug(
+                    f"🧮 {agent_name}: {summary['input_tokens']} input tokens "
+                    f"({summary['cached_input_tokens']} cached, {summary['cache_hit_ratio']:.0%}), "
+                    f"{summary['output_tokens']} output tokens"
+                )
+                if run_span:
+                    for key in ("input_tokens", "cached_input_tokens", "output_tokens", "cache_hit_ratio"):
+                        run_span.set_attribute(key, summary[key])
+            return result
+        finally:
+            agent_run_duration.observe(time.perf_counter() - start, agent=agent_name, outcome=outcome)
+
+
+async def stream_agent(agent, input: Any, **kwargs) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Runner.run_streamed with the same metrics as run_agent. Yields ("delta",
+    text) for each chunk of model output, then ("final", final_output). When
+    the consumer stops early (client gone, task cancelled) the run is
+    cancelled instead of being left to finish in the background.
+    """
+    from agents import Runner
+
+    agent_name = getattr(agent, "name", "unknown")
+    start = time.perf_counter()
+    outcome = "error"
+    result = Runner.run_streamed(agent, input=input, **kwargs)
+    try:
+        async for stream_event in result.stream_events():
+            if stream_event.type == "raw_response_event" and getattr(stream_event.data, "type", "") == "response.output_text.delta":
+                yield "delta", stream_event.data.delta
+        outcome = "ok"
+        record_agent_usage(agent_name, result)
+        yield "final", result.final_output
+    finally:
+        if not result.is_complete:
+            result.cancel()
+            outcome = "cancelled" if outcome == "error" else outcome
+        agent_run_duration.observe(time.perf_counter() - start, agent=agent_name, outcome=outcome)
+
+
+def observe_espn_request(endpoint: str, duration: float, outcome: str):
+    """Record one ESPN HTTP call; the resource label drops ids to keep cardinality low"""
+    resource = "scoreboard" if endpoint.endswith("scoreboard") else "teams"
+    espn_request_duration.observe(duration, resource=resource, outcome=outcome)
+
+
+def _statement_operation(statement: Optional[str]) -> str:
+    """First SQL keyword of a statement (SELECT, INSERT, ...)"""
+    if not statement or not statement.strip():
+        return "OTHER"
+    keyword = statement.lstrip().split(None, 1)[0].upper()
+    return keyword if keyword in ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH") else "OTHER"
+
+
+def install_sqlalchemy_instrumentation(engine):
+    """Time every statement executed through the (async) engine"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if getattr(sync_engine, "_query_metrics_installed", False):
+        return
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("query_start_time")
+        if not starts:
+            return
+        db_query_duration.observe(time.perf_counter() - starts.pop(), operation=_statement_operation(statement))
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _handle_error(exception_context):
+        conn = exception_context.connection
+        starts = conn.info.get("query_start_time") if conn is not None else None
+        if starts:
+            db_query_duration.observe(time.perf_counter() - starts.pop(), operation="ERROR")
+
+    sync_engine._query_metrics_installed = True
@@ -0,0 +1,107 @@
+"""
+Event loop monitor - Loop lag histogram and stack traces of blocking code
+
+A sampler task sleeps for a fixed interval and records how late it wakes up
+(event_loop_lag_seconds). A watchdog thread checks the sampler's heartbeat:
+when the loop has not come back within LOOP_BLOCK_THRESHOLD seconds it logs
+the loop thread's current stack, once per stall, which shows the synchronous
+code that holds the loop.
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from typing import Any, Dict, Optional
+from loguru import logger
+from .metrics import metrics_registry
+
+
+event_loop_lag = metrics_registry.histogram(
+    "event_loop_lag_seconds",
+    "How late the loop monitor's timer fired (time the loop spent on other work)",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+event_loop_blocked = metrics_registry.counter(
+    "event_loop_blocked_total",
+    "Stalls of the event loop longer than LOOP_BLOCK_THRESHOLD",
+)
+
+
+class LoopLagMonitor:
+    """Measures event loop lag and reports what blocks the loop"""
+
+    def __init__(self):
+        self.enabled = os.getenv("LOOP_MONITOR_ENABLED", "true").lower() == "true"
+        self.interval = float(os.getenv("LOOP_LAG_INTERVAL", "0.1"))
+        self.block_threshold = float(os.getenv("LOOP_BLOCK_THRESHOLD", "0.1"))
+        self.stack_depth = int(os.getenv("LOOP_BLOCK_STACK_DEPTH", "12"))
+        # time.monotonic() at which the sampler is next expected to run
+        self.expected_at = 0.0
+        self.loop_thread_id: Optional[int] = None
+        self.sample_task: Optional[asyncio.Task] = None
+        self.watchdog: Optional[threading.Thread] = None
+        self.stopping = threading.Event()
+        self.totals = {"samples": 0, "blocked": 0, "max_lag_seconds": 0.0}
+
+    async def start(self):
+        """Start the sampler task and the watchdog thread"""
+        if not self.enabled or self.sample_task:
+            return
+        self.loop_thread_id = threading.get_ident()
+        self.expected_at = time.monotonic() + self.interval
+        self.stopping.clear()
+        self.sample_task = asyncio.create_task(self._sample_loop())
+        self.watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self.watchdog.start()
+        logger.info(f"🩺 Event loop monitor started (blocking threshold {self.block_threshold * 1000:.0f} ms)")
+
+    async def stop(self):
+        """Stop sampling"""
+        self.stopping.set()
+        if self.sample_task:
+            self.sample_task.cancel()
+            try:
+                await self.sample_task
+            except asyncio.CancelledError:
+                pass
+            self.sample_task = None
+        self.watchdog = None
+
+    async def _sample_loop(self):
+        while True:
+            self.expected_at = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.monotonic() - self.expected_at)
+            event_loop_lag.observe(lag)
+            self.totals["samples"] += 1
+            self.totals["max_lag_seconds"] = max(self.totals["max_lag_seconds"], round(lag, 4))
+
+    def _watch(self):
+        reported = None
+        while not self.stopping.wait(self.block_threshold / 2):
+            expected_at = self.expected_at
+            stalled = time.monotonic() - expected_at
+            if stalled < self.block_threshold or expected_at == reported:
+                continue
+            reported = expected_at
+            event_loop_blocked.inc()
+            self.totals["blocked"] += 1
+            frame = sys._current_frames().get(self.loop_thread_id)
+            stack = "".join(traceback.format_stack(frame, limit=self.stack_depth)) if frame else "(no frame)\n"
+            logger.warning(f"🐢 Event loop blocked for more than {stalled * 1000:.0f} ms, loop thread is at:\n{stack.rstrip()}")
+
+    def get_status(self) -> Dict[str, Any]:
+        """Monitor settings and totals"""
+        return {
+            "enabled": self.enabled,
+            "running": self.sample_task is not None,
+            "interval_seconds": self.interval,
+            "block_threshold_seconds": self.block_threshold,
+            **self.totals,
+        }
+
+
+# Global service instance
+loop_monitor = LoopLagMonitor()
@@ -0,0 +1,117 @@
+"""
+CPU offload - Shared process pool for CPU-bound steps that would stall the event loop
+
+Pure functions with small, picklable inputs and outputs (serializing the
+mission feed snapshot, decoding large ESPN scoreboards into event lists) run
+in worker processes, so a 10 ms build no longer delays every concurrent
+request. Functions are marked with @cpu_bound; their modules are imported once
+in the forkserver, so pool processes start without re-importing the app.
+OFFLOAD_PROCESSES=0 runs the same calls in the default thread pool instead.
+"""
+import asyncio
+import functools
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional, Set
+from loguru import logger
+from .metrics import metrics_registry
+
+
+offload_duration = metrics_registry.histogram(
+    "cpu_offload_duration_seconds",
+    "Duration of CPU-bound calls, including the round trip to the pool (mode: process, thread, inline)",
+    ["function", "mode"],
+)
+
+
+class CPUOffload:
+    """Runs CPU-bound functions off the event loop"""
+
+    def __init__(self):
+        self.processes = int(os.getenv("OFFLOAD_PROCESSES", "2"))
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.preload_modules: Set[str] = set()
+        self.warmup: Optional[asyncio.Future] = None
+        self.totals = {"process": 0, "thread": 0, "inline": 0, "pool_restarts": 0}
+
+    def _executor(self) -> Optional[Executor]:
+        if self.processes <= 0:
+            return None  # loop default (thread) executor
+        if self.pool is None:
+            if os.name == "posix":
+                # forkserver: children do not inherit the parent's threads, sockets and loop state
+                context = multiprocessing.get_context("forkserver")
+                context.set_forkserver_preload(sorted(self.preload_modules))
+            else:
+                context = multiprocessing.get_context("spawn")
+            self.pool = ProcessPoolExecutor(max_workers=self.processes, mp_context=context)
+            logger.info(f"🧵 CPU offload pool started with {self.processes} processes")
+        return self.pool
+
+    async def start(self):
+        """Start the pool processes in the background so the first offloaded call does not wait for them"""
+        executor = self._executor()
+        if executor is None or self.warmup:
+            return
+        loop = asyncio.get_running_loop()
+        self.warmup = asyncio.gather(*(loop.run_in_executor(executor, os.getpid) for _ in range(self.processes)))
+
+    async def run(self, fn: Callable[..., Any], *args: Any, inline: bool = False) -> Any:
+        """
+        fn(*args) in the pool. fn must be a module-level function; pass
+        inline=True for inputs too small to be worth the round trip.
+        """
+        name = getattr(fn, "__name__", "unknown")
+        mode = "inline" if inline else ("process" if self.processes > 0 else "thread")
+        start = time.perf_counter()
+        try:
+            if inline:
+                return fn(*args)
+            loop = asyncio.get_running_loop()
+            call = functools.partial(fn, *args)
+            for _ in range(2):
+                executor = self._executor()
+                try:
+                    return await loop.run_in_executor(executor, call)
+                except BrokenProcessPool:
+                    # A worker died (OOM kill, crash); reap the pool, retry once in a fresh one
+                    logger.error(f"❌ CPU offload pool broke while running {name}; restarting it")
+                    await self._discard(executor)
+            # Broke a second pool: give up on processes for this call, but keep it off the loop
+            mode = "thread"
+            return await loop.run_in_executor(None, call)
+        finally:
+            self.totals[mode] += 1
+            offload_duration.observe(time.perf_counter() - start, function=name, mode=mode)
+
+    async def _discard(self, pool: Executor):
+        """Drop a broken pool and wait for its processes to exit (the next call starts a new one)"""
+        if self.pool is not pool:
+            return  # another call already replaced it
+        self.pool = None
+        self.totals["pool_restarts"] += 1
+        await asyncio.get_running_loop().run_in_executor(None, functools.partial(pool.shutdown, wait=True, cancel_futures=True))
+
+    async def stop(self):
+        """Shut the pool down (running calls finish, queued ones are dropped)"""
+        self.warmup = None
+        if self.pool is not None:
+            pool, self.pool = self.pool, None
+            await asyncio.get_running_loop().run_in_executor(None, functools.partial(pool.shutdown, wait=True, cancel_futures=True))
+
+    def get_status(self) -> dict:
+        """Pool size and calls per mode"""
+        return {"processes": self.processes, "pool_running": self.pool is not None, **self.totals}
+
+
+# Global service instance
+cpu_offload = CPUOffload()
+
+
+def cpu_bound(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Mark a module-level function as run through cpu_offload; its module is preloaded in the pool"""
+    cpu_offload.preload_modules.add(fn.__module__)
+    return fn
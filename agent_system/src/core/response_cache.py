@@ -0,0 +1,335 @@
+"""
+Response cache - In-process cache of catalog GET responses with generation-based invalidation
+
+Team and event listings only change when a sync (or another write) touches
+the teams or sports_events tables. Responses of the routes in cache_rules() are
+kept per normalized URL for a per-route TTL. Every entry is keyed by the
+generation of the namespaces it depends on, so a write makes the old entries
+unreachable at once instead of waiting for the TTL:
+
+- Session hooks see flushed Team/SportsEvent objects and bulk UPDATE/INSERT/
+  DELETE statements on their tables, bump cache_generations.<namespace> in the
+  same transaction and the local generation once it commits.
+- Other processes (api-write runs the syncs, api-read serves the reads) poll
+  cache_generations every RESPONSE_CACHE_SYNC_INTERVAL seconds.
+
+Responses carry an ETag and Cache-Control; If-None-Match answers 304.
+"""
+import asyncio
+import hashlib
+import os
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+from loguru import logger
+from sqlalchemy import event, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.datastructures import Headers
+from ..models.database import async_session
+from ..models.cache_generation import CacheGeneration
+from .metrics import metrics_registry
+
+
+cache_requests = metrics_registry.counter(
+    "response_cache_requests_total",
+    "Cacheable requests by route and outcome (hit, miss, not_modified, uncacheable)",
+    ["route", "outcome"],
+)
+cache_invalidations = metrics_registry.counter(
+    "response_cache_invalidations_total",
+    "Generation bumps per namespace (source: local write, remote process)",
+    ["namespace", "source"],
+)
+
+# Tables whose writes invalidate a cache namespace
+TABLE_NAMESPACES = {"teams": "teams", "sports_events": "events"}
+
+
+def make_etag(payload: bytes) -> str:
+    return '"' + hashlib.sha1(payload).hexdigest()[:20] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True if an If-None-Match header value covers the given ETag (weak comparison)"""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def normalize_query(query_string: bytes) -> str:
+    """Query string with empty parameters dropped and the rest sorted, so equivalent URLs share an entry"""
+    params = parse_qsl(query_string.decode("latin-1"), keep_blank_values=False)
+    return urlencode(sorted(params))
+
+
+@dataclass
+class CacheRule:
+    """A cached route: path pattern, TTL and the namespaces its data comes from"""
+    name: str
+    pattern: "re.Pattern[str]"
+    ttl: float
+    namespaces: Tuple[str, ...]
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    content_type: str
+    etag: str
+    expires_at: float
+
+
+def cache_rules() -> List[CacheRule]:
+    teams_ttl = float(os.getenv("RESPONSE_CACHE_TEAMS_TTL", "300"))
+    events_ttl = float(os.getenv("RESPONSE_CACHE_EVENTS_TTL", "60"))
+    return [
+        CacheRule("/api/teams/", re.compile(r"^/api/teams/$"), teams_ttl, ("teams",)),
+        CacheRule("/api/teams/{team_id}", re.compile(r"^/api/teams/\d+$"), teams_ttl, ("teams",)),
+        CacheRule("/api/teams/exists/{team_name}", re.compile(r"^/api/teams/exists/[^/]+$"), teams_ttl, ("teams",)),
+        # Events embed team names; the quests_generated count of an event may lag by up to the TTL
+        CacheRule("/api/events/", re.compile(r"^/api/events/$"), events_ttl, ("events", "teams")),
+        CacheRule("/api/events/{event_id}", re.compile(r"^/api/events/\d+$"), events_ttl, ("events", "teams")),
+    ]
+
+
+class ResponseCache:
+    """Catalog response cache with per-namespace generation counters"""
+
+    def __init__(self):
+        self.enabled = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+        self.max_entries = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "2000"))
+        self.sync_interval = float(os.getenv("RESPONSE_CACHE_SYNC_INTERVAL", "2"))
+        self.cache_control = os.getenv("RESPONSE_CACHE_CONTROL", "no-cache")  # clients revalidate; unchanged data costs a 304
+        self.rules = cache_rules()
+        self.entries: "OrderedDict[Tuple[Any, ...], CachedResponse]" = OrderedDict()
+        # Local generation per namespace; only ever moves forward
+        self.generations: Dict[str, int] = {namespace: 0 for namespace in set(TABLE_NAMESPACES.values())}
+        # Last value seen in cache_generations, to notice bumps made by other processes
+        self.stored_generations: Dict[str, int] = {}
+        self.sync_task: Optional[asyncio.Task] = None
+
+    def match(self, path: str) -> Optional[CacheRule]:
+        for rule in self.rules:
+            if rule.pattern.match(path):
+                return rule
+        return None
+
+    def key(self, rule: CacheRule, path: str, query_string: bytes) -> Tuple[Any, ...]:
+        return (path, normalize_query(query_string), tuple(self.generations[namespace] for namespace in rule.namespaces))
+
+    def get(self, key: Tuple[Any, ...]) -> Optional[CachedResponse]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key: Tuple[Any, ...], rule: CacheRule, body: bytes, content_type: str) -> CachedResponse:
+        entry = CachedResponse(body=body, content_type=content_type, etag=make_etag(body), expires_at=time.monotonic() + rule.ttl)
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return entry
+
+    def bump(self, namespace: str, source: str = "local"):
+        """Make every entry that depends on the namespace unreachable"""
+        self.generations[namespace] = self.generations.get(namespace, 0) + 1
+        cache_invalidations.inc(namespace=namespace, source=source)
+
+    def clear(self):
+        self.entries.clear()
+
+    async def ensure_generation_rows(self):
+        """Create the cache_generations rows the write hooks update"""
+        async with async_session() as session:
+            existing = set((await session.execute(select(CacheGeneration.namespace))).scalars())
+            for namespace in sorted(set(TABLE_NAMESPACES.values()) - existing):
+                session.add(CacheGeneration(namespace=namespace, generation=0))
+            try:
+                await session.commit()
+            except IntegrityError:
+                await session.rollback()  # another process created them first
+
+    async def sync_generations(self):
+        """Bump local generations for namespaces written by other processes"""
+        async with async_session() as session:
+            rows = (await session.execute(select(CacheGeneration.namespace, CacheGeneration.generation))).all()
+        for namespace, generation in rows:
+            previous = self.stored_generations.get(namespace)
+            self.stored_generations[namespace] = generation
+            if previous is not None and generation != previous:
+                self.bump(namespace, source="remote")
+
+    async def start(self):
+        """Load the stored generations and follow them in the background"""
+        if not self.enabled or self.sync_task:
+            return
+        try:
+            await self.sync_generations()
+        except Exception as e:
+            logger.error(f"Initial cache generation load failed: {e}")
+        self.sync_task = asyncio.create_task(self._sync_loop())
+        logger.info(f"🗃️ Response cache enabled for {len(self.rules)} routes")
+
+    async def stop(self):
+        """Stop following stored generations"""
+        if self.sync_task:
+            self.sync_task.cancel()
+            try:
+                await self.sync_task
+            except asyncio.CancelledError:
+                pass
+            self.sync_task = None
+
+    async def _sync_loop(self):
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await self.sync_generations()
+            except Exception as e:
+                logger.error(f"Cache generation sync failed: {e}")
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "generations": dict(self.generations),
+            "routes": {rule.name: rule.ttl for rule in self.rules},
+        }
+
+
+# Global service instance
+response_cache = ResponseCache()
+
+
+class ResponseCacheMiddleware:
+    """ASGI middleware serving the cache_rules() routes from the response cache"""
+
+    def __init__(self, app, cache: Optional[ResponseCache] = None):
+        self.app = app
+        self.cache = cache or response_cache
+
+    async def __call__(self, scope, receive, send):
+        rule = None
+        if scope["type"] == "http" and scope["method"] == "GET" and self.cache.enabled:
+            rule = self.cache.match(scope["path"])
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+
+        # Hits are answered before routing: give the latency middleware the rule's route template
+        scope["cache_route"] = rule.name
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        key = self.cache.key(rule, scope["path"], scope.get("query_string", b""))
+        entry = self.cache.get(key)
+        if entry is not None:
+            outcome = "not_modified" if etag_matches(if_none_match, entry.etag) else "hit"
+            cache_requests.inc(route=rule.name, outcome=outcome)
+            await self._send_entry(send, entry, not_modified=outcome == "not_modified", cache_status="HIT")
+            return
+
+        # Miss: buffer the response so it can be stored and sent with its ETag
+        start_message: Dict[str, Any] = {}
+        chunks: List[bytes] = []
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                start_message.update(message)
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, capture)
+
+        response_headers = Headers(raw=start_message.get("headers", []))
+        if start_message.get("status") != 200 or "set-cookie" in response_headers:
+            cache_requests.inc(route=rule.name, outcome="uncacheable")
+            await send(start_message)
+            await send({"type": "http.response.body", "body": b"".join(chunks)})
+            return
+
+        entry = self.cache.put(key, rule, b"".join(chunks), response_headers.get("content-type", "application/json"))
+        cache_requests.inc(route=rule.name, outcome="miss")
+        await self._send_entry(send, entry, not_modified=etag_matches(if_none_match, entry.etag), cache_status="MISS")
+
+    async def _send_entry(self, send, entry: CachedResponse, not_modified: bool, cache_status: str):
+        headers = [
+            (b"etag", entry.etag.encode()),
+            (b"cache-control", self.cache.cache_control.encode()),
+            (b"x-cache", cache_status.encode()),
+        ]
+        if not_modified:
+            await send({"type": "http.response.start", "status": 304, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        headers += [
+            (b"content-type", entry.content_type.encode()),
+            (b"content-length", str(len(entry.body)).encode()),
+        ]
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": entry.body})
+
+
+def _session_namespaces(session: Session) -> set:
+    return session.info.setdefault("cache_namespaces", set())
+
+
+def _bump_stored_generation(session: Session, namespace: str):
+    """Bump cache_generations.<namespace> once per transaction, in that transaction"""
+    namespaces = _session_namespaces(session)
+    if namespace in namespaces:
+        return
+    namespaces.add(namespace)
+    session.connection().execute(
+        update(CacheGeneration.__table__)
+        .where(CacheGeneration.__table__.c.namespace == namespace)
+        .values(generation=CacheGeneration.__table__.c.generation + 1)
+    )
+
+
+def _after_flush(session: Session, flush_context):
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        table = getattr(getattr(instance, "__table__", None), "name", None)
+        if table in TABLE_NAMESPACES and (instance not in session.dirty or session.is_modified(instance)):
+            _bump_stored_generation(session, TABLE_NAMESPACES[table])
+
+
+def _do_orm_execute(orm_execute_state):
+    if not (orm_execute_state.is_update or orm_execute_state.is_insert or orm_execute_state.is_delete):
+        return None
+    table = getattr(getattr(orm_execute_state.statement, "table", None), "name", None)
+    if table not in TABLE_NAMESPACES:
+        return None
+    result = orm_execute_state.invoke_statement()
+    # rowcount is -1 when the driver cannot tell; treat that as a change
+    if getattr(result, "rowcount", -1) != 0:
+        _bump_stored_generation(orm_execute_state.session, TABLE_NAMESPACES[table])
+    return result
+
+
+def _after_commit(session: Session):
+    for namespace in session.info.pop("cache_namespaces", ()):
+        response_cache.bump(namespace)
+
+
+def _after_rollback(session: Session):
+    session.info.pop("cache_namespaces", None)
+
+
+def install_cache_invalidation():
+    """Bump cache generations from every Session that writes teams or sports_events"""
+    if event.contains(Session, "after_commit", _after_commit):
+        return
+    event.listen(Session, "after_flush", _after_flush)
+    event.listen(Session, "do_orm_execute", _do_orm_execute)
+    event.listen(Session, "after_commit", _after_commit)
+    event.listen(Session, "after_rollback", _after_rollback)
@@ -0,0 +1,38 @@
+"""
+Service roles - Which routers and background services a process runs
+
+SERVICE_ROLE splits one deployment into separately scaled processes, so
+minutes-long agent runs and ESPN syncs never share an event loop with the
+interactive endpoints:
+
+    all        everything in one process (default)
+    api-read   interactive endpoints: teams, quest and event reads, feed,
+               leaderboard rankings and user preferences
+    api-write  quest generation, ESPN sync and the other ESPN-backed routes,
+               progress ingestion, XP awards and winner snapshots
+    worker     background loops (quest lifecycle, event scheduler); only /health
+               and /metrics
+"""
+import os
+from typing import Dict, FrozenSet, Optional
+
+
+ROLE_COMPONENTS: Dict[str, FrozenSet[str]] = {
+    "all": frozenset({"read", "write", "worker"}),
+    "api-read": frozenset({"read"}),
+    "api-write": frozenset({"write"}),
+    "worker": frozenset({"worker"}),
+}
+
+
+def service_role() -> str:
+    """Role of this process from SERVICE_ROLE"""
+    role = os.getenv("SERVICE_ROLE", "all").strip().lower() or "all"
+    if role not in ROLE_COMPONENTS:
+        raise ValueError(f"Unknown SERVICE_ROLE {role!r} (expected one of {', '.join(ROLE_COMPONENTS)})")
+    return role
+
+
+def runs(component: str, role: Optional[str] = None) -> bool:
+    """Whether a process with this role (default: the current one) runs a component: read, write or worker"""
+    return component in ROLE_COMPONENTS[role or service_role()]
@@ -0,0 +1,138 @@
+"""
+Single flight - Coalesces identical concurrent calls into one computation
+
+Generation routes start agent runs that cost seconds and LLM tokens. When
+several clients hit the same route with the same parameters at once, the
+first call runs and the others wait for its result. A finished result is
+also served for SINGLE_FLIGHT_RESULT_TTL seconds, so a burst that arrives
+just after completion does not start the same run again. Failures are shared
+with the callers already waiting but never kept.
+
+Coalescing is per process: api-write workers each run at most one copy.
+The shared computation opens its own DB session: a request-scoped session is
+closed when that request ends, while the run and the other callers go on.
+"""
+import asyncio
+import functools
+import inspect
+import json
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+from loguru import logger
+from .metrics import metrics_registry
+from ..models.database import async_session
+
+
+single_flight_calls = metrics_registry.counter(
+    "single_flight_calls_total",
+    "Coalesced calls by outcome (leader: ran the computation, shared: joined a running one, recent: served a finished result)",
+    ["name", "outcome"],
+)
+
+
+class SingleFlight:
+    """In-flight computations and recently finished results, by key"""
+
+    def __init__(self):
+        self.enabled = os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() == "true"
+        self.result_ttl = float(os.getenv("SINGLE_FLIGHT_RESULT_TTL", "10"))
+        self.inflight: Dict[str, asyncio.Task] = {}
+        # key -> (time.monotonic() at completion, result)
+        self.recent: Dict[str, Tuple[float, Any]] = {}
+        self.totals = {"leader": 0, "shared": 0, "recent": 0}
+
+    def _count(self, name: str, outcome: str):
+        self.totals[outcome] += 1
+        single_flight_calls.inc(name=name, outcome=outcome)
+
+    def _prune(self, now: float):
+        expired = [key for key, (finished_at, _) in self.recent.items() if now - finished_at > self.result_ttl]
+        for key in expired:
+            del self.recent[key]
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]], name: str = "call") -> Any:
+        """
+        Result of fn() for this key, shared with every concurrent caller.
+        The computation runs in its own task: a caller that disconnects does
+        not cancel it for the others.
+        """
+        if not self.enabled:
+            return await fn()
+
+        now = time.monotonic()
+        self._prune(now)
+        if key in self.recent:
+            self._count(name, "recent")
+            return self.recent[key][1]
+
+        task = self.inflight.get(key)
+        if task is None:
+            self._count(name, "leader")
+            task = asyncio.create_task(fn())
+            self.inflight[key] = task
+            task.add_done_callback(functools.partial(self._finished, key))
+        else:
+            self._count(name, "shared")
+            logger.info(f"🔗 Joining in-flight {name} run ({key})")
+        return await asyncio.shield(task)
+
+    def _finished(self, key: str, task: asyncio.Task):
+        if self.inflight.get(key) is task:
+            del self.inflight[key]
+        if not task.cancelled() and task.exception() is None and self.result_ttl > 0:
+            self.recent[key] = (time.monotonic(), task.result())
+
+    def forget(self, prefix: str = ""):
+        """Drop finished results (all of them, or those whose key starts with prefix)"""
+        for key in [key for key in self.recent if key.startswith(prefix)]:
+            del self.recent[key]
+
+    def get_status(self) -> Dict[str, Any]:
+        """Running computations, cached results and totals per outcome"""
+        self._prune(time.monotonic())
+        return {
+            "enabled": self.enabled,
+            "result_ttl_seconds": self.result_ttl,
+            "inflight": sorted(self.inflight),
+            "recent": len(self.recent),
+            **self.totals,
+        }
+
+
+# Global service instance
+single_flight = SingleFlight()
+
+
+def coalesce(exclude: Iterable[str] = ("db", "request")):
+    """
+    Run a route through single_flight, keyed by the function and its bound
+    arguments (defaults applied, so ?batch=true and no query share a key).
+    Dependencies such as the DB session are left out of the key; a `db`
+    argument is replaced by a session owned by the shared computation.
+    """
+    excluded = set(exclude)
+
+    def decorator(fn: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        signature = inspect.signature(fn)
+        name = fn.__name__
+
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            params = {k: v for k, v in bound.arguments.items() if k not in excluded}
+            key = f"{fn.__module__}.{name}:{json.dumps(params, sort_keys=True, default=str)}"
+
+            async def run() -> Any:
+                if "db" not in bound.arguments:
+                    return await fn(*bound.args, **bound.kwargs)
+                async with async_session() as db:
+                    bound.arguments["db"] = db
+                    return await fn(*bound.args, **bound.kwargs)
+
+            return await single_flight.do(key, run, name=name)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,288 @@
+"""
+Tracing - Per-run span timelines for quest generation pipelines
+
+Spans are exported as OTLP/JSON (one resourceSpans document per run), the
+format read by the OpenTelemetry collector file receiver, and kept in memory
+for the /debug/runs endpoints.
+"""
+import contextvars
+import functools
+import json
+import os
+import secrets
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from loguru import logger
+
+
+_current_run: contextvars.ContextVar[Optional["TraceRun"]] = contextvars.ContextVar("trace_run", default=None)
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("trace_span", default=None)
+
+
+class Span:
+    """One timed stage of a run"""
+
+    __slots__ = ("span_id", "parent_id", "name", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes
+        self.error: Optional[str] = None
+
+    @property
+    def duration_ms(self) -> float:
+        end_ns = self.end_ns or time.time_ns()
+        return (end_ns - self.start_ns) / 1e6
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+
+class TraceRun:
+    """All spans of one pipeline run (one trace)"""
+
+    def __init__(self, name: str, attributes: Dict[str, Any]):
+        self.run_id = secrets.token_hex(16)
+        self.name = name
+        self.attributes = attributes
+        self.spans: List[Span] = []
+        self.root: Optional[Span] = None
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """Encode the run as an OTLP/JSON resourceSpans document"""
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [_otlp_attribute("service.name", "sports-quest-ai")]},
+                "scopeSpans": [{
+                    "scope": {"name": "sports_quest.tracing"},
+                    "spans": [
+                        {
+                            "traceId": self.run_id,
+                            "spanId": span.span_id,
+                            "parentSpanId": span.parent_id or "",
+                            "name": span.name,
+                            "kind": 1,
+                            "startTimeUnixNano": str(span.start_ns),
+                            "endTimeUnixNano": str(span.end_ns or span.start_ns),
+                            "attributes": [_otlp_attribute(key, value) for key, value in span.attributes.items()],
+                            "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+                        }
+                        for span in self.spans
+                    ],
+                }],
+            }]
+        }
+
+    def breakdown(self) -> Dict[str, Any]:
+        """Stage breakdown: each span with its offset, duration, self time and depth"""
+        if not self.root:
+            return {"run_id": self.run_id, "name": self.name, "stages": []}
+
+        children: Dict[Optional[str], List[Span]] = {}
+        for span in self.spans:
+            children.setdefault(span.parent_id, []).append(span)
+
+        total_ms = self.root.duration_ms or 1e-9
+        stages = []
+
+        def visit(span: Span, depth: int):
+            child_ms = sum(child.duration_ms for child in children.get(span.span_id, []))
+            stages.append({
+                "name": span.name,
+                "depth": depth,
+                "offset_ms": round((span.start_ns - self.root.start_ns) / 1e6, 1),
+                "duration_ms": round(span.duration_ms, 1),
+                "self_ms": round(max(0.0, span.duration_ms - child_ms), 1),
+                "percent": round(span.duration_ms / total_ms * 100, 1),
+                "attributes": span.attributes,
+                "error": span.error,
+            })
+            for child in sorted(children.get(span.span_id, []), key=lambda item: item.start_ns):
+                visit(child, depth + 1)
+
+        visit(self.root, 0)
+
+        by_name: Dict[str, Dict[str, float]] = {}
+        for span in self.spans:
+            totals = by_name.setdefault(span.name, {"count": 0, "total_ms": 0.0})
+            totals["count"] += 1
+            totals["total_ms"] = round(totals["total_ms"] + span.duration_ms, 1)
+
+        return {
+            "run_id": self.run_id,
+            "name": self.name,
+            "attributes": self.attributes,
+            "started_at": datetime.fromtimestamp(self.root.start_ns / 1e9).isoformat(),
+            "total_ms": round(total_ms, 1),
+            "finished": self.root.end_ns is not None,
+            "stages": stages,
+            "by_stage": dict(sorted(by_name.items(), key=lambda item: -item[1]["total_ms"])),
+        }
+
+    def render_timeline(self, width: int = 50) -> str:
+        """Text waterfall of the run, one line per span"""
+        data = self.breakdown()
+        total_ms = data.get("total_ms") or 1
+        lines = [f"{data['name']}  run={self.run_id}  total={total_ms:.0f}ms"]
+        for stage in data["stages"]:
+            start = int(stage["offset_ms"] / total_ms * width)
+            length = max(1, int(stage["duration_ms"] / total_ms * width))
+            bar = " " * start + "█" * min(length, width - start)
+            label = "  " * stage["depth"] + stage["name"]
+            lines.append(f"{label:<40} |{bar:<{width}}| {stage['duration_ms']:>10.1f}ms {stage['percent']:>5.1f}%")
+        return "\n".join(lines)
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    """Encode one attribute as an OTLP AnyValue"""
+    if isinstance(value, bool):
+        encoded = {"boolValue": value}
+    elif isinstance(value, int):
+        encoded = {"intValue": str(value)}
+    elif isinstance(value, float):
+        encoded = {"doubleValue": value}
+    else:
+        encoded = {"stringValue": str(value)}
+    return {"key": key, "value": encoded}
+
+
+class TraceStore:
+    """Keeps the most recent runs in memory and exports finished ones"""
+
+    def __init__(self):
+        self.max_runs = int(os.getenv("TRACE_MAX_RUNS", "200"))
+        self.exporter = os.getenv("TRACE_EXPORTER", "console").lower()  # file, console or none
+        self.export_path = Path(os.getenv("TRACE_EXPORT_FILE", "logs/traces.jsonl"))
+        self.runs: "OrderedDict[str, TraceRun]" = OrderedDict()
+
+    def add(self, run: TraceRun):
+        self.runs[run.run_id] = run
+        while len(self.runs) > self.max_runs:
+            self.runs.popitem(last=False)
+
+    def get(self, run_id: str) -> Optional[TraceRun]:
+        return self.runs.get(run_id)
+
+    def list_runs(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "run_id": run.run_id,
+                "name": run.name,
+                "spans": len(run.spans),
+                "total_ms": round(run.root.duration_ms, 1) if run.root else None,
+                "finished": bool(run.root and run.root.end_ns),
+            }
+            for run in reversed(self.runs.values())
+        ]
+
+    def export(self, run: TraceRun):
+        """Write a finished run to the configured exporter"""
+        try:
+            if self.exporter == "file":
+                self.export_path.parent.mkdir(parents=True, exist_ok=True)
+                with self.export_path.open("a", encoding="utf-8") as handle:
+                    handle.write(json.dumps(run.to_otlp(), default=str) + "\n")
+            elif self.exporter == "console":
+                summary = ", ".join(f"{name}={totals['total_ms']:.0f}ms" for name, totals in run.breakdown()["by_stage"].items())
+                logger.info(f"🧭 Trace {run.name} ({run.run_id}): {summary}")
+        except Exception as e:
+            logger.warning(f"Could not export trace {run.run_id}: {e}")
+
+
+# Global trace store instance
+trace_store = TraceStore()
+
+
+def current_run() -> Optional[TraceRun]:
+    """Run of the current context, if any"""
+    return _current_run.get()
+
+
+@contextmanager
+def start_run(name: str, **attributes):
+    """Start a new trace; spans opened inside the context are attached to it"""
+    run = TraceRun(name, attributes)
+    root = Span(name, None, dict(attributes))
+    run.root = root
+    run.spans.append(root)
+    trace_store.add(run)
+
+    run_token = _current_run.set(run)
+    span_token = _current_span.set(root)
+    try:
+        yield run
+    except BaseException as e:
+        root.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        root.end_ns = time.time_ns()
+        _current_span.reset(span_token)
+        _current_run.reset(run_token)
+        trace_store.export(run)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Time a stage of the current run; does nothing outside a run"""
+    run = _current_run.get()
+    if run is None:
+        yield None
+        return
+
+    parent = _current_span.get()
+    current = Span(name, parent.span_id if parent else None, attributes)
+    run.spans.append(current)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.end_ns = time.time_ns()
+        _current_span.reset(token)
+
+
+def traced(name: Optional[str] = None):
+    """Decorator wrapping an async function in a span named after it"""
+    def decorator(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with span(span_name):
+                return await func(*args, **kwargs)
+
+        return wrapper
+    return decorator
+
+
+class TracingMiddleware:
+    """ASGI middleware starting a trace run for pipeline routes and returning its id in X-Run-Id"""
+
+    def __init__(self, app, path_prefixes: Optional[List[str]] = None):
+        self.app = app
+        prefixes = os.getenv("TRACE_PATH_PREFIXES", "/api/quests/new,/api/quests/generate")
+        self.path_prefixes = path_prefixes or [prefix.strip() for prefix in prefixes.split(",") if prefix.strip()]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not any(scope.get("path", "").startswith(prefix) for prefix in self.path_prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        with start_run(f"{scope.get('method', 'GET')} {scope['path']}") as run:
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    message.setdefault("headers", [])
+                    message["headers"] = list(message["headers"]) + [(b"x-run-id", run.run_id.encode())]
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
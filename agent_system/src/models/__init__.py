@@ -4,6 +4,12 @@ from .team import Team
 from .quest import Quest, QuestType, QuestStatus
 from .event import SportsEvent
 from .user_team import UserTeam
+from .scheduler_lease import SchedulerLease
+from .xp_ledger import XPLedgerEntry
+from .quest_assignment import QuestAssignment
+from .cache_generation import CacheGeneration
+from .league import League, LeagueTeam
+from .research_document import ResearchDocument, ResearchEntity
 
 __all__ = [
     "Base",
@@ -15,5 +21,13 @@ __all__ = [
     "QuestType",
     "QuestStatus", 
     "SportsEvent",
-    "UserTeam"
+    "UserTeam",
+    "SchedulerLease",
+    "XPLedgerEntry",
+    "QuestAssignment",
+    "CacheGeneration",
+    "League",
+    "LeagueTeam",
+    "ResearchDocument",
+    "ResearchEntity"
 ]
\ No newline at end of file
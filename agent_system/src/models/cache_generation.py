@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+from .database import Base
+
+
+class CacheGeneration(Base):
+    __tablename__ = "cache_generations"
+
+    namespace = Column(String(50), primary_key=True)  # e.g. "teams", "events"
+    generation = Column(Integer, nullable=False, default=0)  # bumped in the transaction that changes the data
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<CacheGeneration(namespace='{self.namespace}', generation={self.generation})>"
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey
+from sqlalchemy.sql import func
+from .database import Base
+
+
+class League(Base):
+    __tablename__ = "leagues"
+
+    code = Column(String(50), primary_key=True)  # ESPN league code, e.g. "eng.1"
+    name = Column(String(100), unique=True, nullable=False)  # e.g. "Premier League"
+    sport = Column(String(50), nullable=False, default="football")
+    is_active = Column(Boolean, default=True)  # polled by the event scheduler
+    max_polls_per_hour = Column(Integer, nullable=True)  # poll budget; None uses SCHEDULER_LEAGUE_POLL_BUDGET
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<League(code='{self.code}', name='{self.name}', active={self.is_active})>"
+
+
+class LeagueTeam(Base):
+    __tablename__ = "league_teams"
+
+    id = Column(Integer, primary_key=True, index=True)
+    team_name = Column(String(100), unique=True, nullable=False)  # name used by the quest generators
+    espn_id = Column(String(50), nullable=False, index=True)
+    league_code = Column(String(50), ForeignKey("leagues.code"), nullable=False)  # home league
+    is_active = Column(Boolean, default=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<LeagueTeam(team='{self.team_name}', espn_id='{self.espn_id}', league='{self.league_code}')>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Enum, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Enum, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from enum import Enum as PyEnum
@@ -22,6 +22,11 @@ class QuestStatus(PyEnum):
 
 class Quest(Base):
     __tablename__ = "quests"
+    __table_args__ = (
+        # Lifecycle sweeps and open-quest listings select by status and time
+        Index("ix_quests_status_end_time", "status", "end_time"),
+        Index("ix_quests_status_start_time", "status", "start_time"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(200), nullable=False)
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.sql import func
+from .database import Base
+
+
+class QuestAssignment(Base):
+    """A quest delivered to one user's inbox (team fan-out or personal quest)"""
+    __tablename__ = "quest_assignments"
+    __table_args__ = (
+        # Also the inbox index: a user's quests are one range read on (user_id, quest_id)
+        UniqueConstraint("user_id", "quest_id", name="uq_quest_assignments_user_quest"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    quest_id = Column(Integer, ForeignKey("quests.id"), nullable=False, index=True)
+    team_id = Column(Integer, ForeignKey("teams.id"), nullable=True)
+    # This user's progress on a team quest; personal and collective quests count on the quest row
+    progress = Column(Integer, nullable=False, default=0, server_default="0")
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<QuestAssignment(user_id={self.user_id}, quest_id={self.quest_id})>"
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from .database import Base
+
+
+class ResearchDocument(Base):
+    __tablename__ = "research_documents"
+
+    id = Column(Integer, primary_key=True, index=True)
+    topic_key = Column(String(64), unique=True, nullable=False)  # hash of scope, entities and day
+    scope = Column(String(20), nullable=False)  # "team", "fixture", "global"
+    title = Column(String(200), nullable=False)  # e.g. "Chelsea", "Chelsea vs Arsenal"
+    content = Column(Text, nullable=False)
+    fetched_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<ResearchDocument(scope='{self.scope}', title='{self.title}', expires_at='{self.expires_at}')>"
+
+
+class ResearchEntity(Base):
+    __tablename__ = "research_entities"
+    __table_args__ = (Index("ix_research_entities_entity", "entity_type", "entity_key"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    document_id = Column(Integer, ForeignKey("research_documents.id", ondelete="CASCADE"), nullable=False, index=True)
+    entity_type = Column(String(20), nullable=False)  # "team", "fixture", "competition"
+    entity_key = Column(String(200), nullable=False)  # normalized team name, ESPN event id or league code
+
+    def __repr__(self):
+        return f"<ResearchEntity(document_id={self.document_id}, {self.entity_type}='{self.entity_key}')>"
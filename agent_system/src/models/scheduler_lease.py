@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String, DateTime
+from sqlalchemy.sql import func
+from .database import Base
+
+
+class SchedulerLease(Base):
+    __tablename__ = "scheduler_leases"
+
+    name = Column(String(100), primary_key=True)  # e.g. "event_scheduler"
+    holder_id = Column(String(200), nullable=False)  # host:pid:nonce of the current leader
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    acquired_at = Column(DateTime(timezone=True), server_default=func.now())
+    renewed_at = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<SchedulerLease(name='{self.name}', holder='{self.holder_id}', expires='{self.expires_at}')>"
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.sql import func
+from .database import Base
+
+
+class XPLedgerEntry(Base):
+    """Append-only XP award; a user's XP is the sum of their entries"""
+    __tablename__ = "xp_ledger"
+    __table_args__ = (
+        # One award per user and quest (NULL quest_id rows are free-form adjustments)
+        UniqueConstraint("user_id", "quest_id", name="uq_xp_ledger_user_quest"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    quest_id = Column(Integer, ForeignKey("quests.id"), nullable=True)
+    amount = Column(Integer, nullable=False)
+    reason = Column(String(50), default="quest_completed")  # quest_completed, adjustment
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<XPLedgerEntry(user_id={self.user_id}, quest_id={self.quest_id}, amount={self.amount})>"
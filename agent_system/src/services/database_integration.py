@@ -6,13 +6,14 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 from loguru import logger
 import json
-from sqlalchemy import select, and_, or_
+from sqlalchemy import select, update, and_, or_, bindparam
 from ..models.database import async_session
 from ..models.team import Team
 from ..models.event import SportsEvent
 from ..models.user import User
 from ..models.quest import Quest
 from .espn_football_service import espn_football_service
+from .fixture_store import Fixture
 
 
 class DatabaseIntegrationService:
@@ -127,7 +128,7 @@ class DatabaseIntegrationService:
         
         try:
             # Get team matches from ESPN
-            matches = await self.espn.get_team_matches(team_id)
+            matches = await self.espn.get_team_fixtures(team_id)
             
             if not matches:
                 return {**results, "message": f"No matches found for team ID {team_id}"}
@@ -138,12 +139,11 @@ class DatabaseIntegrationService:
             async with async_session() as session:
                 for match in matches:
                     try:
-                        # Extract match data
                         event_data = self._parse_match_to_event(match, team_id)
                         
                         if not event_data:
                             results["skipped"].append({
-                                "match_id": match.get("id"),
+                                "match_id": match.id,
                                 "reason": "Could not parse match data"
                             })
                             continue
@@ -152,7 +152,7 @@ class DatabaseIntegrationService:
                         existing_event = await session.execute(
                             select(SportsEvent).where(
                                 and_(
-                                    SportsEvent.external_id == str(match.get("id")),
+                                    SportsEvent.external_id == str(match.id),
                                     SportsEvent.source == "espn"
                                 )
                             )
@@ -160,7 +160,7 @@ class DatabaseIntegrationService:
                         
                         if existing_event.scalar_one_or_none():
                             results["skipped"].append({
-                                "match_id": match.get("id"),
+                                "match_id": match.id,
                                 "reason": "Event already exists"
                             })
                             continue
@@ -170,15 +170,15 @@ class DatabaseIntegrationService:
                         session.add(new_event)
                         
                         results["created"].append({
-                            "match_id": match.get("id"),
+                            "match_id": match.id,
                             "title": event_data["title"],
                             "event_date": event_data["event_date"]
                         })
                         
                     except Exception as e:
-                        logger.error(f"Error creating event from match {match.get('id')}: {e}")
+                        logger.error(f"Error creating event from match {match.id}: {e}")
                         results["errors"].append({
-                            "match_id": match.get("id"),
+                            "match_id": match.id,
                             "error": str(e)
                         })
                 
@@ -193,57 +193,37 @@ class DatabaseIntegrationService:
         
         return results
     
-    def _parse_match_to_event(self, match: Dict[str, Any], team_id: int) -> Optional[Dict[str, Any]]:
-        """Parse ESPN match data into SportsEvent format"""
-        try:
-            match_id = match.get("id")
-            start_time = match.get("start_time")
-            
-            if not match_id or not start_time:
-                return None
-            
-            # Parse datetime
-            try:
-                event_date = datetime.fromisoformat(start_time.replace("Z", "+00:00"))
-            except:
-                logger.warning(f"Could not parse date: {start_time}")
-                return None
-            
-            # Extract team names
-            home_team = match.get("home_team_name", "Unknown")
-            away_team = match.get("away_team_name", "Unknown")
-            
-            # Create title
-            title = f"{home_team} vs {away_team}"
-            
-            # Extract league info
-            league = match.get("tournament_name") or match.get("league_name") or "Unknown League"
-            
-            return {
-                "title": title,
-                "description": f"Match between {home_team} and {away_team}",
-                "sport": "football",
-                "league": league,
-                "event_date": event_date,
-                "home_team_id": 1,  # Default team ID - needs proper mapping
-                "away_team_id": 1,  # Default team ID - needs proper mapping
-                "external_id": str(match_id),
-                "source": "espn",
-                "event_metadata": json.dumps({
-                    "home_team": home_team,
-                    "away_team": away_team,
-                    "home_team_id": match.get("home_team_id"),
-                    "away_team_id": match.get("away_team_id"),
-                    "tournament_id": match.get("tournament_id"),
-                    "status": match.get("status"),
-                    "venue": match.get("venue"),
-                    "original_match": match
-                })
-            }
-            
-        except Exception as e:
-            logger.error(f"Error parsing match {match.get('id')}: {e}")
+    def _parse_match_to_event(self, match: Fixture, team_id: int) -> Optional[Dict[str, Any]]:
+        """Build SportsEvent columns from a parsed fixture"""
+        if match.kickoff is None:
             return None
+        
+        home_team = match.home.name if match.home and match.home.name else "Unknown"
+        away_team = match.away.name if match.away and match.away.name else "Unknown"
+        league = self.espn.league_names.get(match.league) or match.season or "Unknown League"
+        
+        return {
+            "title": f"{home_team} vs {away_team}",
+            "description": f"Match between {home_team} and {away_team}",
+            "sport": "football",
+            "league": league,
+            "event_date": match.kickoff_at,
+            "home_team_id": 1,  # Default team ID - needs proper mapping
+            "away_team_id": 1,  # Default team ID - needs proper mapping
+            "external_id": match.id,
+            "source": "espn",
+            "status": match.status or "scheduled",
+            "event_metadata": json.dumps({
+                "home_team": home_team,
+                "away_team": away_team,
+                "home_team_id": match.home.id if match.home else None,
+                "away_team_id": match.away.id if match.away else None,
+                "league_code": match.league,
+                "status": match.status,
+                "venue": match.venue,
+                "original_match": match.to_match()
+            })
+        }
     
     async def sync_events_for_all_teams(self, max_events_per_team: int = 5) -> Dict[str, Any]:
         """Sync events for all teams that have ESPN external IDs"""
@@ -299,6 +279,36 @@ class DatabaseIntegrationService:
         
         return results
     
+    async def update_event_statuses(self, matches: List[Dict[str, Any]]) -> int:
+        """Bulk-update the status of stored ESPN events from freshly polled scoreboard matches"""
+        params = [
+            {"match_id": str(match["id"]), "new_status": match["status"]}
+            for match in matches
+            if match.get("id") and match.get("status")
+        ]
+        if not params:
+            return 0
+        
+        # Core table statement so the parameter list runs as a single executemany
+        events = SportsEvent.__table__
+        stmt = (
+            update(events)
+            .where(
+                and_(
+                    events.c.external_id == bindparam("match_id"),
+                    events.c.source == "espn",
+                    events.c.status != bindparam("new_status")
+                )
+            )
+            .values(status=bindparam("new_status"))
+        )
+        
+        async with async_session() as session:
+            result = await session.execute(stmt, params)
+            await session.commit()
+        
+        return result.rowcount if result.rowcount and result.rowcount > 0 else 0
+    
     async def get_integration_status(self) -> Dict[str, Any]:
         """Get current integration status with ESPN"""
         async with async_session() as session:
@@ -0,0 +1,216 @@
+"""
+ESPN Cassette - Record and replay ESPN HTTP traffic at the httpx transport level
+
+A cassette is a gzip-compressed JSON Lines file: a header line, then one line
+per interaction (method, endpoint relative to the ESPN base URL, status,
+content type, body, recorded latency). Each recorded request is appended as
+its own gzip member, so a crash loses at most the request in progress.
+
+Replay serves the recorded responses in order for each endpoint (the last one
+repeats) and never touches the network. Time warp shifts every ISO timestamp
+in the bodies by (target - recorded_at), so fixtures recorded weeks ago are
+upcoming again; the recorded latency can be replayed scaled or skipped.
+"""
+import asyncio
+import gzip
+import json
+import os
+import re
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import httpx
+from loguru import logger
+
+
+CASSETTE_FORMAT = "espn-cassette"
+CASSETTE_VERSION = 1
+
+# ESPN timestamps: 2025-08-16T14:00Z, 2025-08-16T14:00:00Z, 2025-08-16T14:00:00.000Z
+ISO_TIMESTAMP = re.compile(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?Z")
+
+
+def _endpoint(url: httpx.URL, base_url: str) -> str:
+    """Request URL relative to the ESPN base URL, with a sorted query string"""
+    path = str(url.copy_with(query=None))
+    base = base_url.rstrip("/") + "/"
+    if path.startswith(base):
+        path = path[len(base):]
+    query = sorted(url.params.multi_items())
+    return path + ("?" + "&".join(f"{key}={value}" for key, value in query) if query else "")
+
+
+def warp_timestamps(body: str, shift: timedelta) -> str:
+    """Move every ESPN timestamp in a body by shift, keeping each one's own format"""
+    def replace(match: "re.Match[str]") -> str:
+        original = match.group(0)
+        moved = datetime.fromisoformat(original.replace("Z", "+00:00")) + shift
+        if len(original) == len("2025-08-16T14:00Z"):
+            return moved.strftime("%Y-%m-%dT%H:%MZ")
+        if "." in original:
+            return moved.strftime("%Y-%m-%dT%H:%M:%S.") + f"{moved.microsecond // 1000:03d}Z"
+        return moved.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    return ISO_TIMESTAMP.sub(replace, body)
+
+
+class Cassette:
+    """Recorded interactions grouped by (method, endpoint)"""
+
+    def __init__(self, recorded_at: Optional[datetime] = None, interactions: Iterable[Dict[str, Any]] = ()):
+        self.recorded_at = recorded_at or datetime.now(timezone.utc)
+        self.interactions: Dict[Tuple[str, str], List[Dict[str, Any]]] = defaultdict(list)
+        for interaction in interactions:
+            self.add(interaction)
+
+    def add(self, interaction: Dict[str, Any]):
+        self.interactions[(interaction["method"], interaction["endpoint"])].append(interaction)
+
+    def __len__(self) -> int:
+        return sum(len(recorded) for recorded in self.interactions.values())
+
+    def header(self) -> Dict[str, Any]:
+        return {"format": CASSETTE_FORMAT, "version": CASSETTE_VERSION, "recorded_at": self.recorded_at.isoformat()}
+
+    @classmethod
+    def load(cls, path: str) -> "Cassette":
+        """Read a cassette file (all gzip members)"""
+        with gzip.open(path, "rt", encoding="utf-8") as handle:
+            lines = (json.loads(line) for line in handle if line.strip())
+            header = next(lines, None)
+            if not header or header.get("format") != CASSETTE_FORMAT:
+                raise ValueError(f"{path} is not an ESPN cassette")
+            if header.get("version") != CASSETTE_VERSION:
+                raise ValueError(f"Unsupported cassette version {header.get('version')} in {path}")
+            return cls(datetime.fromisoformat(header["recorded_at"]), lines)
+
+    def save(self, path: str, compresslevel: int = 6):
+        """Write the whole cassette as one gzip member"""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(path, "wt", encoding="utf-8", compresslevel=compresslevel) as handle:
+            handle.write(json.dumps(self.header()) + "\n")
+            for recorded in self.interactions.values():
+                for interaction in recorded:
+                    handle.write(json.dumps(interaction, separators=(",", ":")) + "\n")
+
+    def summary(self) -> Dict[str, Any]:
+        """Endpoints, interactions and body volume"""
+        return {
+            "recorded_at": self.recorded_at.isoformat(),
+            "endpoints": len(self.interactions),
+            "interactions": len(self),
+            "body_bytes": sum(len(i["body"]) for recorded in self.interactions.values() for i in recorded),
+        }
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Forwards requests to the network and appends every response to a cassette file"""
+
+    def __init__(self, path: str, base_url: str, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.path = path
+        self.base_url = base_url
+        self.transport = transport or httpx.AsyncHTTPTransport()
+        self.recorded = 0
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            with gzip.open(path, "wt", encoding="utf-8") as handle:
+                handle.write(json.dumps(Cassette().header()) + "\n")
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        start = time.perf_counter()
+        response = await self.transport.handle_async_request(request)
+        body = await response.aread()
+        interaction = {
+            "method": request.method,
+            "endpoint": _endpoint(request.url, self.base_url),
+            "status": response.status_code,
+            "content_type": response.headers.get("content-type", "application/json"),
+            "body": body.decode("utf-8", errors="replace"),
+            "latency_ms": round((time.perf_counter() - start) * 1000, 2),
+        }
+        with gzip.open(self.path, "at", encoding="utf-8") as handle:
+            handle.write(json.dumps(interaction, separators=(",", ":")) + "\n")
+        self.recorded += 1
+        # The body is already decoded: drop headers that describe the wire encoding
+        headers = [(k, v) for k, v in response.headers.multi_items() if k.lower() not in ("content-encoding", "content-length", "transfer-encoding")]
+        return httpx.Response(response.status_code, headers=headers, content=body, request=request)
+
+    async def aclose(self):
+        # Shared by the service's per-request clients: keep the connection pool open
+        pass
+
+    async def shutdown(self):
+        await self.transport.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """Serves requests from a cassette without touching the network"""
+
+    def __init__(
+        self,
+        cassette: Cassette,
+        base_url: str,
+        warp_to: Optional[datetime] = None,
+        latency_scale: float = 0.0
+    ):
+        self.base_url = base_url
+        self.latency_scale = latency_scale
+        shift = (warp_to - cassette.recorded_at) if warp_to else None
+        # Bodies are encoded (and warped) once; replays only hand out bytes
+        self.responses: Dict[Tuple[str, str], List[Tuple[int, str, bytes, float]]] = {
+            key: [
+                (
+                    interaction["status"],
+                    interaction.get("content_type", "application/json"),
+                    (warp_timestamps(interaction["body"], shift) if shift else interaction["body"]).encode(),
+                    interaction.get("latency_ms", 0.0),
+                )
+                for interaction in recorded
+            ]
+            for key, recorded in cassette.interactions.items()
+        }
+        self.positions: Dict[Tuple[str, str], int] = defaultdict(int)
+        self.request_count = 0
+        self.misses = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.request_count += 1
+        key = (request.method, _endpoint(request.url, self.base_url))
+        recorded = self.responses.get(key)
+        if not recorded:
+            self.misses += 1
+            logger.warning(f"📼 No recorded response for {key[0]} {key[1]}")
+            return httpx.Response(404, json={"error": "not in cassette", "endpoint": key[1]}, request=request)
+
+        position = self.positions[key]
+        self.positions[key] = position + 1
+        status, content_type, body, latency_ms = recorded[min(position, len(recorded) - 1)]
+        if self.latency_scale > 0 and latency_ms:
+            await asyncio.sleep(latency_ms * self.latency_scale / 1000)
+        return httpx.Response(status, headers={"content-type": content_type}, content=body, request=request)
+
+    async def aclose(self):
+        pass
+
+    def rewind(self):
+        """Serve every endpoint from its first recorded response again"""
+        self.positions.clear()
+
+
+def transport_from_env(base_url: str) -> Optional[httpx.AsyncBaseTransport]:
+    """Cassette transport selected by ESPN_CASSETTE_MODE (off, record, replay)"""
+    mode = os.getenv("ESPN_CASSETTE_MODE", "off").lower()
+    if mode == "off":
+        return None
+    path = os.getenv("ESPN_CASSETTE", "espn_cassette.jsonl.gz")
+    if mode == "record":
+        logger.info(f"📼 Recording ESPN traffic to {path}")
+        return RecordingTransport(path, base_url)
+    if mode == "replay":
+        cassette = Cassette.load(path)
+        warp_to = datetime.now(timezone.utc) if os.getenv("ESPN_CASSETTE_TIME_WARP", "true").lower() == "true" else None
+        logger.info(f"📼 Replaying {len(cassette)} ESPN responses from {path}")
+        return ReplayTransport(cassette, base_url, warp_to=warp_to, latency_scale=float(os.getenv("ESPN_CASSETTE_LATENCY_SCALE", "0")))
+    raise ValueError(f"Unknown ESPN_CASSETTE_MODE '{mode}' (expected off, record or replay)")
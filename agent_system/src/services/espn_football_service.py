@@ -3,12 +3,19 @@ ESPN Football API Service - Integration with ESPN API for real-time sports event
 """
 import httpx
 import asyncio
-from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
+import os
+import time
+from typing import List, Dict, Any, Optional, Union
+from datetime import datetime, timedelta, timezone
 from loguru import logger
 from ..models.database import async_session
 from ..models.team import Team
 from ..models.event import SportsEvent
+from ..core.instrumentation import observe_espn_request
+from ..core.tracing import span, traced
+from ..core.offload import cpu_offload
+from .fixture_store import Fixture, LeagueFixtures, NO_TEAM, fixture_store, parse_scoreboard
+from .espn_cassette import transport_from_env
 from sqlalchemy import select
 import json
 
@@ -17,8 +24,8 @@ class ESPNFootballService:
     """Service to integrate with ESPN Football API for real-time sports data"""
     
     def __init__(self):
-        self.base_url = "http://site.api.espn.com/apis/site/v2/sports/soccer"
-        # ESPN API league mappings for our teams
+        self.base_url = os.getenv("ESPN_BASE_URL", "http://site.api.espn.com/apis/site/v2/sports/soccer")
+        # Built-in ESPN league mappings; they seed the league registry, which replaces them at startup
         self.league_mappings = {
             "La Liga": "esp.1",
             "Ligue 1": "fra.1", 
@@ -29,7 +36,7 @@ class ESPNFootballService:
             "Club World Cup": "fifa.cwc",
             "International Friendlies": "fifa.friendly"
         }
-        # Team mappings to ESPN IDs
+        # Team mappings to ESPN IDs (seed for the league_teams table)
         self.team_mappings = {
             "Real Madrid": {"league": "esp.1", "id": "86"},
             "Barcelona": {"league": "esp.1", "id": "83"},
@@ -38,22 +45,81 @@ class ESPNFootballService:
             "Bayern Munich": {"league": "ger.1", "id": "132"},
             "Chelsea": {"league": "eng.1", "id": "363"}
         }
+        # Scoreboards above this size take several ms to decode and parse
+        self.offload_min_bytes = int(os.getenv("ESPN_OFFLOAD_MIN_BYTES", "262144"))
+        # Team lookups reuse a league scoreboard fetched less than this many seconds ago
+        self.fixture_max_age = float(os.getenv("FIXTURE_STORE_MAX_AGE", "30"))
+        # Record/replay cassette (ESPN_CASSETTE_MODE); None talks to ESPN directly
+        self.transport = transport_from_env(self.base_url)
+        # Pause between per-team requests during syncs, to stay under ESPN's rate limit
+        self.request_delay = float(os.getenv("ESPN_REQUEST_DELAY", "0.1"))
         
+    @property
+    def league_names(self) -> Dict[str, str]:
+        """League name by ESPN code"""
+        return {code: name for name, code in self.league_mappings.items()}
+    
+    async def _get(self, endpoint: str) -> Optional[bytes]:
+        """GET an ESPN endpoint and return the raw body (None on failure)"""
+        start = time.perf_counter()
+        outcome = "error"
+        with span("espn.request", endpoint=endpoint) as request_span:
+            async with httpx.AsyncClient(transport=self.transport) as client:
+                try:
+                    url = f"{self.base_url}/{endpoint}"
+                    response = await client.get(url, timeout=30.0)
+                    response.raise_for_status()
+                    outcome = "ok"
+                    return response.content
+                    
+                except httpx.RequestError as e:
+                    logger.error(f"Request error to ESPN: {e}")
+                    return None
+                except Exception as e:
+                    logger.error(f"Unexpected error: {e}")
+                    return None
+                finally:
+                    observe_espn_request(endpoint, time.perf_counter() - start, outcome)
+                    if request_span:
+                        request_span.set_attribute("outcome", outcome)
+    
     async def _make_request(self, endpoint: str) -> Dict[str, Any]:
         """Make HTTP request to ESPN API"""
-        async with httpx.AsyncClient() as client:
-            try:
-                url = f"{self.base_url}/{endpoint}"
-                response = await client.get(url, timeout=30.0)
-                response.raise_for_status()
-                return response.json()
-                
-            except httpx.RequestError as e:
-                logger.error(f"Request error to ESPN: {e}")
-                return {}
-            except Exception as e:
-                logger.error(f"Unexpected error: {e}")
-                return {}
+        body = await self._get(endpoint)
+        if not body:
+            return {}
+        try:
+            return json.loads(body)
+        except ValueError as e:
+            logger.error(f"Unexpected error: {e}")
+            return {}
+    
+    async def get_league_fixtures(self, league_code: str, max_age: Optional[float] = None) -> Optional[LeagueFixtures]:
+        """
+        Fixtures of a league from the fixture store, fetching the scoreboard when
+        the stored one is older than max_age seconds (FIXTURE_STORE_MAX_AGE by
+        default, 0 always fetches). Large bodies are decoded in the offload pool.
+        """
+        stored = fixture_store.get(league_code, self.fixture_max_age if max_age is None else max_age)
+        if stored:
+            return stored
+        body = await self._get(f"{league_code}/scoreboard")
+        if not body:
+            return None
+        fixtures = await cpu_offload.run(parse_scoreboard, body, league_code, inline=len(body) < self.offload_min_bytes)
+        if fixtures is None:
+            return None
+        return fixture_store.replace(league_code, fixtures)
+    
+    def _espn_team_id(self, team: Union[str, int]) -> int:
+        """ESPN id of a mapped team name, or the ESPN id itself"""
+        mapping = self.team_mappings.get(team) if isinstance(team, str) else None
+        if mapping:
+            return int(mapping["id"])
+        try:
+            return int(team)
+        except (TypeError, ValueError):
+            return NO_TEAM
     
     async def search_team(self, team_name: str) -> Optional[Dict[str, Any]]:
         """Search for team by name using ESPN team mappings"""
@@ -85,8 +151,7 @@ class ESPNFootballService:
         try:
             leagues = []
             for league_name, league_code in self.league_mappings.items():
-                league_data = await self._make_request(f"{league_code}/scoreboard")
-                if league_data:
+                if await self.get_league_fixtures(league_code) is not None:
                     leagues.append({
                         "name": league_name,
                         "code": league_code,
@@ -105,55 +170,35 @@ class ESPNFootballService:
             return data["team"]
         return None
     
-    async def get_team_matches(self, team_name: str) -> List[Dict[str, Any]]:
-        """Get matches for a team across ALL competitions"""
-        team_mapping = self.team_mappings.get(team_name)
-        if not team_mapping:
+    @traced("espn.get_team_fixtures")
+    async def get_team_fixtures(self, team: Union[str, int], start: Optional[datetime] = None) -> List[Fixture]:
+        """Fixtures of a team (mapped name or ESPN id) across ALL competitions, by kickoff"""
+        team_id = self._espn_team_id(team)
+        if team_id == NO_TEAM:
             return []
         
-        matches = []
-        
-        # Search in ALL leagues/competitions for this team
+        available = []
         for league_name, league_code in self.league_mappings.items():
             try:
-                # Get scoreboard data for each league
-                data = await self._make_request(f"{league_code}/scoreboard")
-                
-                if data and "events" in data:
-                    for event in data["events"]:
-                        # Check if our team is involved
-                        competitors = event.get("competitions", [{}])[0].get("competitors", [])
-                        team_involved = False
-                        
-                        for competitor in competitors:
-                            team = competitor.get("team", {})
-                            if team.get("displayName") == team_name or team.get("id") == team_mapping["id"]:
-                                team_involved = True
-                                break
-                        
-                        if team_involved:
-                            # Add league info to the match
-                            match_data = self._parse_espn_event(event)
-                            match_data["league"] = league_name
-                            match_data["league_code"] = league_code
-                            matches.append(match_data)
-                            
+                if await self.get_league_fixtures(league_code) is not None:
+                    available.append(league_code)
             except Exception as e:
-                logger.warning(f"Error checking {league_name} for {team_name}: {e}")
-                continue
+                logger.warning(f"Error checking {league_name} for {team}: {e}")
         
-        return matches
+        return fixture_store.query(team_id=team_id, start=start, leagues=available)
+    
+    async def get_team_matches(self, team: Union[str, int]) -> List[Dict[str, Any]]:
+        """Get matches for a team across ALL competitions"""
+        league_names = self.league_names
+        return [
+            {**fixture.to_match(), "league": league_names.get(fixture.league, fixture.league)}
+            for fixture in await self.get_team_fixtures(team)
+        ]
     
     async def get_matches_by_league(self, league: str) -> List[Dict[str, Any]]:
-        """Get all matches for a specific league"""
-        data = await self._make_request(f"{league}/scoreboard")
-        
-        matches = []
-        if data and "events" in data:
-            for event in data["events"]:
-                matches.append(self._parse_espn_event(event))
-        
-        return matches
+        """Get all matches for a specific league (always the latest scoreboard)"""
+        stored = await self.get_league_fixtures(league, max_age=0)
+        return [fixture.to_match() for fixture in stored.fixtures] if stored else []
     
     async def team_exists(self, team_name: str) -> Dict[str, Any]:
         """Check if team exists in our ESPN mappings"""
@@ -210,7 +255,7 @@ class ESPNFootballService:
                         failed_teams.append(team.name)
                         logger.warning(f"Could not find ESPN team for: {team.name}")
                         
-                    await asyncio.sleep(0.1)  # Rate limiting
+                    await asyncio.sleep(self.request_delay)  # Rate limiting
                     
                 except Exception as e:
                     logger.error(f"Error syncing team {team.name}: {e}")
@@ -236,93 +281,21 @@ class ESPNFootballService:
             
             for team in db_teams:
                 try:
-                    matches = await self.get_team_matches(team.name)
+                    # Only include future matches
+                    fixtures = await self.get_team_fixtures(team.name, start=datetime.now(timezone.utc))
+                    league_names = self.league_names
+                    upcoming_events.extend(
+                        fixture.to_upcoming_event(league_names.get(fixture.league), team.name)
+                        for fixture in fixtures
+                    )
                     
-                    for match in matches:
-                        event_data = self._parse_match_data(match, team)
-                        if event_data:
-                            upcoming_events.append(event_data)
-                    
-                    await asyncio.sleep(0.1)
+                    await asyncio.sleep(self.request_delay)
                     
                 except Exception as e:
                     logger.error(f"Error fetching matches for team {team.name}: {e}")
         
         return upcoming_events
     
-    def _parse_espn_event(self, event: Dict[str, Any]) -> Dict[str, Any]:
-        """Parse ESPN event data"""
-        competition = event.get("competitions", [{}])[0]
-        competitors = competition.get("competitors", [])
-        
-        home_team = None
-        away_team = None
-        
-        for competitor in competitors:
-            if competitor.get("homeAway") == "home":
-                home_team = competitor.get("team", {})
-            else:
-                away_team = competitor.get("team", {})
-        
-        return {
-            "id": event.get("id"),
-            "name": event.get("name"),
-            "date": event.get("date"),
-            "status": event.get("status", {}).get("type", {}).get("name"),
-            "home_team": {
-                "id": home_team.get("id") if home_team else None,
-                "name": home_team.get("displayName") if home_team else None,
-                "abbreviation": home_team.get("abbreviation") if home_team else None,
-                "score": competitor.get("score") if competitor.get("homeAway") == "home" else None
-            } if home_team else None,
-            "away_team": {
-                "id": away_team.get("id") if away_team else None,
-                "name": away_team.get("displayName") if away_team else None,
-                "abbreviation": away_team.get("abbreviation") if away_team else None,
-                "score": competitor.get("score") if competitor.get("homeAway") == "away" else None
-            } if away_team else None,
-            "venue": competition.get("venue", {}).get("fullName"),
-            "league": event.get("season", {}).get("slug")
-        }
-    
-    def _parse_match_data(self, match: Dict[str, Any], db_team: Team) -> Optional[Dict[str, Any]]:
-        """Parse ESPN match data into our format"""
-        try:
-            # Parse event date
-            event_date_str = match.get("date")
-            if not event_date_str:
-                return None
-                
-            try:
-                match_datetime = datetime.fromisoformat(event_date_str.replace("Z", "+00:00"))
-            except ValueError:
-                logger.warning(f"Could not parse date: {event_date_str}")
-                return None
-            
-            # Only include future matches
-            if match_datetime < datetime.now():
-                return None
-            
-            home_team = match.get("home_team", {})
-            away_team = match.get("away_team", {})
-            
-            return {
-                "espn_event_id": match.get("id"),
-                "title": match.get("name", f"{home_team.get('name')} vs {away_team.get('name')}"),
-                "home_team": home_team,
-                "away_team": away_team,
-                "event_date": match_datetime.isoformat(),
-                "venue": match.get("venue"),
-                "sport": "football",
-                "league": match.get("league"),
-                "status": match.get("status", "not_started"),
-                "db_team_involved": db_team.name
-            }
-            
-        except Exception as e:
-            logger.error(f"Error parsing ESPN match data: {e}")
-            return None
-    
     async def create_events_from_api_data(self, events_data: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Create SportsEvent records from ESPN matches"""
         created_events = []
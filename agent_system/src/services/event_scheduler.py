@@ -1,35 +1,117 @@
 """
-Event Scheduler - Periodic sync of sports events and automatic quest generation
+Event Scheduler - Fixture-aware polling of sports events and periodic team sync
 """
 import asyncio
-from typing import Dict, Any
-from datetime import datetime, timedelta
+import heapq
+import time
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
 from loguru import logger
 import os
 from .espn_football_service import espn_football_service
+from .fixture_store import classify_match_status, parse_kickoff
+from .league_registry import league_registry
+
+
+# Queue key for the (slow) full team sync, polled alongside the leagues
+TEAM_SYNC_KEY = "__team_sync__"
+
+# Queue key for reloading the league registry (runs on every worker, never sharded)
+REGISTRY_KEY = "__registry__"
+
+
+def compute_poll_interval(
+    matches: List[Dict[str, Any]],
+    now: datetime,
+    idle_interval: int = 3600,
+    prematch_interval: int = 300,
+    imminent_interval: int = 60,
+    live_interval: int = 10,
+    prematch_window: int = 3 * 3600,
+    imminent_window: int = 15 * 60,
+) -> Tuple[int, str]:
+    """
+    Decide how long to wait before polling a league again.
+
+    Returns (seconds, state) where state is one of 'live', 'imminent',
+    'prematch', 'scheduled' or 'idle'.
+    """
+    next_kickoff = None
+
+    for match in matches:
+        state = classify_match_status(match.get("status"))
+        if state == "live":
+            return live_interval, "live"
+        if state != "scheduled":
+            continue
+
+        kickoff = parse_kickoff(match.get("date"))
+        if kickoff is None:
+            continue
+        # Skip stale fixtures; a kickoff that just passed while ESPN still
+        # reports it as scheduled is polled as imminent below
+        if kickoff < now - timedelta(seconds=prematch_window):
+            continue
+        if next_kickoff is None or kickoff < next_kickoff:
+            next_kickoff = kickoff
+
+    if next_kickoff is None:
+        return idle_interval, "idle"
+
+    seconds_to_kickoff = (next_kickoff - now).total_seconds()
+    if seconds_to_kickoff <= imminent_window:
+        return imminent_interval, "imminent"
+    if seconds_to_kickoff <= prematch_window:
+        return prematch_interval, "prematch"
+
+    # Sleep until the pre-match window opens, but never longer than the idle interval
+    wake_in = int(seconds_to_kickoff - prematch_window)
+    return max(prematch_interval, min(idle_interval, wake_in)), "scheduled"
 
 
 class EventScheduler:
-    """Scheduler for periodic event synchronization and quest generation"""
+    """Scheduler that polls each league at a rate set by its fixtures"""
     
     def __init__(self):
-        self.sync_interval = int(os.getenv("THESPORTSDB_SYNC_INTERVAL", "300"))  # 5 minutes default
+        # Full team sync is expensive and rarely changes anything: run it slowly
+        self.sync_interval = int(os.getenv("SCHEDULER_TEAM_SYNC_INTERVAL", "21600"))  # 6 hours default
+        self.idle_interval = int(os.getenv("SCHEDULER_IDLE_INTERVAL", "3600"))
+        self.prematch_interval = int(os.getenv("SCHEDULER_PREMATCH_INTERVAL", "300"))
+        self.imminent_interval = int(os.getenv("SCHEDULER_IMMINENT_INTERVAL", "60"))
+        self.live_interval = int(os.getenv("SCHEDULER_LIVE_INTERVAL", "10"))
+        self.error_interval = int(os.getenv("SCHEDULER_ERROR_INTERVAL", "120"))
+        self.registry_interval = int(os.getenv("SCHEDULER_REGISTRY_REFRESH_INTERVAL", "300"))
         self.is_running = False
         self.scheduler_task = None
+        # Priority queue of (due_at monotonic seconds, league code or TEAM_SYNC_KEY)
+        self.poll_queue: List[Tuple[float, str]] = []
+        self.league_states: Dict[str, Dict[str, Any]] = {}
+        self.last_sync: Optional[str] = None
+        # Set by start_event_scheduler when leader election is enabled
+        self.elector = None
+        # Set by start_event_scheduler when SCHEDULER_SHARDING is enabled
+        self.membership = None
         
     async def start_scheduler(self):
-        """Start the periodic event synchronization"""
+        """Start the fixture-aware polling"""
         if self.is_running:
             logger.warning("Event scheduler is already running")
             return
             
         self.is_running = True
-        logger.info(f"Starting event scheduler with {self.sync_interval}s interval")
+        try:
+            await league_registry.load()
+        except Exception as e:
+            logger.error(f"Could not load the league registry, using the current mappings: {e}")
+        logger.info(
+            f"Starting event scheduler (live {self.live_interval}s, imminent {self.imminent_interval}s, "
+            f"pre-match {self.prematch_interval}s, idle {self.idle_interval}s, team sync {self.sync_interval}s)"
+        )
         
         self.scheduler_task = asyncio.create_task(self._scheduler_loop())
         
     async def stop_scheduler(self):
-        """Stop the periodic event synchronization"""
+        """Stop the fixture-aware polling"""
         if not self.is_running:
             logger.warning("Event scheduler is not running")
             return
@@ -44,30 +126,112 @@ class EventScheduler:
                 
         logger.info("Event scheduler stopped")
     
+    def _league_codes(self) -> List[str]:
+        """League codes to poll"""
+        return list(dict.fromkeys(espn_football_service.league_mappings.values()))
+    
+    def _seed_poll_queue(self):
+        """Schedule every league and the team sync to run immediately"""
+        now = time.monotonic()
+        self.poll_queue = [(now, code) for code in self._league_codes()]
+        self.poll_queue.append((now, TEAM_SYNC_KEY))
+        self.poll_queue.append((now + self.registry_interval, REGISTRY_KEY))
+        heapq.heapify(self.poll_queue)
+    
+    async def _refresh_registry(self):
+        """Reload the league registry; new leagues are polled right away, removed ones are dropped"""
+        await league_registry.load()
+        codes = set(self._league_codes())
+        queued = {key for _, key in self.poll_queue}
+        
+        self.poll_queue = [(due_at, key) for due_at, key in self.poll_queue if key in codes or key.startswith("__")]
+        now = time.monotonic()
+        self.poll_queue.extend((now, code) for code in codes - queued)
+        heapq.heapify(self.poll_queue)
+        for code in set(self.league_states) - codes:
+            del self.league_states[code]
+    
     async def _scheduler_loop(self):
-        """Main scheduler loop"""
-        while self.is_running:
+        """Main scheduler loop: pop the earliest due entry, run it, reschedule it"""
+        self._seed_poll_queue()
+        
+        while self.is_running and self.poll_queue:
             try:
-                await self._periodic_sync()
-                await asyncio.sleep(self.sync_interval)
+                due_at, key = self.poll_queue[0]
+                delay = due_at - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    continue
+                
+                heapq.heappop(self.poll_queue)
+                interval = await self._run_due(key)
+                heapq.heappush(self.poll_queue, (time.monotonic() + interval, key))
                 
             except asyncio.CancelledError:
                 logger.info("Scheduler loop cancelled")
                 break
-            except Exception as e:
-                logger.error(f"Error in scheduler loop: {e}")
-                # Continue running even if one sync fails
-                await asyncio.sleep(self.sync_interval)
+    
+    async def _run_due(self, key: str) -> int:
+        """Run one queue entry and return the number of seconds until it is due again"""
+        try:
+            if key == REGISTRY_KEY:
+                await self._refresh_registry()
+                return self.registry_interval
+            if self.membership and not self.membership.owns(key):
+                # Another worker owns this key; check again after the next ring update
+                self.league_states.pop(key, None)
+                return int(self.membership.heartbeat_interval)
+            if key == TEAM_SYNC_KEY:
+                await self._periodic_sync()
+                return self.sync_interval
+            return await self._poll_league(key)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Continue running even if one poll fails
+            logger.error(f"Error in scheduler entry {key}: {e}")
+            return self.error_interval
+    
+    async def _poll_league(self, league_code: str) -> int:
+        """Fetch one league scoreboard, refresh stored event statuses and pick the next poll delay"""
+        matches = await espn_football_service.get_matches_by_league(league_code)
+        
+        from .database_integration import db_integration
+        updated = await db_integration.update_event_statuses(matches)
+        
+        interval, state = compute_poll_interval(
+            matches,
+            datetime.now(timezone.utc),
+            idle_interval=self.idle_interval,
+            prematch_interval=self.prematch_interval,
+            imminent_interval=self.imminent_interval,
+            live_interval=self.live_interval,
+        )
+        # Stay within the league's poll budget
+        interval = max(interval, league_registry.min_poll_interval(league_code))
+        
+        previous = self.league_states.get(league_code, {}).get("state")
+        if previous != state:
+            logger.info(f"League {league_code}: {previous or 'new'} -> {state}, polling every {interval}s")
+        
+        self.league_states[league_code] = {
+            "state": state,
+            "interval_seconds": interval,
+            "fixtures": len(matches),
+            "events_updated": updated,
+            "last_poll": datetime.now().isoformat()
+        }
+        return interval
     
     async def _periodic_sync(self):
-        """Perform periodic synchronization"""
-        logger.info("Starting periodic event sync...")
+        """Perform the full team synchronization"""
+        logger.info("Starting periodic team sync...")
         
         try:
-            # Full sync: teams + events + quest generation
             # Use ESPN service instead
             from .database_integration import db_integration
             result = await db_integration.sync_teams_with_external_ids()
+            self.last_sync = datetime.now().isoformat()
             
             logger.info(f"Periodic sync completed - Result: {result}")
             
@@ -115,11 +279,27 @@ class EventScheduler:
     
     def get_scheduler_status(self) -> Dict[str, Any]:
         """Get current scheduler status"""
+        now = time.monotonic()
+        next_polls = {key: max(0, round(due_at - now)) for due_at, key in sorted(self.poll_queue)}
+        
         return {
             "is_running": self.is_running,
             "sync_interval_seconds": self.sync_interval,
-            "next_sync_in": self.sync_interval if self.is_running else None,
-            "last_sync": "Not implemented - would track in Redis/DB"
+            "next_sync_in": next_polls.get(TEAM_SYNC_KEY) if self.is_running else None,
+            "last_sync": self.last_sync,
+            "leader": self.elector.get_status() if self.elector else None,
+            "shard": self.membership.get_status() if self.membership else None,
+            "registry": league_registry.get_status(),
+            "intervals": {
+                "live": self.live_interval,
+                "imminent": self.imminent_interval,
+                "prematch": self.prematch_interval,
+                "idle": self.idle_interval
+            },
+            "leagues": {
+                code: {**state, "next_poll_in": next_polls.get(code)}
+                for code, state in self.league_states.items()
+            }
         }
 
 
@@ -129,15 +309,53 @@ event_scheduler = EventScheduler()
 
 # Startup function to be called when the application starts
 async def start_event_scheduler():
-    """Start the event scheduler when the application starts"""
-    if os.getenv("ENABLE_EVENT_SCHEDULER", "true").lower() == "true":
+    """
+    Start the event scheduler when the application starts: on the elected
+    leader, or on every worker with SCHEDULER_SHARDING=true, each polling the
+    leagues it owns on the shard ring
+    """
+    if os.getenv("ENABLE_EVENT_SCHEDULER", "true").lower() != "true":
+        logger.info("Event scheduler disabled via environment variable")
+        return
+    
+    from .leader_election import create_leader_elector, make_holder_id
+    
+    if os.getenv("SCHEDULER_SHARDING", "false").lower() == "true":
+        from .shard_ring import ShardMembership
+        
+        event_scheduler.membership = ShardMembership(
+            "event_scheduler",
+            make_holder_id(),
+            ttl_seconds=int(os.getenv("SCHEDULER_LEASE_TTL", "30")),
+            replicas=int(os.getenv("SCHEDULER_SHARD_REPLICAS", "128")),
+        )
+        await event_scheduler.membership.start()
         await event_scheduler.start_scheduler()
-        logger.info("Event scheduler started automatically")
+        logger.info("Event scheduler started as a shard worker")
+        return
+    
+    event_scheduler.elector = create_leader_elector(
+        "event_scheduler",
+        on_elected=event_scheduler.start_scheduler,
+        on_revoked=event_scheduler.stop_scheduler,
+    )
+    
+    if event_scheduler.elector:
+        # The scheduler starts once this process wins the lease
+        await event_scheduler.elector.start()
     else:
-        logger.info("Event scheduler disabled via environment variable")
+        await event_scheduler.start_scheduler()
+        logger.info("Event scheduler started automatically")
 
 
 # Shutdown function to be called when the application stops
 async def stop_event_scheduler():
     """Stop the event scheduler when the application stops"""
-    await event_scheduler.stop_scheduler()
\ No newline at end of file
+    if event_scheduler.elector:
+        await event_scheduler.elector.stop()
+        event_scheduler.elector = None
+    if event_scheduler.is_running:
+        await event_scheduler.stop_scheduler()
+    if event_scheduler.membership:
+        await event_scheduler.membership.stop()
+        event_scheduler.membership = None
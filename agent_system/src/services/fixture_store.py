@@ -0,0 +1,313 @@
+"""
+Fixture Store - Parsed scoreboard fixtures in a compact, query-friendly layout
+
+Every ESPN scoreboard is parsed once into Fixture objects (__slots__, repeated
+strings interned) and stored per league with array columns sorted by kickoff:
+kickoff epoch, status code, home and away team ids. Time windows are found by
+bisecting the kickoff column and team filters go through a per-team position
+index, so a query touches only the matching rows instead of re-walking nested
+event dicts. The old dict shapes (scoreboard match, upcoming event) are built
+from fixtures on demand.
+"""
+import json
+import sys
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+from loguru import logger
+from ..core.offload import cpu_bound
+
+
+# ESPN status names that mean the match will not change anymore
+FINISHED_STATUSES = {
+    "STATUS_FULL_TIME", "STATUS_FINAL", "STATUS_FINAL_AET", "STATUS_FINAL_PEN",
+    "STATUS_POSTPONED", "STATUS_CANCELED", "STATUS_ABANDONED", "STATUS_FORFEIT"
+}
+
+# ESPN status names that mean the match has not started yet
+SCHEDULED_STATUSES = {"STATUS_SCHEDULED", "STATUS_DELAYED", "not_started"}
+
+# Status codes stored in the status column
+SCHEDULED, LIVE, FINISHED = 0, 1, 2
+STATUS_CODES = {"scheduled": SCHEDULED, "live": LIVE, "finished": FINISHED}
+
+# Team id column value for a missing or non-numeric ESPN team id
+NO_TEAM = -1
+
+
+def classify_match_status(status: Optional[str]) -> str:
+    """Classify an ESPN status name as 'scheduled', 'live' or 'finished'"""
+    if not status or status in SCHEDULED_STATUSES:
+        return "scheduled"
+    if status in FINISHED_STATUSES or status.startswith("STATUS_FINAL"):
+        return "finished"
+    return "live"
+
+
+def parse_kickoff(date_str: Optional[str]) -> Optional[datetime]:
+    """Parse an ESPN ISO date ('2025-07-12T19:00Z') into an aware datetime"""
+    if not date_str:
+        return None
+    try:
+        kickoff = datetime.fromisoformat(date_str.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if kickoff.tzinfo is None:
+        kickoff = kickoff.replace(tzinfo=timezone.utc)
+    return kickoff
+
+
+def _intern(value: Any) -> Optional[str]:
+    return sys.intern(str(value)) if value is not None else None
+
+
+def _team_id(value: Any) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return NO_TEAM
+
+
+@dataclass(slots=True)
+class Side:
+    """One competitor of a fixture"""
+    id: int
+    name: Optional[str]
+    abbreviation: Optional[str]
+    score: Optional[str]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": str(self.id) if self.id != NO_TEAM else None,
+            "name": self.name,
+            "abbreviation": self.abbreviation,
+            "score": self.score
+        }
+
+
+@dataclass(slots=True)
+class Fixture:
+    """One scoreboard event"""
+    id: str
+    name: Optional[str]
+    league: str
+    kickoff: Optional[int]  # epoch seconds, None when ESPN sends no usable date
+    status: Optional[str]
+    status_code: int
+    home: Optional[Side]
+    away: Optional[Side]
+    venue: Optional[str]
+    season: Optional[str]
+
+    @property
+    def kickoff_at(self) -> Optional[datetime]:
+        return datetime.fromtimestamp(self.kickoff, tz=timezone.utc) if self.kickoff is not None else None
+
+    @property
+    def date(self) -> Optional[str]:
+        """Kickoff in ESPN's own format"""
+        kickoff = self.kickoff_at
+        return kickoff.strftime("%Y-%m-%dT%H:%MZ") if kickoff else None
+
+    def to_match(self) -> Dict[str, Any]:
+        """Scoreboard match dict, as returned by the ESPN service"""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "date": self.date,
+            "status": self.status,
+            "home_team": self.home.to_dict() if self.home else None,
+            "away_team": self.away.to_dict() if self.away else None,
+            "venue": self.venue,
+            "league": self.season,
+            "league_code": self.league
+        }
+
+    def to_upcoming_event(self, league_name: Optional[str], db_team_name: str) -> Dict[str, Any]:
+        """Upcoming event payload used to create SportsEvent rows"""
+        home = self.home.to_dict() if self.home else {}
+        away = self.away.to_dict() if self.away else {}
+        return {
+            "espn_event_id": self.id,
+            "title": self.name or f"{home.get('name')} vs {away.get('name')}",
+            "home_team": home,
+            "away_team": away,
+            "event_date": self.kickoff_at.isoformat(),
+            "venue": self.venue,
+            "sport": "football",
+            "league": league_name or self.season,
+            "status": self.status or "not_started",
+            "db_team_involved": db_team_name
+        }
+
+
+def parse_fixture(event: Dict[str, Any], league: str) -> Fixture:
+    """Parse one ESPN scoreboard event"""
+    competition = (event.get("competitions") or [{}])[0]
+    home = away = None
+    for competitor in competition.get("competitors", []):
+        team = competitor.get("team", {})
+        side = Side(
+            id=_team_id(team.get("id")),
+            name=_intern(team.get("displayName")),
+            abbreviation=_intern(team.get("abbreviation")),
+            score=_intern(competitor.get("score"))
+        )
+        if competitor.get("homeAway") == "home":
+            home = side
+        else:
+            away = side
+
+    kickoff = parse_kickoff(event.get("date"))
+    status = _intern(event.get("status", {}).get("type", {}).get("name"))
+    return Fixture(
+        id=str(event.get("id")),
+        name=event.get("name"),
+        league=sys.intern(league),
+        kickoff=int(kickoff.timestamp()) if kickoff else None,
+        status=status,
+        status_code=STATUS_CODES[classify_match_status(status)],
+        home=home,
+        away=away,
+        venue=_intern(competition.get("venue", {}).get("fullName")),
+        season=_intern(event.get("season", {}).get("slug"))
+    )
+
+
+def intern_fixture(fixture: Fixture) -> Fixture:
+    """Intern the repeated strings of a fixture again (unpickling from the offload pool makes fresh copies)"""
+    fixture.league = sys.intern(fixture.league)
+    fixture.status = _intern(fixture.status)
+    fixture.venue = _intern(fixture.venue)
+    fixture.season = _intern(fixture.season)
+    for side in (fixture.home, fixture.away):
+        if side:
+            side.name = _intern(side.name)
+            side.abbreviation = _intern(side.abbreviation)
+            side.score = _intern(side.score)
+    return fixture
+
+
+@cpu_bound
+def parse_scoreboard(body: bytes, league: str = "") -> Optional[List[Fixture]]:
+    """Decode a scoreboard response into fixtures (None if it is not valid JSON)"""
+    try:
+        data = json.loads(body)
+    except ValueError as e:
+        logger.error(f"Invalid scoreboard JSON: {e}")
+        return None
+    if not isinstance(data, dict):
+        return []
+    return [parse_fixture(event, league) for event in data.get("events", [])]
+
+
+class LeagueFixtures:
+    """Fixtures of one league, sorted by kickoff, with column arrays for filtering"""
+
+    __slots__ = ("league", "fixtures", "kickoffs", "status_codes", "home_ids", "away_ids", "by_team", "updated_at")
+
+    def __init__(self, league: str, fixtures: Iterable[Fixture]):
+        self.league = league
+        # Fixtures without a date sort first (kickoff column -1) and only show up in unbounded queries
+        self.fixtures = sorted(fixtures, key=lambda f: -1 if f.kickoff is None else f.kickoff)
+        self.kickoffs = array("q", (-1 if f.kickoff is None else f.kickoff for f in self.fixtures))
+        self.status_codes = array("b", (f.status_code for f in self.fixtures))
+        self.home_ids = array("q", (f.home.id if f.home else NO_TEAM for f in self.fixtures))
+        self.away_ids = array("q", (f.away.id if f.away else NO_TEAM for f in self.fixtures))
+        self.by_team: Dict[int, array] = {}
+        for position, (home_id, away_id) in enumerate(zip(self.home_ids, self.away_ids)):
+            for team_id in {home_id, away_id} - {NO_TEAM}:
+                self.by_team.setdefault(team_id, array("l")).append(position)
+        self.updated_at = time.monotonic()
+
+    def positions(self, team_id: Optional[int], start: Optional[int], end: Optional[int]) -> Iterable[int]:
+        """Row positions in [start, end) kickoff window, optionally for one team"""
+        low = bisect_left(self.kickoffs, start) if start is not None else 0
+        high = bisect_left(self.kickoffs, end) if end is not None else len(self.kickoffs)
+        if team_id is None:
+            return range(low, high)
+        rows = self.by_team.get(team_id)
+        if not rows:
+            return ()
+        # Positions are increasing, so the window is a slice of the team's rows
+        return rows[bisect_left(rows, low):bisect_right(rows, high - 1)]
+
+    def nbytes(self) -> int:
+        """Approximate size of the columns and fixture objects"""
+        columns = sum(column.itemsize * len(column) for column in (self.kickoffs, self.status_codes, self.home_ids, self.away_ids))
+        index = sum(rows.itemsize * len(rows) for rows in self.by_team.values())
+        objects = sum(
+            sys.getsizeof(f) + sys.getsizeof(f.id) + sum(sys.getsizeof(side) for side in (f.home, f.away) if side)
+            for f in self.fixtures
+        )
+        return columns + index + objects
+
+
+class FixtureStore:
+    """Latest parsed fixtures of every polled league"""
+
+    def __init__(self):
+        self.leagues: Dict[str, LeagueFixtures] = {}
+
+    def replace(self, league: str, fixtures: List[Fixture]) -> LeagueFixtures:
+        """Swap in a freshly parsed scoreboard (readers keep the old one until they finish)"""
+        entry = LeagueFixtures(league, (intern_fixture(fixture) for fixture in fixtures))
+        self.leagues[league] = entry
+        return entry
+
+    def get(self, league: str, max_age: Optional[float] = None) -> Optional[LeagueFixtures]:
+        """Stored fixtures of a league, None if missing or older than max_age seconds"""
+        entry = self.leagues.get(league)
+        if entry is None or (max_age is not None and time.monotonic() - entry.updated_at > max_age):
+            return None
+        return entry
+
+    def query(
+        self,
+        team_id: Optional[int] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        statuses: Optional[Iterable[str]] = None,
+        leagues: Optional[Iterable[str]] = None
+    ) -> List[Fixture]:
+        """
+        Fixtures matching every given filter, by kickoff: a team (ESPN id), a
+        kickoff window [start, end) and status classes ('scheduled', 'live',
+        'finished').
+        """
+        start_epoch = int(start.timestamp()) if start else None
+        end_epoch = int(end.timestamp()) if end else None
+        wanted = {STATUS_CODES[status] for status in statuses} if statuses is not None else None
+
+        entries = [self.leagues[league] for league in (self.leagues if leagues is None else leagues) if league in self.leagues]
+        matches: List[Fixture] = []
+        for entry in entries:
+            codes = entry.status_codes
+            matches.extend(
+                entry.fixtures[position]
+                for position in entry.positions(team_id, start_epoch, end_epoch)
+                if wanted is None or codes[position] in wanted
+            )
+        if len(entries) > 1:
+            matches.sort(key=lambda f: -1 if f.kickoff is None else f.kickoff)
+        return matches
+
+    def get_status(self) -> Dict[str, Any]:
+        """Fixture counts and approximate memory per league"""
+        now = time.monotonic()
+        return {
+            league: {
+                "fixtures": len(entry.fixtures),
+                "teams": len(entry.by_team),
+                "bytes": entry.nbytes(),
+                "age_seconds": round(now - entry.updated_at, 1)
+            }
+            for league, entry in self.leagues.items()
+        }
+
+
+# Global service instance
+fixture_store = FixtureStore()
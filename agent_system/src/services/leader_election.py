@@ -0,0 +1,258 @@
+"""
+Leader Election - Lease-based election so only one process runs a background service
+"""
+import asyncio
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional
+from loguru import logger
+from sqlalchemy import update, and_, or_
+from sqlalchemy.exc import IntegrityError
+from ..models.database import async_session
+from ..models.scheduler_lease import SchedulerLease
+
+
+def make_holder_id() -> str:
+    """Identity of this process in lease rows and logs"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class DatabaseLease:
+    """Lease stored as a row in scheduler_leases, renewed by heartbeat (multi-host)"""
+
+    def __init__(self, name: str, holder_id: str, ttl_seconds: int):
+        self.name = name
+        self.holder_id = holder_id
+        self.ttl_seconds = ttl_seconds
+
+    async def try_acquire(self) -> bool:
+        """Take or renew the lease. Returns True if this process holds it afterwards."""
+        now = datetime.now(timezone.utc)
+        expires_at = now + timedelta(seconds=self.ttl_seconds)
+
+        async with async_session() as session:
+            # Renew our own lease or steal an expired one in a single conditional UPDATE
+            stmt = (
+                update(SchedulerLease)
+                .where(
+                    and_(
+                        SchedulerLease.name == self.name,
+                        or_(
+                            SchedulerLease.holder_id == self.holder_id,
+                            SchedulerLease.expires_at < now
+                        )
+                    )
+                )
+                .values(holder_id=self.holder_id, expires_at=expires_at, renewed_at=now)
+                .execution_options(synchronize_session=False)
+            )
+            result = await session.execute(stmt)
+            await session.commit()
+            if result.rowcount == 1:
+                return True
+
+            # No row updated: either someone else holds a live lease or the row does not exist yet
+            session.add(SchedulerLease(
+                name=self.name,
+                holder_id=self.holder_id,
+                expires_at=expires_at,
+                renewed_at=now
+            ))
+            try:
+                await session.commit()
+                return True
+            except IntegrityError:
+                await session.rollback()
+                return False
+
+    async def release(self):
+        """Expire the lease immediately so another process can take over"""
+        async with async_session() as session:
+            stmt = (
+                update(SchedulerLease)
+                .where(
+                    and_(
+                        SchedulerLease.name == self.name,
+                        SchedulerLease.holder_id == self.holder_id
+                    )
+                )
+                .values(expires_at=datetime.now(timezone.utc) - timedelta(seconds=1))
+                .execution_options(synchronize_session=False)
+            )
+            await session.execute(stmt)
+            await session.commit()
+
+
+class FileLease:
+    """Lease backed by an exclusive flock on a local file (single host, released by the OS on exit)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: Optional[int] = None
+
+    async def try_acquire(self) -> bool:
+        """Take the lock without blocking. Returns True if this process holds it."""
+        if self._fd is not None:
+            return True
+
+        import fcntl
+
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+
+        os.ftruncate(fd, 0)
+        os.write(fd, f"{os.getpid()}\n".encode())
+        self._fd = fd
+        return True
+
+    async def release(self):
+        """Drop the lock"""
+        if self._fd is None:
+            return
+
+        import fcntl
+
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+        os.close(self._fd)
+        self._fd = None
+
+
+class LeaderElector:
+    """Keeps trying to hold a lease and runs callbacks when leadership is gained or lost"""
+
+    def __init__(
+        self,
+        lease,
+        on_elected: Callable[[], Awaitable[Any]],
+        on_revoked: Callable[[], Awaitable[Any]],
+        heartbeat_interval: float,
+        ttl_seconds: float,
+        holder_id: str,
+    ):
+        self.lease = lease
+        self.on_elected = on_elected
+        self.on_revoked = on_revoked
+        self.heartbeat_interval = heartbeat_interval
+        self.ttl_seconds = ttl_seconds
+        self.holder_id = holder_id
+        self.is_leader = False
+        self.last_renewed: Optional[datetime] = None
+        self.election_task = None
+
+    async def start(self):
+        """Start campaigning for the lease"""
+        if self.election_task:
+            return
+        logger.info(f"Leader election started for {self.holder_id} ({type(self.lease).__name__})")
+        self.election_task = asyncio.create_task(self._election_loop())
+
+    async def stop(self):
+        """Stop campaigning, step down and release the lease"""
+        if self.election_task:
+            self.election_task.cancel()
+            try:
+                await self.election_task
+            except asyncio.CancelledError:
+                pass
+            self.election_task = None
+
+        await self._step_down("shutdown")
+        try:
+            await self.lease.release()
+        except Exception as e:
+            logger.warning(f"Could not release lease: {e}")
+
+    async def _election_loop(self):
+        """Acquire or renew the lease every heartbeat"""
+        while True:
+            try:
+                acquired = await self.lease.try_acquire()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Lease heartbeat failed: {e}")
+                acquired = None
+
+            now = datetime.now(timezone.utc)
+            if acquired:
+                self.last_renewed = now
+                if not self.is_leader:
+                    self.is_leader = True
+                    logger.info(f"👑 {self.holder_id} elected leader")
+                    await self._take_office()
+            elif acquired is False:
+                await self._step_down("lease held by another process")
+            elif self.is_leader and self.last_renewed and (now - self.last_renewed).total_seconds() > self.ttl_seconds:
+                # Heartbeats kept failing: others may already consider the lease expired
+                await self._step_down("lease could not be renewed before expiry")
+
+            await asyncio.sleep(self.heartbeat_interval)
+
+    async def _take_office(self):
+        """Run the elected callback; if it fails, step down and free the lease for another process"""
+        try:
+            await self.on_elected()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"❌ {self.holder_id} could not start as leader: {e}")
+            await self._step_down("elected callback failed")
+            try:
+                await self.lease.release()
+            except Exception as release_error:
+                logger.warning(f"Could not release lease: {release_error}")
+
+    async def _step_down(self, reason: str):
+        """Run the revoke callback if this process was the leader"""
+        if not self.is_leader:
+            return
+        self.is_leader = False
+        logger.warning(f"{self.holder_id} stepping down: {reason}")
+        try:
+            await self.on_revoked()
+        except Exception as e:
+            logger.error(f"Error while stepping down: {e}")
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get current election status"""
+        return {
+            "holder_id": self.holder_id,
+            "backend": type(self.lease).__name__,
+            "is_leader": self.is_leader,
+            "last_renewed": self.last_renewed.isoformat() if self.last_renewed else None,
+            "ttl_seconds": self.ttl_seconds
+        }
+
+
+def create_leader_elector(
+    name: str,
+    on_elected: Callable[[], Awaitable[Any]],
+    on_revoked: Callable[[], Awaitable[Any]],
+) -> Optional[LeaderElector]:
+    """Build an elector from environment settings; None when election is disabled"""
+    backend = os.getenv("SCHEDULER_LEADER_BACKEND", "db").lower()
+    if backend == "none":
+        return None
+
+    ttl_seconds = int(os.getenv("SCHEDULER_LEASE_TTL", "30"))
+    holder_id = make_holder_id()
+
+    if backend == "file":
+        lease = FileLease(os.getenv("SCHEDULER_LOCK_FILE", f"{name}.lock"))
+    else:
+        lease = DatabaseLease(name, holder_id, ttl_seconds)
+
+    return LeaderElector(
+        lease,
+        on_elected=on_elected,
+        on_revoked=on_revoked,
+        heartbeat_interval=max(1.0, ttl_seconds / 3),
+        ttl_seconds=ttl_seconds,
+        holder_id=holder_id,
+    )
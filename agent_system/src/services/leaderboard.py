@@ -0,0 +1,396 @@
+"""
+Leaderboard Service - XP ledger awards and an in-memory ranking with O(log n) queries
+
+The ranking is an indexable skip list ordered by (-xp, user_id): position i is
+rank i + 1, ties go to the lower user id. It is bulk-built from one aggregate
+query over the ledger, then kept current by applying ledger rows past a
+high-water mark (rows written by this process or any other).
+"""
+import asyncio
+import json
+import math
+import os
+import random
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+from loguru import logger
+from sqlalchemy import select, func, tuple_
+from sqlalchemy.exc import IntegrityError
+from ..models.database import async_session
+from ..models.quest import Quest
+from ..models.user import User
+from ..models.xp_ledger import XPLedgerEntry
+
+
+class _Node:
+    __slots__ = ("key", "next", "width")
+
+    def __init__(self, key, height: int):
+        self.key = key
+        self.next: List[Optional["_Node"]] = [None] * height
+        # width[level]: level-0 steps from this node to next[level]
+        self.width: List[int] = [1] * height
+
+
+class IndexableSkipList:
+    """Sorted set of unique keys with O(log n) insert, remove, rank and index access"""
+
+    def __init__(self, max_levels: int = 24, seed: Optional[int] = None):
+        self.max_levels = max_levels
+        self.head = _Node(None, max_levels)
+        self.size = 0
+        self._random = random.Random(seed)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _random_height(self) -> int:
+        return min(self.max_levels, 1 + int(math.log(1.0 / (1.0 - self._random.random()), 2)))
+
+    @classmethod
+    def from_sorted(cls, keys, max_levels: int = 24, seed: Optional[int] = None) -> "IndexableSkipList":
+        """Build from keys already in ascending order in O(n)"""
+        skiplist = cls(max_levels, seed)
+        last = [skiplist.head] * max_levels
+        last_position = [0] * max_levels
+        position = 0
+        for key in keys:
+            position += 1
+            node = _Node(key, skiplist._random_height())
+            for level in range(len(node.next)):
+                last[level].next[level] = node
+                last[level].width[level] = position - last_position[level]
+                last[level] = node
+                last_position[level] = position
+        for level in range(max_levels):
+            last[level].width[level] = position + 1 - last_position[level]
+        skiplist.size = position
+        return skiplist
+
+    def _predecessors(self, key) -> Tuple[List[_Node], List[int]]:
+        """Rightmost node before key at every level, and the steps taken at each level"""
+        chain: List[_Node] = [self.head] * self.max_levels
+        steps = [0] * self.max_levels
+        node = self.head
+        for level in reversed(range(self.max_levels)):
+            while node.next[level] is not None and node.next[level].key < key:
+                steps[level] += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+        return chain, steps
+
+    def insert(self, key):
+        chain, steps_at_level = self._predecessors(key)
+        candidate = chain[0].next[0]
+        if candidate is not None and candidate.key == key:
+            raise KeyError(f"duplicate key {key!r}")
+
+        node = _Node(key, self._random_height())
+        steps = 0
+        for level in range(len(node.next)):
+            previous = chain[level]
+            node.next[level] = previous.next[level]
+            previous.next[level] = node
+            node.width[level] = previous.width[level] - steps
+            previous.width[level] = steps + 1
+            steps += steps_at_level[level]
+        for level in range(len(node.next), self.max_levels):
+            chain[level].width[level] += 1
+        self.size += 1
+
+    def remove(self, key):
+        chain, _ = self._predecessors(key)
+        node = chain[0].next[0]
+        if node is None or node.key != key:
+            raise KeyError(key)
+
+        for level in range(len(node.next)):
+            previous = chain[level]
+            previous.width[level] += node.width[level] - 1
+            previous.next[level] = node.next[level]
+        for level in range(len(node.next), self.max_levels):
+            chain[level].width[level] -= 1
+        self.size -= 1
+
+    def index(self, key) -> int:
+        """0-based position of key"""
+        node = self.head
+        position = 0
+        for level in reversed(range(self.max_levels)):
+            while node.next[level] is not None and node.next[level].key < key:
+                position += node.width[level]
+                node = node.next[level]
+        candidate = node.next[0]
+        if candidate is None or candidate.key != key:
+            raise KeyError(key)
+        return position
+
+    def _node_at(self, index: int) -> _Node:
+        if index < 0 or index >= self.size:
+            raise IndexError(index)
+        node = self.head
+        remaining = index + 1
+        for level in reversed(range(self.max_levels)):
+            while node.next[level] is not None and node.width[level] <= remaining:
+                remaining -= node.width[level]
+                node = node.next[level]
+        return node
+
+    def __getitem__(self, index: int):
+        return self._node_at(index).key
+
+    def iter_from(self, index: int, count: int) -> Iterator:
+        """Up to count keys starting at a 0-based position"""
+        if count <= 0 or index >= self.size:
+            return
+        node = self._node_at(max(0, index))
+        while node is not None and count > 0:
+            yield node.key
+            node = node.next[0]
+            count -= 1
+
+
+def xp_reward(quest_metadata: Optional[str], target_value: Optional[int]) -> int:
+    """XP granted for completing a quest (rewards.points, else 10 per target unit)"""
+    metadata = json.loads(quest_metadata) if quest_metadata else {}
+    return int(metadata.get("rewards", {}).get("points", (target_value or 0) * 10))
+
+
+def quest_xp_reward(quest: Quest) -> int:
+    return xp_reward(quest.quest_metadata, quest.target_value)
+
+
+class LeaderboardService:
+    """Awards XP through the ledger and answers ranking queries from memory"""
+
+    def __init__(self):
+        self.sync_interval = int(os.getenv("LEADERBOARD_SYNC_INTERVAL", "5"))
+        self.scores: Dict[int, int] = {}
+        self.completions: Dict[int, int] = {}
+        self.ranking = IndexableSkipList()
+        # Ledger ids are handed out before commit, so a row with a lower id can
+        # become visible after a higher one. Each sync re-reads the trailing
+        # LEADERBOARD_SYNC_LOOKBACK ids and skips those already applied.
+        self.sync_lookback = int(os.getenv("LEADERBOARD_SYNC_LOOKBACK", "1000"))
+        self.high_water_id = 0
+        self.recent_ids: Set[int] = set()
+        self.loaded = False
+        self.lock = asyncio.Lock()
+        self.sync_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _key(user_id: int, xp: int) -> Tuple[int, int]:
+        return (-xp, user_id)
+
+    def _apply(self, user_id: int, amount: int, completions: int):
+        """Move a user to their new position after an award"""
+        previous = self.scores.get(user_id)
+        if previous is not None:
+            self.ranking.remove(self._key(user_id, previous))
+        score = (previous or 0) + amount
+        self.scores[user_id] = score
+        self.completions[user_id] = self.completions.get(user_id, 0) + completions
+        self.ranking.insert(self._key(user_id, score))
+
+    async def load(self):
+        """Rebuild the ranking from one aggregate pass over the ledger"""
+        async with self.lock:
+            async with async_session() as session:
+                high_water_id = (await session.execute(select(func.max(XPLedgerEntry.id)))).scalar() or 0
+                stmt = (
+                    select(
+                        XPLedgerEntry.user_id,
+                        func.sum(XPLedgerEntry.amount),
+                        func.count(XPLedgerEntry.quest_id)
+                    )
+                    .where(XPLedgerEntry.id <= high_water_id)
+                    .group_by(XPLedgerEntry.user_id)
+                )
+                scores: Dict[int, int] = {}
+                completions: Dict[int, int] = {}
+                stream = await session.stream(stmt.execution_options(yield_per=10000))
+                async for partition in stream.partitions():
+                    for user_id, total, completed in partition:
+                        scores[user_id] = int(total or 0)
+                        completions[user_id] = completed
+                recent_ids = set((await session.execute(
+                    select(XPLedgerEntry.id).where(
+                        XPLedgerEntry.id > high_water_id - self.sync_lookback,
+                        XPLedgerEntry.id <= high_water_id
+                    )
+                )).scalars().all())
+
+            self.ranking = IndexableSkipList.from_sorted(sorted(self._key(user_id, xp) for user_id, xp in scores.items()))
+            self.scores = scores
+            self.completions = completions
+            self.high_water_id = high_water_id
+            self.recent_ids = recent_ids
+            self.loaded = True
+            logger.info(f"🏆 Leaderboard loaded: {len(scores)} users, ledger up to #{high_water_id}")
+
+    async def sync(self) -> int:
+        """Apply ledger rows written since the last sync. Returns the number applied."""
+        if not self.loaded:
+            await self.load()
+            return 0
+
+        async with self.lock:
+            async with async_session() as session:
+                stmt = (
+                    select(XPLedgerEntry.id, XPLedgerEntry.user_id, XPLedgerEntry.amount, XPLedgerEntry.quest_id)
+                    .where(XPLedgerEntry.id > self.high_water_id - self.sync_lookback)
+                    .order_by(XPLedgerEntry.id)
+                )
+                rows = [row for row in (await session.execute(stmt)).all() if row.id not in self.recent_ids]
+
+            for entry_id, user_id, amount, quest_id in rows:
+                self._apply(user_id, amount, 1 if quest_id is not None else 0)
+                self.recent_ids.add(entry_id)
+                self.high_water_id = max(self.high_water_id, entry_id)
+            floor = self.high_water_id - self.sync_lookback
+            self.recent_ids = {entry_id for entry_id in self.recent_ids if entry_id > floor}
+            return len(rows)
+
+    async def award_quest_completion(self, user_id: int, quest: Quest) -> Optional[int]:
+        """Append the XP entry for a completed quest. Returns the amount, or None if already awarded."""
+        amount = quest_xp_reward(quest)
+        async with async_session() as session:
+            session.add(XPLedgerEntry(user_id=user_id, quest_id=quest.id, amount=amount, reason="quest_completed"))
+            try:
+                await session.commit()
+            except IntegrityError:
+                await session.rollback()
+                return None
+
+        logger.info(f"🏅 User {user_id} earned {amount} XP for quest {quest.id}")
+        await self.sync()
+        return amount
+
+    async def award_completions(self, awards: List[Tuple[int, int, int]]) -> int:
+        """
+        Append XP entries for many (user_id, quest_id, amount) completions in one
+        transaction, skipping pairs already in the ledger. Returns the number written.
+        """
+        if not awards:
+            return 0
+        async with async_session() as session:
+            existing = set((await session.execute(
+                select(XPLedgerEntry.user_id, XPLedgerEntry.quest_id)
+                .where(tuple_(XPLedgerEntry.user_id, XPLedgerEntry.quest_id).in_([(user_id, quest_id) for user_id, quest_id, _ in awards]))
+            )).all())
+            rows = [
+                {"user_id": user_id, "quest_id": quest_id, "amount": amount, "reason": "quest_completed"}
+                for user_id, quest_id, amount in awards
+                if (user_id, quest_id) not in existing
+            ]
+            written = len(rows)
+            if rows:
+                try:
+                    await session.execute(XPLedgerEntry.__table__.insert(), rows)
+                    await session.commit()
+                except IntegrityError:
+                    # A concurrent award won the race; fall back to one row at a time
+                    await session.rollback()
+                    written = 0
+                    for row in rows:
+                        try:
+                            await session.execute(XPLedgerEntry.__table__.insert(), row)
+                            await session.commit()
+                            written += 1
+                        except IntegrityError:
+                            await session.rollback()
+
+        if written:
+            logger.info(f"🏅 {written} quest completions earned XP")
+            await self.sync()
+        return written
+
+    def _entry(self, position: int, key: Tuple[int, int]) -> Dict[str, Any]:
+        user_id = key[1]
+        return {
+            "rank": position + 1,
+            "user_id": user_id,
+            "xp": -key[0],
+            "completed_quests": self.completions.get(user_id, 0)
+        }
+
+    async def _ensure_loaded(self):
+        if not self.loaded:
+            await self.load()
+
+    async def top(self, limit: int = 10, offset: int = 0) -> List[Dict[str, Any]]:
+        """Ranks offset+1 .. offset+limit"""
+        await self._ensure_loaded()
+        return [self._entry(offset + index, key) for index, key in enumerate(self.ranking.iter_from(offset, limit))]
+
+    async def rank_of(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """Rank entry of one user (None if they have no XP yet)"""
+        await self._ensure_loaded()
+        xp = self.scores.get(user_id)
+        if xp is None:
+            return None
+        key = self._key(user_id, xp)
+        return self._entry(self.ranking.index(key), key)
+
+    async def around(self, user_id: int, radius: int = 5) -> List[Dict[str, Any]]:
+        """Up to radius entries above and below a user"""
+        entry = await self.rank_of(user_id)
+        if entry is None:
+            return []
+        start = max(0, entry["rank"] - 1 - radius)
+        return [self._entry(start + index, key) for index, key in enumerate(self.ranking.iter_from(start, 2 * radius + 1))]
+
+    async def attach_addresses(self, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Add wallet addresses to a page of entries"""
+        user_ids = [entry["user_id"] for entry in entries]
+        if not user_ids:
+            return entries
+        async with async_session() as session:
+            result = await session.execute(select(User.id, User.address).where(User.id.in_(user_ids)))
+            addresses = dict(result.all())
+        for entry in entries:
+            entry["address"] = addresses.get(entry["user_id"])
+        return entries
+
+    async def start(self):
+        """Load the ranking and keep applying new ledger rows"""
+        if self.sync_task:
+            return
+        try:
+            await self.load()
+        except Exception as e:
+            logger.error(f"Leaderboard load failed: {e}")
+        self.sync_task = asyncio.create_task(self._sync_loop())
+
+    async def stop(self):
+        """Stop background syncing"""
+        if self.sync_task:
+            self.sync_task.cancel()
+            try:
+                await self.sync_task
+            except asyncio.CancelledError:
+                pass
+            self.sync_task = None
+
+    async def _sync_loop(self):
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await self.sync()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Leaderboard sync failed: {e}")
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get current leaderboard status"""
+        return {
+            "loaded": self.loaded,
+            "users": len(self.ranking),
+            "ledger_high_water_id": self.high_water_id,
+            "sync_interval": self.sync_interval,
+            "sync_lookback": self.sync_lookback
+        }
+
+
+# Global service instance
+leaderboard_service = LeaderboardService()
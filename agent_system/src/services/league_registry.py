@@ -0,0 +1,88 @@
+"""
+League Registry - Leagues, team mappings and poll budgets stored in the database
+
+The ESPN service's league_mappings and team_mappings are loaded from the
+leagues and league_teams tables, so covering a new competition is an INSERT
+instead of a code change. The built-in mappings seed empty tables.
+"""
+import math
+import os
+from datetime import datetime
+from typing import Any, Dict, Optional
+from loguru import logger
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from ..models.database import async_session
+from ..models.league import League, LeagueTeam
+from .espn_football_service import espn_football_service
+
+
+class LeagueRegistry:
+    """Loads the league catalogue into the ESPN service and knows each league's poll budget"""
+
+    def __init__(self):
+        # Polls per hour for leagues without their own budget (0 = no limit)
+        self.default_poll_budget = int(os.getenv("SCHEDULER_LEAGUE_POLL_BUDGET", "0"))
+        self.budgets: Dict[str, int] = {}
+        self.loaded_at: Optional[datetime] = None
+
+    async def ensure_defaults(self):
+        """Seed the registry from the built-in ESPN mappings when it is empty"""
+        async with async_session() as session:
+            if (await session.execute(select(func.count()).select_from(League))).scalar_one():
+                return
+
+            session.add_all(League(code=code, name=name) for name, code in espn_football_service.league_mappings.items())
+            session.add_all(
+                LeagueTeam(team_name=team_name, espn_id=mapping["id"], league_code=mapping["league"])
+                for team_name, mapping in espn_football_service.team_mappings.items()
+            )
+            try:
+                await session.commit()
+                logger.info(f"🗂️ League registry seeded with {len(espn_football_service.league_mappings)} leagues")
+            except IntegrityError:
+                # Another worker seeded it first
+                await session.rollback()
+
+    async def load(self) -> Dict[str, Any]:
+        """Replace the ESPN service mappings with the active registry rows"""
+        async with async_session() as session:
+            leagues = (await session.execute(
+                select(League).where(League.is_active == True).order_by(League.code)
+            )).scalars().all()
+            teams = (await session.execute(
+                select(LeagueTeam).where(LeagueTeam.is_active == True)
+            )).scalars().all()
+
+        if not leagues:
+            logger.warning("League registry is empty, keeping the current ESPN mappings")
+            return self.get_status()
+
+        # New dicts instead of in-place updates: loops already iterating keep a consistent view
+        espn_football_service.league_mappings = {league.name: league.code for league in leagues}
+        espn_football_service.team_mappings = {
+            team.team_name: {"league": team.league_code, "id": team.espn_id} for team in teams
+        }
+        self.budgets = {league.code: league.max_polls_per_hour for league in leagues if league.max_polls_per_hour}
+        self.loaded_at = datetime.now()
+        logger.info(f"🗂️ League registry loaded: {len(leagues)} leagues, {len(teams)} teams")
+        return self.get_status()
+
+    def min_poll_interval(self, league_code: str) -> int:
+        """Shortest allowed delay between two polls of a league, from its budget"""
+        budget = self.budgets.get(league_code) or self.default_poll_budget
+        return math.ceil(3600 / budget) if budget > 0 else 0
+
+    def get_status(self) -> Dict[str, Any]:
+        """Registry size and budgets"""
+        return {
+            "leagues": len(espn_football_service.league_mappings),
+            "teams": len(espn_football_service.team_mappings),
+            "default_poll_budget": self.default_poll_budget,
+            "budgets": self.budgets,
+            "loaded_at": self.loaded_at.isoformat() if self.loaded_at else None
+        }
+
+
+# Global service instance
+league_registry = LeagueRegistry()
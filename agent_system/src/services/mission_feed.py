@@ -0,0 +1,227 @@
+"""
+Mission Feed Service - Precomputed, versioned snapshot of active missions for read-heavy pages
+
+Page loads read a snapshot whose JSON bodies (full feed and one slice per team)
+are serialized ahead of time. Quest writes request a debounced rebuild and a
+periodic refresh picks up changes made by other processes.
+"""
+import asyncio
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from loguru import logger
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+from ..models.database import async_session
+from ..models.quest import Quest, QuestStatus
+from ..core.offload import cpu_offload, cpu_bound
+from ..core.response_cache import etag_matches, make_etag
+
+
+def mission_to_dict(quest: Quest) -> Dict[str, Any]:
+    """Mission card payload (same shape as the /api/quests list items)"""
+    metadata = json.loads(quest.quest_metadata) if quest.quest_metadata else {}
+    rewards = metadata.get("rewards", {})
+    target_value = quest.target_value or 0
+
+    return {
+        "id": quest.id,
+        "title": quest.title,
+        "description": quest.description,
+        "quest_type": quest.quest_type.value,
+        "status": quest.status.value,
+        "team_name": quest.team.name if quest.team else "Unknown Team",
+        "team_id": quest.team_id,
+        "user_id": quest.user_id,
+        "target_metric": quest.target_metric,
+        "target_value": quest.target_value,
+        "current_progress": quest.current_progress,
+        "xp_reward": rewards.get("points", target_value * 10),
+        "points_reward": rewards.get("points", target_value * 5),
+        "badges": rewards.get("badges", []),
+        "difficulty": metadata.get("difficulty", "medium"),
+        "created_at": quest.created_at.isoformat() if quest.created_at else None,
+        "metadata": metadata
+    }
+
+
+@dataclass
+class FeedSlice:
+    """Serialized response body and its ETag"""
+    body: bytes
+    etag: str
+
+
+@dataclass
+class FeedSnapshot:
+    """One immutable version of the feed"""
+    version: int
+    content_hash: str
+    built_at: datetime
+    full: FeedSlice
+    teams: Dict[int, FeedSlice] = field(default_factory=dict)
+    mission_count: int = 0
+
+
+@cpu_bound
+def build_snapshot(missions: List[Dict[str, Any]], version: int) -> FeedSnapshot:
+    """Serialize the full feed and every per-team slice once"""
+    built_at = datetime.now(timezone.utc)
+    content_hash = hashlib.sha1(json.dumps(missions, sort_keys=True, default=str).encode()).hexdigest()
+
+    def serialize(items: List[Dict[str, Any]], team_id: Optional[int]) -> FeedSlice:
+        body = json.dumps({
+            "version": version,
+            "generated_at": built_at.isoformat(),
+            "team_id": team_id,
+            "total": len(items),
+            "missions": items
+        }, default=str).encode()
+        # The ETag covers the missions only, so rebuilding unchanged content keeps it valid
+        return FeedSlice(body=body, etag=make_etag(f"{content_hash}:{team_id}".encode()))
+
+    by_team: Dict[int, List[Dict[str, Any]]] = {}
+    for mission in missions:
+        by_team.setdefault(mission["team_id"], []).append(mission)
+
+    return FeedSnapshot(
+        version=version,
+        content_hash=content_hash,
+        built_at=built_at,
+        full=serialize(missions, None),
+        teams={team_id: serialize(items, team_id) for team_id, items in by_team.items()},
+        mission_count=len(missions)
+    )
+
+
+class MissionFeedService:
+    """Keeps the mission feed snapshot current"""
+
+    def __init__(self):
+        self.max_missions = int(os.getenv("FEED_MAX_MISSIONS", "500"))
+        self.refresh_interval = int(os.getenv("FEED_REFRESH_INTERVAL", "60"))
+        self.debounce_seconds = float(os.getenv("FEED_REFRESH_DEBOUNCE", "2"))
+        # Smaller feeds serialize in about a millisecond, less than the trip to the offload pool
+        self.offload_min_missions = int(os.getenv("FEED_OFFLOAD_MIN_MISSIONS", "100"))
+        self.snapshot: Optional[FeedSnapshot] = None
+        self.refresh_lock = asyncio.Lock()
+        self.pending_refresh: Optional[asyncio.Task] = None
+        self.initial_build: Optional[asyncio.Task] = None
+        self.refresh_task: Optional[asyncio.Task] = None
+
+    async def _load_missions(self) -> List[Dict[str, Any]]:
+        """Active and pending quests, newest first"""
+        async with async_session() as session:
+            stmt = (
+                select(Quest)
+                .options(selectinload(Quest.team))
+                .where(
+                    Quest.is_active == True,
+                    Quest.status.in_([QuestStatus.ACTIVE, QuestStatus.PENDING])
+                )
+                .order_by(Quest.created_at.desc(), Quest.id.desc())
+                .limit(self.max_missions)
+            )
+            result = await session.execute(stmt)
+            return [mission_to_dict(quest) for quest in result.scalars().all()]
+
+    async def refresh(self) -> FeedSnapshot:
+        """Rebuild the snapshot; the version only moves when the content changed"""
+        async with self.refresh_lock:
+            missions = await self._load_missions()
+            current = self.snapshot
+            # The first build runs here: requests are already waiting and the pool may still be starting
+            candidate = await cpu_offload.run(
+                build_snapshot, missions, (current.version + 1) if current else 1,
+                inline=current is None or len(missions) < self.offload_min_missions
+            )
+
+            if current and current.content_hash == candidate.content_hash:
+                return current
+
+            self.snapshot = candidate
+            logger.info(f"📰 Mission feed v{candidate.version}: {candidate.mission_count} missions, {len(candidate.teams)} teams")
+            return candidate
+
+    def request_refresh(self):
+        """Schedule a debounced rebuild after quest writes (bursts collapse into one refresh)"""
+        if self.pending_refresh and not self.pending_refresh.done():
+            return
+        if self.snapshot is None:
+            # Nothing cached in this process (e.g. an api-write worker): the first read builds it
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self.pending_refresh = loop.create_task(self._debounced_refresh())
+
+    async def _debounced_refresh(self):
+        await asyncio.sleep(self.debounce_seconds)
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.error(f"Mission feed refresh failed: {e}")
+
+    async def get_slice(self, team_id: Optional[int] = None) -> Tuple[FeedSnapshot, Optional[FeedSlice]]:
+        """Current snapshot and the requested slice (None for a team without missions)"""
+        snapshot = self.snapshot
+        if snapshot is None:
+            # Concurrent first requests share one build instead of queueing on the lock
+            if self.initial_build is None or self.initial_build.done():
+                self.initial_build = asyncio.create_task(self.refresh())
+            snapshot = await asyncio.shield(self.initial_build)
+        if team_id is None:
+            return snapshot, snapshot.full
+        return snapshot, snapshot.teams.get(team_id)
+
+    async def start(self):
+        """Build the first snapshot and keep refreshing in the background"""
+        if self.refresh_task:
+            return
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.error(f"Initial mission feed build failed: {e}")
+        self.refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        """Stop background refreshes"""
+        for task in (self.refresh_task, self.pending_refresh):
+            if task and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self.refresh_task = None
+        self.pending_refresh = None
+
+    async def _refresh_loop(self):
+        """Periodic rebuild for changes made outside this process (other workers, expiry)"""
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Mission feed refresh failed: {e}")
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get current feed status"""
+        snapshot = self.snapshot
+        return {
+            "version": snapshot.version if snapshot else None,
+            "built_at": snapshot.built_at.isoformat() if snapshot else None,
+            "missions": snapshot.mission_count if snapshot else 0,
+            "teams": len(snapshot.teams) if snapshot else 0,
+            "refresh_interval": self.refresh_interval
+        }
+
+
+# Global service instance
+mission_feed = MissionFeedService()
@@ -0,0 +1,343 @@
+"""
+Progress Ingestion Service - Coalesced, atomic quest progress writes
+
+Progress events are summed in memory per (quest, user) and flushed every
+PROGRESS_FLUSH_INTERVAL seconds (or early when the buffer fills). A flush is
+one transaction of executemany `x = x + :delta` updates, so concurrent
+workers never overwrite each other:
+
+- Personal quests count on the quest row and only take their owner's events.
+- Team quests count per fan on the fan's inbox row (quest_assignments), so
+  every follower completes and earns XP on their own; fans without the quest
+  in their inbox are ignored. The quest row keeps the team-wide total.
+- Collective quests are one community goal counted on the quest row.
+
+Then one UPDATE ... RETURNING flips the personal and collective quests that
+reached their target to COMPLETED, another stamps completed_at on the inbox
+rows that did, and XP for completed personal quests and inbox rows goes to
+the ledger in one bulk insert.
+
+Events still buffered when a process dies are lost; stop() flushes on shutdown.
+"""
+import asyncio
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from loguru import logger
+from sqlalchemy import bindparam, func, or_, select, tuple_, update
+from ..core.metrics import metrics_registry
+from ..models.database import async_session
+from ..models.quest import Quest, QuestStatus, QuestType
+from ..models.quest_assignment import QuestAssignment
+from ..models.user import User
+from .leaderboard import leaderboard_service, xp_reward
+from .mission_feed import mission_feed
+
+
+progress_events = metrics_registry.counter(
+    "progress_events_total",
+    "Quest progress events received (outcome: accepted, rejected)",
+    ["outcome"],
+)
+progress_flush_duration = metrics_registry.histogram(
+    "progress_flush_duration_seconds",
+    "Duration of one coalesced progress flush",
+)
+progress_completions = metrics_registry.counter(
+    "progress_completions_total",
+    "Completions written by progress ingestion (scope: quest, assignment)",
+    ["scope"],
+)
+
+_quests = Quest.__table__
+_assignments = QuestAssignment.__table__
+_OPEN_STATUSES = [QuestStatus.PENDING, QuestStatus.ACTIVE]
+
+# Quests are only incremented while open (the status test is repeated here
+# so a quest closed after the ownership lookup is left alone)
+_INCREMENT = (
+    update(_quests)
+    .where(
+        _quests.c.id == bindparam("b_quest_id"),
+        _quests.c.is_active == True,
+        or_(*(_quests.c.status == status for status in _OPEN_STATUSES))
+    )
+    .values(current_progress=func.coalesce(_quests.c.current_progress, 0) + bindparam("b_delta"))
+)
+
+# A fan's own progress on a team quest, until they complete it
+_INCREMENT_ASSIGNMENT = (
+    update(_assignments)
+    .where(
+        _assignments.c.user_id == bindparam("b_user_id"),
+        _assignments.c.quest_id == bindparam("b_quest_id"),
+        _assignments.c.completed_at.is_(None)
+    )
+    .values(progress=_assignments.c.progress + bindparam("b_delta"))
+)
+
+
+@dataclass
+class ProgressEvent:
+    """One progress report; the user is given by id or wallet address"""
+    quest_id: int
+    delta: int
+    user_id: Optional[int] = None
+    address: Optional[str] = None
+
+
+class ProgressIngestionService:
+    """Buffers progress events and applies them in bulk"""
+
+    def __init__(self):
+        self.flush_interval = float(os.getenv("PROGRESS_FLUSH_INTERVAL", "0.1"))
+        self.max_pending = int(os.getenv("PROGRESS_MAX_PENDING", "20000"))
+        self.max_delta = int(os.getenv("PROGRESS_MAX_DELTA", "1000"))
+        # (quest_id, user_id or None, address or None) -> summed delta
+        self.pending: Dict[Tuple[int, Optional[int], Optional[str]], int] = {}
+        self.pending_events = 0
+        self.flush_lock = asyncio.Lock()
+        self.flush_wakeup: Optional[asyncio.Event] = None
+        self.flushed: Optional[asyncio.Future] = None
+        self.flush_task: Optional[asyncio.Task] = None
+        self.totals = {"accepted": 0, "rejected": 0, "flushes": 0, "updated_rows": 0, "completed": 0, "completed_by_fans": 0}
+
+    def submit(self, events: List[ProgressEvent]) -> Dict[str, int]:
+        """Add events to the buffer (no I/O). Returns accepted and rejected counts."""
+        accepted = 0
+        for event in events:
+            if event.delta <= 0 or event.delta > self.max_delta or (event.user_id is None and not event.address):
+                continue
+            key = (event.quest_id, event.user_id, None if event.user_id is not None else event.address.lower())
+            self.pending[key] = self.pending.get(key, 0) + event.delta
+            accepted += 1
+
+        rejected = len(events) - accepted
+        self.pending_events += accepted
+        self.totals["accepted"] += accepted
+        self.totals["rejected"] += rejected
+        progress_events.inc(accepted, outcome="accepted")
+        progress_events.inc(rejected, outcome="rejected")
+
+        if len(self.pending) >= self.max_pending and self.flush_wakeup:
+            self.flush_wakeup.set()
+        return {"accepted": accepted, "rejected": rejected}
+
+    async def wait_for_flush(self) -> Dict[str, Any]:
+        """Wait until the events buffered so far have been written"""
+        if self.flushed is None or self.flushed.done():
+            self.flushed = asyncio.get_running_loop().create_future()
+        waiter = self.flushed
+        if self.flush_wakeup:
+            self.flush_wakeup.set()
+        else:
+            return await self.flush()
+        return await asyncio.shield(waiter)
+
+    async def _resolve_addresses(self, session, addresses: List[str]) -> Dict[str, int]:
+        result = await session.execute(select(func.lower(User.address), User.id).where(func.lower(User.address).in_(addresses)))
+        return dict(result.all())
+
+    async def flush(self) -> Dict[str, Any]:
+        """Apply all buffered events in one transaction"""
+        async with self.flush_lock:
+            batch, self.pending = self.pending, {}
+            events, self.pending_events = self.pending_events, 0
+            waiter, self.flushed = self.flushed, None
+            summary = {"events": events, "updated_rows": 0, "completed": 0, "completed_by_fans": 0}
+            try:
+                if batch:
+                    summary = await self._apply(batch, events)
+            except Exception as e:
+                if waiter and not waiter.done():
+                    waiter.set_exception(e)
+                raise
+            if waiter and not waiter.done():
+                waiter.set_result(summary)
+            return summary
+
+    async def _apply(self, batch: Dict[Tuple[int, Optional[int], Optional[str]], int], events: int) -> Dict[str, Any]:
+        start = time.perf_counter()
+        async with async_session() as session:
+            addresses = sorted({address for _, user_id, address in batch if user_id is None})
+            address_ids = await self._resolve_addresses(session, addresses) if addresses else {}
+            resolved = [
+                (quest_id, user_id if user_id is not None else address_ids.get(address), delta)
+                for (quest_id, user_id, address), delta in batch.items()
+            ]
+            resolved = [(quest_id, user_id, delta) for quest_id, user_id, delta in resolved if user_id is not None]
+
+            # Every open quest in the batch: owner, type and reward
+            quests = {
+                row.id: row
+                for row in (await session.execute(
+                    select(_quests.c.id, _quests.c.user_id, _quests.c.quest_type, _quests.c.target_value, _quests.c.quest_metadata)
+                    .where(
+                        _quests.c.id.in_({quest_id for quest_id, _, _ in resolved}),
+                        _quests.c.is_active == True,
+                        _quests.c.status.in_(_OPEN_STATUSES)
+                    )
+                )).all()
+            }
+            per_fan = {quest_id for quest_id, row in quests.items() if row.user_id is None and row.quest_type != QuestType.COLLECTIVE}
+
+            # Team quests only count for fans who have them in their inbox and have not completed them
+            inbox = set()
+            if per_fan:
+                inbox = set((await session.execute(
+                    select(_assignments.c.user_id, _assignments.c.quest_id).where(
+                        _assignments.c.quest_id.in_(per_fan),
+                        _assignments.c.user_id.in_({user_id for _, user_id, _ in resolved}),
+                        _assignments.c.completed_at.is_(None)
+                    )
+                )).all())
+
+            increments: Dict[int, int] = {}
+            fan_increments: Dict[Tuple[int, int], int] = {}
+            for quest_id, user_id, delta in resolved:
+                quest = quests.get(quest_id)
+                if quest is None:
+                    continue
+                if quest.user_id is not None and quest.user_id != user_id:
+                    continue
+                if quest_id in per_fan:
+                    if (user_id, quest_id) not in inbox:
+                        continue
+                    fan_increments[(user_id, quest_id)] = fan_increments.get((user_id, quest_id), 0) + delta
+                increments[quest_id] = increments.get(quest_id, 0) + delta
+
+            # One row per quest or inbox entry, in key order so concurrent flushes lock rows in the same order
+            params = [{"b_quest_id": quest_id, "b_delta": delta} for quest_id, delta in sorted(increments.items())]
+            fan_params = [
+                {"b_user_id": user_id, "b_quest_id": quest_id, "b_delta": delta}
+                for (user_id, quest_id), delta in sorted(fan_increments.items())
+            ]
+            updated_rows = 0
+            completed: List[Tuple[int, Optional[int], Optional[int], Optional[str]]] = []
+            completed_by_fans: List[Tuple[int, int]] = []
+            if params:
+                result = await session.execute(_INCREMENT, params)
+                updated_rows = max(result.rowcount, 0)
+
+                # Personal and collective quests complete as a whole
+                flip = (
+                    update(_quests)
+                    .where(
+                        _quests.c.id.in_([quest_id for quest_id in increments if quest_id not in per_fan]),
+                        _quests.c.status.in_(_OPEN_STATUSES),
+                        _quests.c.target_value.is_not(None),
+                        _quests.c.current_progress >= _quests.c.target_value
+                    )
+                    .values(status=QuestStatus.COMPLETED)
+                    .returning(_quests.c.id, _quests.c.user_id, _quests.c.target_value, _quests.c.quest_metadata)
+                )
+                completed = (await session.execute(flip)).all()
+            if fan_params:
+                await session.execute(_INCREMENT_ASSIGNMENT, fan_params)
+
+                # Team quests complete per fan
+                target = select(_quests.c.target_value).where(_quests.c.id == _assignments.c.quest_id).scalar_subquery()
+                flip_fans = (
+                    update(_assignments)
+                    .where(
+                        tuple_(_assignments.c.user_id, _assignments.c.quest_id).in_(list(fan_increments)),
+                        _assignments.c.completed_at.is_(None),
+                        _assignments.c.progress >= target
+                    )
+                    .values(completed_at=datetime.now(timezone.utc))
+                    .returning(_assignments.c.user_id, _assignments.c.quest_id)
+                )
+                completed_by_fans = (await session.execute(flip_fans)).all()
+            await session.commit()
+
+        progress_flush_duration.observe(time.perf_counter() - start)
+        progress_completions.inc(len(completed), scope="quest")
+        progress_completions.inc(len(completed_by_fans), scope="assignment")
+        self.totals["flushes"] += 1
+        self.totals["updated_rows"] += updated_rows
+        self.totals["completed"] += len(completed)
+        self.totals["completed_by_fans"] += len(completed_by_fans)
+
+        if params:
+            mission_feed.request_refresh()
+
+        # Completed personal quests pay their owner, completed inbox rows their fan
+        awards = [
+            (user_id, quest_id, xp_reward(quest_metadata, target_value))
+            for quest_id, user_id, target_value, quest_metadata in completed
+            if user_id is not None
+        ] + [
+            (user_id, quest_id, xp_reward(quests[quest_id].quest_metadata, quests[quest_id].target_value))
+            for user_id, quest_id in completed_by_fans
+        ]
+        if awards:
+            try:
+                await leaderboard_service.award_completions(awards)
+            except Exception as e:
+                logger.error(f"XP award for {len(awards)} completed quests failed: {e}")
+
+        if completed or completed_by_fans:
+            logger.info(
+                f"🎯 Progress flush: {events} events, {len(params)} quest updates, "
+                f"{len(completed)} quests and {len(completed_by_fans)} fan completions"
+            )
+        return {
+            "events": events,
+            "updated_rows": updated_rows,
+            "completed": len(completed),
+            "completed_by_fans": len(completed_by_fans)
+        }
+
+    async def start(self):
+        """Start the periodic flush loop"""
+        if self.flush_task:
+            return
+        self.flush_wakeup = asyncio.Event()
+        self.flush_task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        """Stop the loop and write what is still buffered"""
+        if self.flush_task:
+            self.flush_task.cancel()
+            try:
+                await self.flush_task
+            except asyncio.CancelledError:
+                pass
+            self.flush_task = None
+            self.flush_wakeup = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Final progress flush failed: {e}")
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self.flush_wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self.flush_wakeup.clear()
+            if not self.pending and not self.flushed:
+                continue
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Progress flush failed: {e}")
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get current ingestion status"""
+        return {
+            "running": self.flush_task is not None,
+            "pending_keys": len(self.pending),
+            "pending_events": self.pending_events,
+            "flush_interval": self.flush_interval,
+            **self.totals
+        }
+
+
+# Global service instance
+progress_ingestor = ProgressIngestionService()
@@ -0,0 +1,136 @@
+"""
+Quest Fan-out Service - Writes team quests into their followers' inboxes
+
+When team quests are saved, one INSERT ... SELECT per slice of user_teams
+copies an assignment row to every follower, so the database does the join
+and no follower list is loaded into Python. A user's quest list is then a
+range read on the (user_id, quest_id) index of quest_assignments.
+"""
+import os
+from typing import Any, Dict, List
+from loguru import logger
+from sqlalchemy import and_, exists, func, literal, select
+from ..models.database import async_session
+from ..models.quest import Quest, QuestStatus
+from ..models.quest_assignment import QuestAssignment
+from ..models.user_team import UserTeam
+
+_assignments = QuestAssignment.__table__
+_quests = Quest.__table__
+_user_teams = UserTeam.__table__
+
+
+def _not_assigned(user_id_column, quest_id_column):
+    """Skip pairs already in the inbox so fan-out can be re-run safely"""
+    return ~exists().where(and_(_assignments.c.user_id == user_id_column, _assignments.c.quest_id == quest_id_column))
+
+
+class QuestFanoutService:
+    """Materializes per-user quest assignments"""
+
+    def __init__(self):
+        # user_teams rows covered by one INSERT ... SELECT (keeps each write transaction short)
+        self.batch_size = int(os.getenv("QUEST_FANOUT_BATCH", "50000"))
+        self.totals = {"fanouts": 0, "assignments": 0}
+
+    async def fan_out(self, quest_ids: List[int]) -> int:
+        """Assign team quests to every follower of their team. Returns the rows written."""
+        if not quest_ids:
+            return 0
+
+        async with async_session() as session:
+            team_ids = (await session.execute(
+                select(_quests.c.team_id).where(_quests.c.id.in_(quest_ids)).distinct()
+            )).scalars().all()
+            bounds = (await session.execute(
+                select(func.min(_user_teams.c.id), func.max(_user_teams.c.id)).where(_user_teams.c.team_id.in_(team_ids))
+            )).one()
+
+        if bounds[0] is None:
+            return 0
+
+        written = 0
+        for low in range(bounds[0], bounds[1] + 1, self.batch_size):
+            followers = (
+                select(_user_teams.c.user_id, _quests.c.id, _quests.c.team_id)
+                .join(_quests, _quests.c.team_id == _user_teams.c.team_id)
+                .where(
+                    _quests.c.id.in_(quest_ids),
+                    _quests.c.user_id.is_(None),
+                    _user_teams.c.id >= low,
+                    _user_teams.c.id < low + self.batch_size,
+                    _not_assigned(_user_teams.c.user_id, _quests.c.id)
+                )
+                .distinct()
+            )
+            async with async_session() as session:
+                result = await session.execute(
+                    _assignments.insert().from_select(["user_id", "quest_id", "team_id"], followers)
+                )
+                await session.commit()
+            written += max(result.rowcount, 0)
+
+        self.totals["fanouts"] += 1
+        self.totals["assignments"] += written
+        logger.info(f"📬 Fanned out {len(quest_ids)} quests to {written} inboxes")
+        return written
+
+    async def assign_open_team_quests(self, user_id: int, team_id: int) -> int:
+        """Backfill a new follower's inbox with the team's open quests"""
+        open_quests = (
+            select(literal(user_id), _quests.c.id, _quests.c.team_id)
+            .where(
+                _quests.c.team_id == team_id,
+                _quests.c.user_id.is_(None),
+                _quests.c.is_active == True,
+                _quests.c.status.in_([QuestStatus.PENDING, QuestStatus.ACTIVE]),
+                _not_assigned(literal(user_id), _quests.c.id)
+            )
+        )
+        async with async_session() as session:
+            result = await session.execute(
+                _assignments.insert().from_select(["user_id", "quest_id", "team_id"], open_quests)
+            )
+            await session.commit()
+        return max(result.rowcount, 0)
+
+    async def backfill_inboxes(self) -> int:
+        """
+        Put quests missing from inboxes into them: personal quests created
+        before inboxes existed, and the open team quests of every follower
+        (user_teams rows written without going through the follow route).
+        """
+        personal = (
+            select(_quests.c.user_id, _quests.c.id, _quests.c.team_id)
+            .where(_quests.c.user_id.is_not(None), _not_assigned(_quests.c.user_id, _quests.c.id))
+        )
+        team = (
+            select(_user_teams.c.user_id, _quests.c.id, _quests.c.team_id)
+            .join(_quests, _quests.c.team_id == _user_teams.c.team_id)
+            .where(
+                _quests.c.user_id.is_(None),
+                _quests.c.is_active == True,
+                _quests.c.status.in_([QuestStatus.PENDING, QuestStatus.ACTIVE]),
+                _not_assigned(_user_teams.c.user_id, _quests.c.id)
+            )
+            .distinct()
+        )
+        written = 0
+        async with async_session() as session:
+            for missing in (personal, team):
+                result = await session.execute(
+                    _assignments.insert().from_select(["user_id", "quest_id", "team_id"], missing)
+                )
+                written += max(result.rowcount, 0)
+            await session.commit()
+        if written:
+            logger.info(f"📬 Backfilled {written} quests into inboxes")
+        return written
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get fan-out totals"""
+        return {"batch_size": self.batch_size, **self.totals}
+
+
+# Global service instance
+quest_fanout = QuestFanoutService()
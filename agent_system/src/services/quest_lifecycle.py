@@ -0,0 +1,188 @@
+"""
+Quest Lifecycle Service - Moves quests PENDING -> ACTIVE -> EXPIRED on time
+
+Upcoming start and end times within a look-ahead horizon sit in a min-heap;
+the loop sleeps until the earliest one and then runs set-based UPDATEs
+(`status = PENDING AND start_time <= now`, `status IN (...) AND end_time <=
+now`) served by the (status, start_time) and (status, end_time) indexes. The
+updates are idempotent, so rows written by other processes are picked up by
+the periodic horizon reload and several workers may run the sweeper at once.
+"""
+import asyncio
+import heapq
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from loguru import logger
+from sqlalchemy import select, update, or_
+from ..models.database import async_session
+from ..models.quest import Quest, QuestStatus
+from .mission_feed import mission_feed
+
+
+def as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Treat naive datetimes (SQLite drops the offset) as UTC"""
+    if value is None or value.tzinfo is not None:
+        return value
+    return value.replace(tzinfo=timezone.utc)
+
+
+def default_quest_window(now: Optional[datetime] = None) -> Tuple[datetime, Optional[datetime]]:
+    """Start and end time for a quest created without explicit timing"""
+    start_time = now or datetime.now(timezone.utc)
+    hours = float(os.getenv("QUEST_DEFAULT_DURATION_HOURS", "72"))
+    return start_time, (start_time + timedelta(hours=hours)) if hours > 0 else None
+
+
+class QuestLifecycleService:
+    """Activates and expires quests at their start and end times"""
+
+    def __init__(self):
+        self.horizon = int(os.getenv("QUEST_LIFECYCLE_HORIZON", "3600"))
+        self.reload_interval = int(os.getenv("QUEST_LIFECYCLE_RELOAD_INTERVAL", "300"))
+        # (due_at, quest_id, transition) with transition "activate" or "expire"
+        self.heap: List[Tuple[datetime, int, str]] = []
+        self.wakeup: Optional[asyncio.Event] = None
+        self.sweep_task: Optional[asyncio.Task] = None
+        self.next_reload: Optional[datetime] = None
+        self.totals = {"sweeps": 0, "activated": 0, "expired": 0}
+
+    def schedule(self, quest_id: int, start_time: Optional[datetime], end_time: Optional[datetime]):
+        """
+        Register a new or retimed quest; wakes the loop if it is due before the current timer.
+        Only the process running the loop keeps a heap (others leave it to the horizon reload).
+        """
+        if self.sweep_task is None:
+            return
+        horizon_end = datetime.now(timezone.utc) + timedelta(seconds=self.horizon)
+        earliest = self.heap[0][0] if self.heap else None
+        for due_at, transition in ((as_utc(start_time), "activate"), (as_utc(end_time), "expire")):
+            if due_at is not None and due_at <= horizon_end:
+                heapq.heappush(self.heap, (due_at, quest_id, transition))
+        if self.wakeup and self.heap and (earliest is None or self.heap[0][0] < earliest):
+            self.wakeup.set()
+
+    async def load_upcoming(self):
+        """Rebuild the heap from transitions due within the horizon"""
+        now = datetime.now(timezone.utc)
+        horizon_end = now + timedelta(seconds=self.horizon)
+        async with async_session() as session:
+            starts = (await session.execute(
+                select(Quest.id, Quest.start_time).where(
+                    Quest.status == QuestStatus.PENDING,
+                    Quest.start_time <= horizon_end
+                )
+            )).all()
+            ends = (await session.execute(
+                select(Quest.id, Quest.end_time).where(
+                    Quest.status.in_([QuestStatus.PENDING, QuestStatus.ACTIVE]),
+                    Quest.end_time <= horizon_end
+                )
+            )).all()
+
+        heap = [(as_utc(start_time), quest_id, "activate") for quest_id, start_time in starts]
+        heap.extend((as_utc(end_time), quest_id, "expire") for quest_id, end_time in ends)
+        heapq.heapify(heap)
+        self.heap = heap
+        self.next_reload = now + timedelta(seconds=min(self.reload_interval, self.horizon))
+
+    async def sweep(self) -> Dict[str, int]:
+        """Apply every transition that is due now"""
+        now = datetime.now(timezone.utc)
+        async with async_session() as session:
+            expired = await session.execute(
+                update(Quest)
+                .where(
+                    Quest.status.in_([QuestStatus.PENDING, QuestStatus.ACTIVE]),
+                    Quest.end_time <= now
+                )
+                .values(status=QuestStatus.EXPIRED)
+                .execution_options(synchronize_session=False)
+            )
+            activated = await session.execute(
+                update(Quest)
+                .where(
+                    Quest.status == QuestStatus.PENDING,
+                    or_(Quest.start_time.is_(None), Quest.start_time <= now)
+                )
+                .values(status=QuestStatus.ACTIVE)
+                .execution_options(synchronize_session=False)
+            )
+            await session.commit()
+
+        while self.heap and self.heap[0][0] <= now:
+            heapq.heappop(self.heap)
+
+        counts = {"activated": max(activated.rowcount, 0), "expired": max(expired.rowcount, 0)}
+        self.totals["sweeps"] += 1
+        self.totals["activated"] += counts["activated"]
+        self.totals["expired"] += counts["expired"]
+        if counts["activated"] or counts["expired"]:
+            logger.info(f"⏱️ Quest lifecycle: {counts['activated']} activated, {counts['expired']} expired")
+            mission_feed.request_refresh()
+        return counts
+
+    async def start(self):
+        """Catch up on overdue transitions and start the timer loop"""
+        if self.sweep_task:
+            return
+        self.wakeup = asyncio.Event()
+        try:
+            await self.sweep()
+            await self.load_upcoming()
+        except Exception as e:
+            logger.error(f"Quest lifecycle startup sweep failed: {e}")
+        self.sweep_task = asyncio.create_task(self._sweep_loop())
+
+    async def stop(self):
+        """Stop the timer loop"""
+        if self.sweep_task:
+            self.sweep_task.cancel()
+            try:
+                await self.sweep_task
+            except asyncio.CancelledError:
+                pass
+            self.sweep_task = None
+            self.wakeup = None
+
+    def _seconds_until_next(self) -> float:
+        now = datetime.now(timezone.utc)
+        candidates = [self.next_reload or now]
+        if self.heap:
+            candidates.append(self.heap[0][0])
+        return max(0.0, (min(candidates) - now).total_seconds())
+
+    async def _sweep_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=self._seconds_until_next())
+                self.wakeup.clear()
+                continue  # an earlier transition was scheduled; recompute the timer
+            except asyncio.TimeoutError:
+                pass
+
+            try:
+                now = datetime.now(timezone.utc)
+                if self.heap and self.heap[0][0] <= now:
+                    await self.sweep()
+                if self.next_reload is None or self.next_reload <= now:
+                    await self.load_upcoming()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Quest lifecycle sweep failed: {e}")
+                await asyncio.sleep(5)
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get current lifecycle status"""
+        return {
+            "running": self.sweep_task is not None,
+            "scheduled": len(self.heap),
+            "next_transition": self.heap[0][0].isoformat() if self.heap else None,
+            "horizon_seconds": self.horizon,
+            **self.totals
+        }
+
+
+# Global service instance
+quest_lifecycle = QuestLifecycleService()
@@ -0,0 +1,356 @@
+"""
+Research Service - Shared web research for the individual, clash and community generators
+
+The generators ask for topics (a team's news, a match preview, the global
+events of the coming weeks) instead of running their own search agents. Each
+topic has a normalized key (scope plus sorted entities), so the same team
+asked for by the individual run, by every clash it plays and by a concurrent
+request resolves to one document:
+
+- Documents are kept in research_documents for RESEARCH_DOCUMENT_TTL seconds,
+  indexed by team, fixture and competition in research_entities, and cached
+  in memory by key.
+- A topic already being researched is joined, not searched again.
+- Missing topics are researched RESEARCH_TOPICS_PER_SEARCH at a time by the
+  research agent (web_search_tools); a failed run is split in half and retried.
+
+Match previews only cover the fixture itself; the clash context adds both
+teams' news documents, which the individual run has usually fetched already.
+"""
+import asyncio
+import os
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from loguru import logger
+from sqlalchemy import delete, select
+from ..models.database import async_session
+from ..models.research_document import ResearchDocument, ResearchEntity
+from ..core.metrics import metrics_registry
+from .espn_football_service import espn_football_service
+
+
+research_topics = metrics_registry.counter(
+    "research_topics_total",
+    "Research topics by scope and outcome (memory, stored, joined, searched, failed)",
+    ["scope", "outcome"],
+)
+research_searches = metrics_registry.counter(
+    "research_searches_total",
+    "Research agent runs by outcome",
+    ["outcome"],
+)
+
+
+def normalize_entity(value: Any) -> str:
+    """Entity key: lower case, single spaces"""
+    return re.sub(r"\s+", " ", str(value)).strip().lower()
+
+
+@dataclass(frozen=True)
+class ResearchTopic:
+    """One thing to research, with the index entries of its document"""
+    scope: str  # "team", "fixture", "global"
+    title: str
+    description: str  # what the research agent should look for
+    entities: Tuple[Tuple[str, str], ...] = ()
+
+    @property
+    def key(self) -> str:
+        return f"{self.scope}:" + ",".join(f"{entity_type}={entity_key}" for entity_type, entity_key in sorted(self.entities))
+
+    @property
+    def competition(self) -> str:
+        return next((key for entity_type, key in self.entities if entity_type == "competition"), "")
+
+
+def team_topic(team_name: str) -> ResearchTopic:
+    """News of one team, indexed under its home competition when known"""
+    entities = [("team", normalize_entity(team_name))]
+    league = espn_football_service.team_mappings.get(team_name, {}).get("league")
+    competition = ""
+    if league:
+        entities.append(("competition", league))
+        competition = f" ({espn_football_service.league_names.get(league, league)})"
+    return ResearchTopic(
+        scope="team",
+        title=team_name,
+        description=f"Team: {team_name}{competition}. Latest news, results, fixtures, transfers and injuries.",
+        entities=tuple(entities)
+    )
+
+
+def fixture_topic(
+    team_a: str,
+    team_b: str,
+    fixture_id: Optional[str] = None,
+    competition: Optional[str] = None,
+    date: Optional[str] = None
+) -> ResearchTopic:
+    """Preview of a match; keyed by ESPN event id when known, else by the team pair"""
+    teams = sorted(normalize_entity(team) for team in (team_a, team_b))
+    entities = [("team", teams[0]), ("team", teams[1]), ("fixture", str(fixture_id) if fixture_id else " vs ".join(teams))]
+    if competition:
+        entities.append(("competition", competition))
+    when = f" on {date}" if date else ""
+    return ResearchTopic(
+        scope="fixture",
+        title=f"{team_a} vs {team_b}",
+        description=f"Match: {team_a} vs {team_b}{when}. Preview, head-to-head, rivalry context and predictions.",
+        entities=tuple(entities)
+    )
+
+
+def global_topic(today: Optional[datetime] = None) -> ResearchTopic:
+    """Major football events of the next 30 days"""
+    today = today or datetime.now(timezone.utc)
+    return ResearchTopic(
+        scope="global",
+        title="Global football events",
+        description=f"Global: major football events in the 30 days after {today:%B %d, %Y}.",
+    )
+
+
+class ResearchService:
+    """Research documents by topic key, searched at most once per TTL"""
+
+    def __init__(self):
+        self.document_ttl = float(os.getenv("RESEARCH_DOCUMENT_TTL", "21600"))
+        self.topics_per_search = int(os.getenv("RESEARCH_TOPICS_PER_SEARCH", "4"))
+        self.search_concurrency = int(os.getenv("RESEARCH_SEARCH_CONCURRENCY", "2"))
+        # topic key -> (content, expires_at)
+        self.documents: Dict[str, Tuple[str, datetime]] = {}
+        self.pending: Dict[str, asyncio.Future] = {}
+        self.totals = {"memory": 0, "stored": 0, "joined": 0, "searched": 0, "failed": 0}
+        self.searches = 0
+
+    def _count(self, topic: ResearchTopic, outcome: str):
+        self.totals[outcome] += 1
+        research_topics.inc(scope=topic.scope, outcome=outcome)
+
+    def _cached(self, key: str, now: datetime) -> Optional[str]:
+        entry = self.documents.get(key)
+        if entry is None:
+            return None
+        content, expires_at = entry
+        if expires_at <= now:
+            del self.documents[key]
+            return None
+        return content
+
+    async def gather(self, topics: Iterable[ResearchTopic]) -> Dict[str, Optional[str]]:
+        """Content by topic key (None when research failed), searching only what nobody has yet"""
+        unique = {topic.key: topic for topic in topics}
+        results: Dict[str, Optional[str]] = {}
+        waiting: Dict[str, asyncio.Future] = {}
+        now = datetime.now(timezone.utc)
+
+        def claim(keys: Iterable[str]) -> List[ResearchTopic]:
+            """Join topics in flight elsewhere, the rest become ours (no await in between)"""
+            claimed = []
+            for key in keys:
+                if key in self.pending:
+                    waiting[key] = self.pending[key]
+                    self._count(unique[key], "joined")
+                else:
+                    claimed.append(unique[key])
+            return claimed
+
+        for key in list(unique):
+            content = self._cached(key, now)
+            if content is not None:
+                results[key] = content
+                self._count(unique[key], "memory")
+
+        unresolved = claim(key for key in unique if key not in results)
+        if unresolved:
+            stored = await self._load([topic.key for topic in unresolved], now)
+            for key, (content, expires_at) in stored.items():
+                self.documents[key] = (content, expires_at)
+                results[key] = content
+                self._count(unique[key], "stored")
+            # Another caller may have started one of these while we read the database
+            missing = claim(topic.key for topic in unresolved if topic.key not in stored)
+            if missing:
+                futures = {topic.key: asyncio.get_running_loop().create_future() for topic in missing}
+                self.pending.update(futures)
+                try:
+                    results.update(await self._search(missing))
+                finally:
+                    for key, future in futures.items():
+                        if self.pending.get(key) is future:
+                            del self.pending[key]
+                        if not future.done():
+                            future.set_result(results.get(key))
+
+        for key, future in waiting.items():
+            results[key] = await asyncio.shield(future)
+        return results
+
+    async def _load(self, keys: List[str], now: datetime) -> Dict[str, Tuple[str, datetime]]:
+        """Unexpired stored documents by topic key"""
+        async with async_session() as session:
+            documents = (await session.execute(
+                select(ResearchDocument).where(ResearchDocument.topic_key.in_(keys), ResearchDocument.expires_at > now)
+            )).scalars().all()
+        return {
+            document.topic_key: (document.content, _aware(document.expires_at))
+            for document in documents
+        }
+
+    async def _search(self, topics: List[ResearchTopic]) -> Dict[str, Optional[str]]:
+        """Research topics in runs of topics_per_search, neighbours from the same competition together"""
+        ordered = sorted(topics, key=lambda topic: (topic.competition, topic.scope, topic.key))
+        batches = [ordered[i:i + self.topics_per_search] for i in range(0, len(ordered), self.topics_per_search)]
+        limiter = asyncio.Semaphore(self.search_concurrency)
+        logger.info(f"🔎 Researching {len(topics)} topics in {len(batches)} search runs")
+
+        results: Dict[str, Optional[str]] = {}
+        for batch_result in await asyncio.gather(*(self._search_batch(batch, limiter) for batch in batches)):
+            results.update(batch_result)
+
+        found = {key: content for key, content in results.items() if content}
+        if found:
+            await self._store([topic for topic in topics if topic.key in found], found)
+        for topic in topics:
+            self._count(topic, "searched" if topic.key in found else "failed")
+        return {topic.key: found.get(topic.key) for topic in topics}
+
+    async def _search_batch(self, batch: List[ResearchTopic], limiter: asyncio.Semaphore) -> Dict[str, Optional[str]]:
+        """One research run; on failure split the batch in half and retry"""
+        from ..tools.web_search_tools import search_topics
+
+        keys = [f"r{index + 1}" for index in range(len(batch))]
+        try:
+            async with limiter:
+                self.searches += 1
+                briefs = await search_topics([(key, topic.description) for key, topic in zip(keys, batch)])
+            research_searches.inc(outcome="ok")
+            return {topic.key: briefs.get(key) for key, topic in zip(keys, batch)}
+        except Exception as e:
+            research_searches.inc(outcome="error")
+            if len(batch) == 1:
+                logger.warning(f"⚠️ Research failed for {batch[0].title}: {e}")
+                return {batch[0].key: None}
+            logger.warning(f"⚠️ Research failed for {len(batch)} topics, splitting: {e}")
+            middle = len(batch) // 2
+            left, right = await asyncio.gather(
+                self._search_batch(batch[:middle], limiter),
+                self._search_batch(batch[middle:], limiter)
+            )
+            return {**left, **right}
+
+    async def _store(self, topics: List[ResearchTopic], contents: Dict[str, str]):
+        """Replace the documents of these topics and drop expired ones"""
+        now = datetime.now(timezone.utc)
+        expires_at = now + timedelta(seconds=self.document_ttl)
+        keys = [topic.key for topic in topics]
+        try:
+            async with async_session() as session:
+                stale = select(ResearchDocument.id).where(
+                    (ResearchDocument.topic_key.in_(keys)) | (ResearchDocument.expires_at <= now)
+                )
+                await session.execute(delete(ResearchEntity).where(ResearchEntity.document_id.in_(stale)))
+                await session.execute(delete(ResearchDocument).where(
+                    (ResearchDocument.topic_key.in_(keys)) | (ResearchDocument.expires_at <= now)
+                ))
+                for topic in topics:
+                    document = ResearchDocument(
+                        topic_key=topic.key, scope=topic.scope, title=topic.title[:200],
+                        content=contents[topic.key], fetched_at=now, expires_at=expires_at
+                    )
+                    session.add(document)
+                    await session.flush()
+                    session.add_all(
+                        ResearchEntity(document_id=document.id, entity_type=entity_type, entity_key=entity_key[:200])
+                        for entity_type, entity_key in topic.entities
+                    )
+                await session.commit()
+        except Exception as e:
+            # The memory copy still serves this process
+            logger.error(f"❌ Could not store research documents: {e}")
+        for key in keys:
+            self.documents[key] = (contents[key], expires_at)
+
+    async def team_news(self, team_names: List[str]) -> Dict[str, Optional[str]]:
+        """News document per team name (None when research failed)"""
+        topics = {team_name: team_topic(team_name) for team_name in team_names}
+        contents = await self.gather(topics.values())
+        return {team_name: contents.get(topic.key) for team_name, topic in topics.items()}
+
+    async def match_context(
+        self,
+        team_a: str,
+        team_b: str,
+        fixture_id: Optional[str] = None,
+        competition: Optional[str] = None,
+        date: Optional[str] = None
+    ) -> Optional[str]:
+        """Match preview followed by both teams' news, from one research pass"""
+        fixture = fixture_topic(team_a, team_b, fixture_id, competition, date)
+        news_a, news_b = team_topic(team_a), team_topic(team_b)
+        contents = await self.gather([fixture, news_a, news_b])
+        sections = [
+            f"{heading}:\n{contents[topic.key]}"
+            for heading, topic in (("Match News", fixture), (f"{team_a} News", news_a), (f"{team_b} News", news_b))
+            if contents.get(topic.key)
+        ]
+        return "\n\n".join(sections) or None
+
+    async def global_events(self) -> Optional[str]:
+        """Major football events of the coming weeks"""
+        topic = global_topic()
+        return (await self.gather([topic])).get(topic.key)
+
+    async def documents_for(self, entity_type: str, entity_key: str) -> List[Dict[str, Any]]:
+        """Unexpired documents indexed under an entity (team name, ESPN event id or league code)"""
+        key = entity_key if entity_type != "team" else normalize_entity(entity_key)
+        async with async_session() as session:
+            documents = (await session.execute(
+                select(ResearchDocument)
+                .join(ResearchEntity, ResearchEntity.document_id == ResearchDocument.id)
+                .where(
+                    ResearchEntity.entity_type == entity_type,
+                    ResearchEntity.entity_key == key,
+                    ResearchDocument.expires_at > datetime.now(timezone.utc)
+                )
+                .order_by(ResearchDocument.fetched_at.desc())
+            )).scalars().all()
+        return [
+            {
+                "topic": document.topic_key,
+                "scope": document.scope,
+                "title": document.title,
+                "content": document.content,
+                "fetched_at": document.fetched_at,
+                "expires_at": document.expires_at
+            }
+            for document in documents
+        ]
+
+    def get_status(self) -> Dict[str, Any]:
+        """Cached documents, topics in flight and how topics were served"""
+        now = datetime.now(timezone.utc)
+        live = [key for key, (_, expires_at) in self.documents.items() if expires_at > now]
+        scopes: Dict[str, int] = {}
+        for key in live:
+            scope = key.split(":", 1)[0]
+            scopes[scope] = scopes.get(scope, 0) + 1
+        return {
+            "cached_documents": scopes,
+            "pending_topics": len(self.pending),
+            "topics": dict(self.totals),
+            "search_runs": self.searches,
+            "document_ttl_seconds": self.document_ttl,
+            "topics_per_search": self.topics_per_search
+        }
+
+
+def _aware(value: datetime) -> datetime:
+    """SQLite returns naive datetimes; they are stored in UTC"""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+# Global service instance
+research_service = ResearchService()
@@ -0,0 +1,153 @@
+"""
+Shard Ring - Consistent hashing of scheduler work across live workers
+
+Every scheduler worker keeps a membership row in scheduler_leases
+("<group>/<holder id>"), renewed by heartbeat like the leader lease. Live
+members are placed on a hash ring with virtual nodes and a key (a league
+code) belongs to the first member clockwise from the key's hash, so keys
+spread evenly and a worker joining or leaving moves only about 1/N of them.
+"""
+import asyncio
+import hashlib
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional
+from loguru import logger
+from sqlalchemy import and_, delete, select, update
+from ..models.database import async_session
+from ..models.scheduler_lease import SchedulerLease
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Members placed on a 64-bit ring, `replicas` virtual nodes each"""
+
+    def __init__(self, members: Iterable[str], replicas: int = 128):
+        self.members = sorted(set(members))
+        points = sorted((_hash(f"{member}#{i}"), member) for member in self.members for i in range(replicas))
+        self.hashes = [point for point, _ in points]
+        self.owners = [member for _, member in points]
+
+    def owner(self, key: str) -> Optional[str]:
+        """Member responsible for a key (None on an empty ring)"""
+        if not self.hashes:
+            return None
+        return self.owners[bisect_right(self.hashes, _hash(key)) % len(self.hashes)]
+
+    def assignments(self, keys: Iterable[str]) -> Dict[str, List[str]]:
+        """Keys per member"""
+        result: Dict[str, List[str]] = {member: [] for member in self.members}
+        for key in keys:
+            owner = self.owner(key)
+            if owner is not None:
+                result[owner].append(key)
+        return result
+
+
+class ShardMembership:
+    """This worker's place on the ring of live scheduler workers"""
+
+    def __init__(self, group: str, holder_id: str, ttl_seconds: int, replicas: int = 128):
+        self.group = group
+        self.holder_id = holder_id
+        self.name = f"{group}/{holder_id}"[:100]
+        self.ttl_seconds = ttl_seconds
+        self.replicas = replicas
+        self.heartbeat_interval = max(1.0, ttl_seconds / 3)
+        self.ring = HashRing([holder_id], replicas)
+        self.last_heartbeat: Optional[datetime] = None
+        self.heartbeat_task: Optional[asyncio.Task] = None
+
+    async def heartbeat(self):
+        """Renew this member's row and rebuild the ring from the live ones"""
+        now = datetime.now(timezone.utc)
+        members_filter = SchedulerLease.name.like(f"{self.group}/%")
+
+        async with async_session() as session:
+            renewed = await session.execute(
+                update(SchedulerLease)
+                .where(SchedulerLease.name == self.name)
+                .values(holder_id=self.holder_id, expires_at=now + timedelta(seconds=self.ttl_seconds), renewed_at=now)
+                .execution_options(synchronize_session=False)
+            )
+            if renewed.rowcount == 0:
+                session.add(SchedulerLease(
+                    name=self.name, holder_id=self.holder_id,
+                    expires_at=now + timedelta(seconds=self.ttl_seconds), renewed_at=now
+                ))
+            # Rows of workers that died long ago
+            await session.execute(
+                delete(SchedulerLease)
+                .where(and_(members_filter, SchedulerLease.expires_at < now - timedelta(seconds=self.ttl_seconds * 10)))
+                .execution_options(synchronize_session=False)
+            )
+            await session.commit()
+
+            members = (await session.execute(
+                select(SchedulerLease.holder_id).where(and_(members_filter, SchedulerLease.expires_at >= now))
+            )).scalars().all()
+
+        self.last_heartbeat = now
+        if set(members) != set(self.ring.members):
+            self.ring = HashRing(members, self.replicas)
+            logger.info(f"🧭 Shard ring for {self.group} now has {len(self.ring.members)} members")
+
+    def owns(self, key: str) -> bool:
+        """Whether this worker should handle a key"""
+        if self.last_heartbeat is None:
+            return False
+        if (datetime.now(timezone.utc) - self.last_heartbeat).total_seconds() > self.ttl_seconds:
+            # Others already consider this worker gone and have taken its keys
+            return False
+        return self.ring.owner(key) == self.holder_id
+
+    async def start(self):
+        """Join the ring and keep the membership alive"""
+        if self.heartbeat_task:
+            return
+        try:
+            await self.heartbeat()
+        except Exception as e:
+            logger.error(f"Shard heartbeat failed: {e}")
+        self.heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+
+    async def stop(self):
+        """Leave the ring right away so the other workers take over this worker's keys"""
+        if self.heartbeat_task:
+            self.heartbeat_task.cancel()
+            try:
+                await self.heartbeat_task
+            except asyncio.CancelledError:
+                pass
+            self.heartbeat_task = None
+        try:
+            async with async_session() as session:
+                await session.execute(
+                    delete(SchedulerLease).where(SchedulerLease.name == self.name).execution_options(synchronize_session=False)
+                )
+                await session.commit()
+        except Exception as e:
+            logger.warning(f"Could not leave the shard ring: {e}")
+        self.last_heartbeat = None
+
+    async def _heartbeat_loop(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                await self.heartbeat()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Shard heartbeat failed: {e}")
+
+    def get_status(self) -> Dict[str, Any]:
+        """Ring members and heartbeat state"""
+        return {
+            "holder_id": self.holder_id,
+            "members": self.ring.members,
+            "last_heartbeat": self.last_heartbeat.isoformat() if self.last_heartbeat else None,
+            "ttl_seconds": self.ttl_seconds
+        }
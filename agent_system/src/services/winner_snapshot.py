@@ -0,0 +1,264 @@
+"""
+Winner Snapshot Service - Period-end winner lists for LeaderboardRewards.setWinners
+
+One streaming aggregate pass over the XP ledger (joined to user addresses)
+keeps only the best candidates in a bounded heap. Winners are ordered by a
+deterministic tiebreak, split into gas-bounded setWinners batches with
+ready-to-send calldata, and committed to with a Merkle root. The snapshot is
+written as JSON for the contracts/scripts deploy tooling.
+"""
+import heapq
+import json
+import os
+import re
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from Crypto.Hash import keccak
+from loguru import logger
+from sqlalchemy import select, func
+from ..models.database import async_session
+from ..models.user import User
+from ..models.xp_ledger import XPLedgerEntry
+
+
+# LeaderboardRewards.MAX_WINNERS; setWinners reverts above it
+CONTRACT_MAX_WINNERS = 10
+
+_ADDRESS_PATTERN = re.compile(r"^0x[0-9a-fA-F]{40}$")
+_ZERO_ADDRESS = "0x" + "0" * 40
+
+# Rough setWinners cost: tx base + dispatch/delete overhead, then one array
+# push (new storage slot), one hasClaimed write and event data per winner
+_TX_BASE_GAS = 21000
+_CALL_OVERHEAD_GAS = 30000
+_PER_WINNER_GAS = 28000
+
+
+def keccak256(data: bytes) -> bytes:
+    """Keccak-256 digest as used by Solidity's keccak256 (pre-standard Keccak, not SHA3-256)"""
+    return keccak.new(digest_bits=256, data=data).digest()
+
+
+SET_WINNERS_SELECTOR = keccak256(b"setWinners(address[])")[:4]
+
+
+# --- ABI encoding, batching and Merkle commitment ---
+
+def is_valid_address(address: Optional[str]) -> bool:
+    """0x-prefixed 20-byte hex address other than the zero address"""
+    return bool(address) and bool(_ADDRESS_PATTERN.match(address)) and address.lower() != _ZERO_ADDRESS
+
+
+def encode_set_winners(addresses: List[str]) -> str:
+    """ABI calldata for setWinners(address[]): selector, array offset, length, padded addresses"""
+    words = [(32).to_bytes(32, "big"), len(addresses).to_bytes(32, "big")]
+    words.extend(bytes.fromhex(address[2:]).rjust(32, b"\x00") for address in addresses)
+    return "0x" + (SET_WINNERS_SELECTOR + b"".join(words)).hex()
+
+
+def estimate_set_winners_gas(calldata: str, winner_count: int) -> int:
+    """Upper-bound gas estimate for one setWinners transaction"""
+    payload = bytes.fromhex(calldata[2:])
+    calldata_gas = sum(16 if byte else 4 for byte in payload)
+    return _TX_BASE_GAS + _CALL_OVERHEAD_GAS + calldata_gas + winner_count * _PER_WINNER_GAS
+
+
+def batch_size_for_gas(gas_limit: int) -> int:
+    """Largest batch (at most MAX_WINNERS) whose estimated cost fits the gas limit"""
+    size = CONTRACT_MAX_WINNERS
+    while size > 1 and estimate_set_winners_gas(encode_set_winners([_ZERO_ADDRESS[:-1] + "1"] * size), size) > gas_limit:
+        size -= 1
+    return size
+
+
+def build_batches(addresses: List[str], gas_limit: int) -> List[Dict[str, Any]]:
+    """Split winners into setWinners calls, in rank order"""
+    size = batch_size_for_gas(gas_limit)
+    batches = []
+    for start in range(0, len(addresses), size):
+        chunk = addresses[start:start + size]
+        calldata = encode_set_winners(chunk)
+        batches.append({
+            "index": len(batches),
+            "first_rank": start + 1,
+            "addresses": chunk,
+            "calldata": calldata,
+            "estimated_gas": estimate_set_winners_gas(calldata, len(chunk))
+        })
+    return batches
+
+
+def merkle_leaf(address: str) -> bytes:
+    """keccak256(abi.encodePacked(address))"""
+    return keccak256(bytes.fromhex(address[2:]))
+
+
+def _hash_pair(left: bytes, right: bytes) -> bytes:
+    return keccak256(min(left, right) + max(left, right))
+
+
+def merkle_tree(leaves: List[bytes]) -> List[List[bytes]]:
+    """
+    Levels of a sorted-pair Merkle tree (OpenZeppelin MerkleProof compatible),
+    from the leaves up to the root; an unpaired node moves up unchanged.
+    """
+    levels = [list(leaves)]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        parents = [_hash_pair(level[index], level[index + 1]) for index in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            parents.append(level[-1])
+        levels.append(parents)
+    return levels
+
+
+def merkle_proof(levels: List[List[bytes]], index: int) -> List[bytes]:
+    """Sibling hashes from a leaf to the root"""
+    proof = []
+    for level in levels[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append(level[sibling])
+        index //= 2
+    return proof
+
+
+def verify_merkle_proof(leaf: bytes, proof: List[bytes], root: bytes) -> bool:
+    node = leaf
+    for sibling in proof:
+        node = _hash_pair(node, sibling)
+    return node == root
+
+
+# --- Snapshot ---
+
+def _rank_key(xp: int, completions: int, last_entry_id: int, user_id: int) -> Tuple[int, int, int, int]:
+    """
+    Deterministic winner order: more XP, then more completed quests, then whoever
+    reached their total first (lower last ledger id), then the lower user id.
+    """
+    return (-xp, -completions, last_entry_id, user_id)
+
+
+class WinnerSnapshotService:
+    """Builds period-end winner snapshots for the LeaderboardRewards contract"""
+
+    def __init__(self):
+        self.output_dir = Path(os.getenv("WINNER_SNAPSHOT_DIR", "../contracts/snapshots"))
+        self.winner_count = int(os.getenv("WINNER_COUNT", str(CONTRACT_MAX_WINNERS)))
+        self.gas_limit = int(os.getenv("WINNER_BATCH_GAS_LIMIT", "500000"))
+        self.last_snapshot: Optional[Dict[str, Any]] = None
+
+    async def select_winners(
+        self,
+        winner_count: int,
+        period_start: Optional[datetime] = None,
+        period_end: Optional[datetime] = None
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Top users of the period from one streamed pass; returns (winners, users skipped for bad addresses)"""
+        stmt = (
+            select(
+                XPLedgerEntry.user_id,
+                User.address,
+                func.sum(XPLedgerEntry.amount),
+                func.count(XPLedgerEntry.quest_id),
+                func.max(XPLedgerEntry.id)
+            )
+            .join(User, User.id == XPLedgerEntry.user_id)
+            .group_by(XPLedgerEntry.user_id, User.address)
+        )
+        if period_start is not None:
+            stmt = stmt.where(XPLedgerEntry.created_at >= period_start)
+        if period_end is not None:
+            stmt = stmt.where(XPLedgerEntry.created_at < period_end)
+
+        # Min-heap of negated keys keeps the best winner_count rows seen so far
+        best: List[Tuple[Tuple[int, int, int, int], str]] = []
+        skipped = 0
+        async with async_session() as session:
+            stream = await session.stream(stmt.execution_options(yield_per=10000))
+            async for partition in stream.partitions():
+                for user_id, address, total, completions, last_entry_id in partition:
+                    xp = int(total or 0)
+                    if xp <= 0:
+                        continue
+                    if not is_valid_address(address):
+                        skipped += 1
+                        continue
+                    key = _rank_key(xp, completions, last_entry_id, user_id)
+                    inverted = tuple(-part for part in key)
+                    if len(best) < winner_count:
+                        heapq.heappush(best, (inverted, address))
+                    elif inverted > best[0][0]:
+                        heapq.heapreplace(best, (inverted, address))
+
+        ordered = sorted((tuple(-part for part in inverted), address) for inverted, address in best)
+        winners = [
+            {
+                "rank": position + 1,
+                "user_id": key[3],
+                "address": address,
+                "xp": -key[0],
+                "completed_quests": -key[1]
+            }
+            for position, (key, address) in enumerate(ordered)
+        ]
+        return winners, skipped
+
+    async def create_snapshot(
+        self,
+        label: Optional[str] = None,
+        period_start: Optional[datetime] = None,
+        period_end: Optional[datetime] = None,
+        winner_count: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Select winners, build setWinners batches and the Merkle root, and write the snapshot file"""
+        generated_at = datetime.now(timezone.utc)
+        label = label or (period_end or generated_at).strftime("%Y%m%dT%H%M%SZ")
+        winners, skipped = await self.select_winners(winner_count or self.winner_count, period_start, period_end)
+
+        addresses = [winner["address"] for winner in winners]
+        levels = merkle_tree([merkle_leaf(address) for address in addresses])
+        for index, winner in enumerate(winners):
+            winner["proof"] = ["0x" + node.hex() for node in merkle_proof(levels, index)]
+
+        snapshot = {
+            "label": label,
+            "generated_at": generated_at.isoformat(),
+            "period_start": period_start.isoformat() if period_start else None,
+            "period_end": period_end.isoformat() if period_end else None,
+            "selector": "0x" + SET_WINNERS_SELECTOR.hex(),
+            "max_winners_per_call": CONTRACT_MAX_WINNERS,
+            "gas_limit": self.gas_limit,
+            "merkle_root": "0x" + levels[-1][0].hex() if addresses else None,
+            "skipped_invalid_addresses": skipped,
+            "winners": winners,
+            # setWinners replaces the stored list, so each batch is one payout round
+            "batches": build_batches(addresses, self.gas_limit)
+        }
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        path = self.output_dir / f"winners-{label}.json"
+        path.write_text(json.dumps(snapshot, indent=2), encoding="utf-8")
+        snapshot["path"] = str(path)
+        self.last_snapshot = snapshot
+
+        logger.info(f"🏁 Winner snapshot {label}: {len(winners)} winners in {len(snapshot['batches'])} batches -> {path}")
+        return snapshot
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get the latest snapshot summary"""
+        snapshot = self.last_snapshot
+        return {
+            "output_dir": str(self.output_dir),
+            "winner_count": self.winner_count,
+            "gas_limit": self.gas_limit,
+            "last_label": snapshot["label"] if snapshot else None,
+            "last_merkle_root": snapshot["merkle_root"] if snapshot else None,
+            "last_batches": len(snapshot["batches"]) if snapshot else 0
+        }
+
+
+# Global service instance
+winner_snapshot_service = WinnerSnapshotService()
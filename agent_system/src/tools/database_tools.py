@@ -10,6 +10,12 @@ from ..models.team import Team
 from ..models.quest import Quest, QuestType, QuestStatus
 from ..models.event import SportsEvent
 from ..models.user_team import UserTeam
+from ..models.quest_assignment import QuestAssignment
+from ..services.mission_feed import mission_feed
+from ..services.leaderboard import leaderboard_service
+from ..services.quest_lifecycle import quest_lifecycle, default_quest_window, as_utc
+from ..services.quest_fanout import quest_fanout
+from datetime import datetime, timezone
 import json
 
 
@@ -128,27 +134,49 @@ async def create_quest(
     event_id: int = 0,
     target_metric: str = "posts",
     target_value: int = 5,
-    metadata: str = ""
+    metadata: str = "",
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None
 ):
-    """Create a new quest"""
+    """Create a new quest (starts now and runs QUEST_DEFAULT_DURATION_HOURS unless timed explicitly)"""
+    now = datetime.now(timezone.utc)
+    if start_time is None and end_time is None:
+        start_time, end_time = default_quest_window(now)
+    start_time = as_utc(start_time) or now
+    
     async with async_session() as session:
         quest = Quest(
             title=title,
             description=description,
             quest_type=QuestType(quest_type),
+            status=QuestStatus.PENDING if start_time > now else QuestStatus.ACTIVE,
             user_id=user_id if user_id > 0 else None,
             team_id=team_id,
             event_id=event_id if event_id > 0 else None,
             target_metric=target_metric,
             target_value=target_value,
+            start_time=start_time,
+            end_time=end_time,
             quest_metadata=metadata if metadata else None
         )
         
         session.add(quest)
+        await session.flush()
+        
+        # Personal quests go straight to their owner's inbox
+        if quest.user_id:
+            session.add(QuestAssignment(user_id=quest.user_id, quest_id=quest.id, team_id=team_id))
+        
         await session.commit()
         await session.refresh(quest)
         
-        return quest.id
+    # Team quests go to every follower's inbox
+    if quest.user_id is None:
+        await quest_fanout.fan_out([quest.id])
+    
+    quest_lifecycle.schedule(quest.id, start_time if start_time > now else None, end_time)
+    mission_feed.request_refresh()
+    return quest.id
 
 
 async def get_active_events() -> List[Dict[str, Any]]:
@@ -213,6 +241,7 @@ async def update_quest_progress(quest_id: int, progress: int) -> Dict[str, Any]:
         if not quest:
             return {"updated": False, "error": "Quest not found"}
         
+        was_completed = quest.status == QuestStatus.COMPLETED
         quest.current_progress = progress
         
         # Check if quest is completed
@@ -220,6 +249,11 @@ async def update_quest_progress(quest_id: int, progress: int) -> Dict[str, Any]:
             quest.status = QuestStatus.COMPLETED
         
         await session.commit()
+        mission_feed.request_refresh()
+        
+        # Personal quests pay out XP to their owner on completion
+        if quest.status == QuestStatus.COMPLETED and not was_completed and quest.user_id:
+            await leaderboard_service.award_quest_completion(quest.user_id, quest)
         
         return {
             "updated": True,
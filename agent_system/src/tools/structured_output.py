@@ -0,0 +1,179 @@
+"""
+Structured output tools - Typed agent output with a tolerant JSON fallback
+
+Generation agents declare a pydantic output_type, so the model is held to a
+strict JSON schema and Runner returns validated objects. When a reply still
+does not validate (prose around the JSON, markdown fences, trailing commas,
+output cut off at the token limit), TolerantOutputSchema re-reads it with
+parse_partial_json, keeps every complete element and validates that instead
+of throwing the whole generation away.
+
+For streamed runs, ArrayItemStream picks complete objects out of the text as
+it arrives, so each quest can be used as soon as its closing brace is seen.
+"""
+import json
+from typing import Any, List, Optional, Tuple
+
+from agents import AgentOutputSchema
+from agents.exceptions import ModelBehaviorError
+from loguru import logger
+from pydantic import ValidationError
+
+from ..core.metrics import metrics_registry
+
+
+structured_output_parses = metrics_registry.counter(
+    "structured_output_parse_total",
+    "Agent outputs validated against their schema (outcome: ok, repaired, failed)",
+    ["schema", "outcome"],
+)
+
+_CLOSERS = {"{": "}", "[": "]"}
+_decoder = json.JSONDecoder(strict=False)
+
+
+def _drop_trailing_comma(out: List[str]):
+    """Remove a ',' (and the whitespace after it) at the end of the buffer"""
+    end = len(out)
+    while end and out[end - 1].isspace():
+        end -= 1
+    if end and out[end - 1] == ",":
+        del out[end - 1:]
+
+
+def parse_partial_json(text: str, roots: str = "{[") -> Optional[Any]:
+    """
+    First JSON value in text that starts with one of `roots`, read leniently.
+
+    Text before the value and after it is ignored, trailing commas are dropped,
+    raw newlines inside strings are accepted and a value cut off before its end
+    is closed after its last complete nested object or array. Returns None
+    when nothing usable is found.
+    """
+    start = min((index for index in (text.find(root) for root in roots) if index >= 0), default=-1)
+    if start < 0:
+        return None
+
+    try:
+        return _decoder.raw_decode(text, start)[0]
+    except ValueError:
+        pass
+
+    out: List[str] = []
+    stack: List[str] = []
+    # Buffer length and open containers right after the last complete nested value
+    last_complete: Optional[Tuple[int, Tuple[str, ...]]] = None
+    in_string = escaped = False
+    for char in text[start:]:
+        if in_string:
+            out.append(char)
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+
+        if char == '"':
+            in_string = True
+        elif char in _CLOSERS:
+            stack.append(_CLOSERS[char])
+        elif char in "}]":
+            _drop_trailing_comma(out)
+            char = stack.pop()
+            if not stack:
+                out.append(char)
+                break
+            last_complete = (len(out) + 1, tuple(stack))
+        out.append(char)
+
+    if stack:
+        if last_complete is None:
+            return None
+        length, open_containers = last_complete
+        out = out[:length]
+        _drop_trailing_comma(out)
+        out.extend(reversed(open_containers))
+
+    try:
+        return _decoder.decode("".join(out))
+    except ValueError:
+        return None
+
+
+class ArrayItemStream:
+    """
+    Incremental reader for streamed JSON text: feed() returns the objects that
+    are elements of an array (e.g. each entry of {"quests": [...]}) as soon as
+    they are complete. Objects nested inside a returned object are not
+    returned separately.
+    """
+
+    def __init__(self):
+        self.stack: List[str] = []
+        self.buffer: List[str] = []
+        self.item_depth: Optional[int] = None
+        self.in_string = False
+        self.escaped = False
+
+    def feed(self, chunk: str) -> List[Any]:
+        items = []
+        for char in chunk:
+            if self.item_depth is not None:
+                self.buffer.append(char)
+
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+                continue
+
+            if char == '"':
+                self.in_string = True
+            elif char in _CLOSERS:
+                if char == "{" and self.item_depth is None and self.stack and self.stack[-1] == "]":
+                    self.item_depth = len(self.stack)
+                    self.buffer = [char]
+                self.stack.append(_CLOSERS[char])
+            elif char in "}]" and self.stack:
+                self.stack.pop()
+                if self.item_depth is not None and len(self.stack) == self.item_depth:
+                    try:
+                        items.append(_decoder.decode("".join(self.buffer)))
+                    except ValueError:
+                        pass
+                    self.item_depth = None
+                    self.buffer = []
+        return items
+
+
+class TolerantOutputSchema(AgentOutputSchema):
+    """AgentOutputSchema that repairs malformed replies before giving up on them"""
+
+    def validate_json(self, json_str: str) -> Any:
+        schema = self.name()
+        try:
+            validated = super().validate_json(json_str)
+        except ModelBehaviorError as error:
+            repaired = parse_partial_json(json_str)
+            if repaired is not None:
+                try:
+                    validated = self._type_adapter.validate_python(repaired)
+                    if self._is_wrapped:
+                        validated = validated["response"]
+                except (ValidationError, KeyError, TypeError):
+                    repaired = None
+            if repaired is None:
+                structured_output_parses.inc(schema=schema, outcome="failed")
+                logger.warning(f"⚠️ Unusable {schema} output ({len(json_str)} characters): {error}")
+                raise
+            structured_output_parses.inc(schema=schema, outcome="repaired")
+            logger.info(f"🩹 Repaired malformed {schema} output ({len(json_str)} characters)")
+            return validated
+
+        structured_output_parses.inc(schema=schema, outcome="ok")
+        return validated
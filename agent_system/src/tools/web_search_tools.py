@@ -1,31 +1,91 @@
 """
-Web Search Tools - Utilise l'outil WebSearch disponible pour la recherche d'actualités
+Web Search Tools - One research agent with WebSearch for every quest generator
+
+The research agent answers several topics per run: the request lists each
+topic under a key with what to look for, and the reply holds one brief per
+key. Callers (the research service) decide which topics still need a search,
+so overlapping team, match and global searches become one call.
 """
+from agents import Agent, WebSearchTool
+from pydantic import BaseModel
+from typing import Dict, List, Tuple
 from loguru import logger
+from .structured_output import TolerantOutputSchema
+from ..core.instrumentation import run_agent
+from ..core.tracing import traced
+
+
+RESEARCH_INSTRUCTIONS = """
+You are a football research agent. Use web search to collect current,
+specific facts that quest writers can build on.
+
+The request lists one or more topics. Each topic has a key in square brackets
+(for example [r1]) followed by what to research:
+- Team: recent results and upcoming fixtures, transfers, injuries, player
+  updates, training news, records and current season form.
+- Match: the fixture itself: date and competition, match preview, head-to-head
+  record, rivalry context and predictions. Team news is researched separately,
+  do not repeat it.
+- Global: major football events of the next 30 days: finals, tournaments,
+  international windows, transfer deadlines, awards, derbies and clasicos.
+
+Prefer news from the last 7 days and name players, scores, dates and
+competitions. Search once for topics that overlap (two teams in the same
+league, a match between two listed teams) and reuse what you found.
+
+Return a JSON object with one entry per topic key from the request, each
+holding a plain-text brief of 100-300 words:
+{"briefs": [{"key": "r1", "content": "..."}, {"key": "r2", "content": "..."}]}
+""".strip()
+
+
+class ResearchBrief(BaseModel):
+    """Brief for one topic of the request"""
+    key: str
+    content: str
+
+
+class ResearchBriefs(BaseModel):
+    """Research agent reply, one brief per topic key"""
+    briefs: List[ResearchBrief]
+
+
+research_agent = Agent(
+    name="FootballResearchAgent",
+    instructions=RESEARCH_INSTRUCTIONS,
+    tools=[WebSearchTool()],
+    output_type=TolerantOutputSchema(ResearchBriefs)
+)
+
+
+def research_input(topics: List[Tuple[str, str]]) -> str:
+    """Run input for the research agent, from (key, description) pairs"""
+    sections = [f"[{key}] {description}" for key, description in topics]
+    keys = ", ".join(key for key, _ in topics)
+    return "\n".join(sections) + f"\n\nResearch every topic now: {keys}."
+
+
+@traced()
+async def search_topics(topics: List[Tuple[str, str]]) -> Dict[str, str]:
+    """Research several (key, description) topics with one search run; keys the reply missed are left out"""
+    if not topics:
+        return {}
+    result = await run_agent(research_agent, input=research_input(topics))
+    if not isinstance(result.final_output, ResearchBriefs):
+        raise ValueError("no briefs in research response")
+
+    wanted = {key for key, _ in topics}
+    briefs = {brief.key: brief.content.strip() for brief in result.final_output.briefs if brief.key in wanted and brief.content.strip()}
+    logger.success(f"✅ Research run answered {len(briefs)}/{len(topics)} topics")
+    return briefs
+
 
 async def search_web_content(query: str) -> str:
-    """Search web content using the available WebSearch tool"""
+    """Research a single free-form query"""
     try:
         logger.info(f"🔍 Searching web for: {query}")
-        
-        # Direct import and use of WebSearch tool function
-        # This will be replaced by actual WebSearch function call
-        from anthropic_tools import WebSearch
-        
-        # Use WebSearch with a prompt to extract football news
-        search_result = WebSearch(
-            query=query,
-            prompt=f"Extract football news, match results, transfer information, and player updates from the search results for the query: {query}"
-        )
-        
-        logger.success(f"✅ Web search completed for: {query}")
-        return search_result
-        
-    except ImportError:
-        # Fallback if WebSearch tool is not available
-        logger.warning(f"⚠️ WebSearch tool not available, using fallback for: {query}")
-        return f"No search results available for: {query}"
-        
+        briefs = await search_topics([("r1", query)])
+        return briefs.get("r1") or f"No search results available for: {query}"
     except Exception as e:
         logger.error(f"❌ Error in web search for '{query}': {e}")
-        return f"Search error for: {query}"
\ No newline at end of file
+        return f"Search error for: {query}"
@@ -0,0 +1,38 @@
+"""
+Shared fixtures: services running against a throwaway in-memory database
+"""
+from typing import Any, Iterable
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.models import Base, Team
+
+
+@pytest.fixture
+async def make_sessions(monkeypatch):
+    """
+    Factory for an in-memory SQLite database: make_sessions(*modules, seed=rows)
+    creates the schema, points each module's async_session at it, adds the
+    PSG team (id 1) plus the seed rows and returns the session factory.
+    """
+    engines = []
+
+    async def make(*modules: str, seed: Iterable[Any] = ()) -> async_sessionmaker:
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        engines.append(engine)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        factory = async_sessionmaker(engine, expire_on_commit=False)
+        for module in modules:
+            monkeypatch.setattr(f"{module}.async_session", factory)
+
+        async with factory() as session:
+            session.add(Team(id=1, name="PSG", display_name="PSG", sport="football"))
+            session.add_all(seed)
+            await session.commit()
+        return factory
+
+    yield make
+    for engine in engines:
+        await engine.dispose()
@@ -0,0 +1,44 @@
+"""
+Tests for batched individual quest generation
+"""
+import re
+from types import SimpleNamespace
+
+from agents.exceptions import ModelBehaviorError
+
+from src.ai_agents import individual_quest_generator as generator
+
+
+def test_plan_batches_respects_team_count_and_token_budget():
+    teams = [(f"Team {index}", "news " * 100) for index in range(5)]
+    assert [len(batch) for batch in generator.plan_batches(teams, max_teams=2, max_input_tokens=10_000)] == [2, 2, 1]
+    assert [len(batch) for batch in generator.plan_batches(teams, max_teams=10, max_input_tokens=300)] == [2, 2, 1]
+
+    # A team over the budget on its own still gets a batch
+    assert generator.plan_batches([("Big", "x" * 100_000)], max_input_tokens=100) == [[("Big", "x" * 100_000)]]
+
+
+async def test_batch_splits_on_failure_and_falls_back_per_team(monkeypatch):
+    calls = []
+    quest = generator.IndividualQuest(title="🎯 Quest", description="Complete this quest by tweeting.", target_value=1, difficulty="easy")
+
+    async def fake_run_agent(agent, input):
+        teams = re.findall(r"^\[(\w+)\] Team: (.+)$", input, re.MULTILINE)
+        calls.append((agent.name, [team for _, team in teams] or input))
+        if agent.name == "SmartQuestGenerator":
+            return SimpleNamespace(final_output=generator.IndividualQuestList(quests=[quest]))
+        if len(teams) > 2:
+            raise ModelBehaviorError("Invalid JSON")  # unusable output: the batch must be split
+        return SimpleNamespace(final_output=generator.BatchIndividualQuests(teams=[
+            generator.TeamQuests(key=key, quests=[quest]) for key, team in teams if team != "C"
+        ]))
+
+    monkeypatch.setattr(generator, "run_agent", fake_run_agent)
+
+    quests = await generator.generate_individual_quests_batch([(name, f"{name} news") for name in "ABCD"])
+
+    assert sorted(quests) == ["A", "B", "C", "D"]
+    assert all(len(team_quests) == 1 for team_quests in quests.values())
+    assert [call for call in calls if call[0] == "BatchQuestGenerator"][0][1] == ["A", "B", "C", "D"]
+    # C was dropped by its half-batch and regenerated on its own
+    assert [call[0] for call in calls].count("SmartQuestGenerator") == 1
@@ -0,0 +1,55 @@
+"""
+Tests for recording and replaying ESPN traffic through cassettes
+"""
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+from src.services.espn_cassette import Cassette, RecordingTransport, ReplayTransport, warp_timestamps
+
+
+BASE_URL = "http://espn.test/apis/site/v2/sports/soccer"
+RECORDED_AT = datetime(2025, 8, 1, tzinfo=timezone.utc)
+
+
+async def test_record_then_replay_in_order(tmp_path):
+    path = str(tmp_path / "espn.jsonl.gz")
+    calls = {"count": 0}
+
+    def upstream(request):
+        calls["count"] += 1
+        return httpx.Response(200, json={"call": calls["count"], "path": request.url.path})
+
+    recorder = RecordingTransport(path, BASE_URL, transport=httpx.MockTransport(upstream))
+    async with httpx.AsyncClient(transport=recorder) as client:
+        for _ in range(2):
+            await client.get(f"{BASE_URL}/eng.1/scoreboard")
+        await client.get(f"{BASE_URL}/eng.1/teams/363", params={"b": "2", "a": "1"})
+    assert recorder.recorded == 3
+
+    cassette = Cassette.load(path)
+    assert len(cassette) == 3
+    assert ("GET", "eng.1/teams/363?a=1&b=2") in cassette.interactions
+
+    replay = ReplayTransport(cassette, BASE_URL)
+    async with httpx.AsyncClient(transport=replay) as client:
+        calls_seen = [(await client.get(f"{BASE_URL}/eng.1/scoreboard")).json()["call"] for _ in range(3)]
+        missing = await client.get(f"{BASE_URL}/esp.1/scoreboard")
+    assert calls_seen == [1, 2, 2]  # recorded order, then the last response repeats
+    assert missing.status_code == 404 and replay.misses == 1
+    assert calls["count"] == 3  # replay never reached upstream
+
+
+async def test_time_warp_shifts_dates_and_keeps_format():
+    body = '{"date":"2025-08-16T14:00Z","lastUpdated":"2025-08-01T09:30:00.250Z","id":"2025"}'
+    warped = warp_timestamps(body, timedelta(days=3))
+    assert warped == '{"date":"2025-08-19T14:00Z","lastUpdated":"2025-08-04T09:30:00.250Z","id":"2025"}'
+
+    cassette = Cassette(RECORDED_AT, [{
+        "method": "GET", "endpoint": "eng.1/scoreboard", "status": 200,
+        "content_type": "application/json", "body": body, "latency_ms": 5.0
+    }])
+    replay = ReplayTransport(cassette, BASE_URL, warp_to=RECORDED_AT + timedelta(days=30))
+    async with httpx.AsyncClient(transport=replay) as client:
+        response = await client.get(f"{BASE_URL}/eng.1/scoreboard")
+    assert response.json()["date"] == "2025-09-15T14:00Z"
@@ -0,0 +1,75 @@
+"""
+Tests for the fixture-aware event scheduler
+"""
+import heapq
+import time
+from datetime import datetime, timedelta, timezone
+
+from src.services.event_scheduler import (
+    EventScheduler, TEAM_SYNC_KEY, classify_match_status, compute_poll_interval
+)
+
+
+NOW = datetime(2025, 7, 12, 18, 0, tzinfo=timezone.utc)
+
+
+def _match(status: str, kickoff: datetime) -> dict:
+    return {"id": "1", "status": status, "date": kickoff.strftime("%Y-%m-%dT%H:%MZ")}
+
+
+def test_classify_match_status():
+    assert classify_match_status(None) == "scheduled"
+    assert classify_match_status("STATUS_SCHEDULED") == "scheduled"
+    assert classify_match_status("STATUS_FIRST_HALF") == "live"
+    assert classify_match_status("STATUS_HALFTIME") == "live"
+    assert classify_match_status("STATUS_FULL_TIME") == "finished"
+    assert classify_match_status("STATUS_FINAL_PEN") == "finished"
+
+
+def test_poll_interval_follows_fixture_state():
+    assert compute_poll_interval([], NOW) == (3600, "idle")
+    assert compute_poll_interval([_match("STATUS_FULL_TIME", NOW)], NOW) == (3600, "idle")
+
+    live = [_match("STATUS_SCHEDULED", NOW + timedelta(days=2)), _match("STATUS_SECOND_HALF", NOW)]
+    assert compute_poll_interval(live, NOW) == (10, "live")
+
+    assert compute_poll_interval([_match("STATUS_SCHEDULED", NOW + timedelta(minutes=10))], NOW) == (60, "imminent")
+    assert compute_poll_interval([_match("STATUS_SCHEDULED", NOW + timedelta(hours=2))], NOW) == (300, "prematch")
+
+    # Late kickoff still reported as scheduled keeps the fast cadence
+    assert compute_poll_interval([_match("STATUS_SCHEDULED", NOW - timedelta(minutes=5))], NOW) == (60, "imminent")
+
+
+def test_poll_interval_wakes_up_for_prematch_window():
+    interval, state = compute_poll_interval([_match("STATUS_SCHEDULED", NOW + timedelta(hours=3, minutes=20))], NOW)
+    assert state == "scheduled"
+    assert interval == 20 * 60
+
+    interval, _ = compute_poll_interval([_match("STATUS_SCHEDULED", NOW + timedelta(days=3))], NOW)
+    assert interval == 3600
+
+
+async def test_scheduler_reschedules_by_league_state(monkeypatch):
+    scheduler = EventScheduler()
+    polled = []
+
+    async def fake_poll(league_code):
+        polled.append(league_code)
+        return 10 if league_code == "esp.1" else 3600
+
+    async def fake_sync():
+        polled.append(TEAM_SYNC_KEY)
+
+    monkeypatch.setattr(scheduler, "_league_codes", lambda: ["esp.1", "eng.1"])
+    monkeypatch.setattr(scheduler, "_poll_league", fake_poll)
+    monkeypatch.setattr(scheduler, "_periodic_sync", fake_sync)
+
+    scheduler._seed_poll_queue()
+    for _ in range(3):
+        _, key = heapq.heappop(scheduler.poll_queue)
+        interval = await scheduler._run_due(key)
+        heapq.heappush(scheduler.poll_queue, (time.monotonic() + interval, key))
+
+    assert sorted(polled) == sorted(["esp.1", "eng.1", TEAM_SYNC_KEY])
+    # The live league comes back first
+    assert scheduler.poll_queue[0][1] == "esp.1"
@@ -0,0 +1,82 @@
+"""
+Tests for scoreboard parsing and fixture store queries
+"""
+import json
+import pickle
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from src.services.fixture_store import FixtureStore, parse_fixture, parse_scoreboard
+
+
+SCOREBOARD = Path(__file__).parent.parent / "benchmarks" / "fixtures" / "eng.1_scoreboard.json"
+KICKOFF = datetime(2025, 8, 16, 14, 0, tzinfo=timezone.utc)
+
+
+def _event(event_id, home, away, kickoff, status="STATUS_SCHEDULED", home_score="0", away_score="0"):
+    return {
+        "id": str(event_id),
+        "name": f"{away} at {home}",
+        "date": kickoff.strftime("%Y-%m-%dT%H:%MZ"),
+        "season": {"slug": "2025-26-english-premier-league"},
+        "status": {"type": {"name": status}},
+        "competitions": [{
+            "venue": {"fullName": "Stadium"},
+            "competitors": [
+                {"homeAway": "home", "score": home_score, "team": {"id": str(home), "displayName": f"Team {home}", "abbreviation": f"T{home}"}},
+                {"homeAway": "away", "score": away_score, "team": {"id": str(away), "displayName": f"Team {away}", "abbreviation": f"T{away}"}}
+            ]
+        }]
+    }
+
+
+def test_parse_scoreboard_into_fixtures():
+    body = SCOREBOARD.read_bytes()
+    fixtures = parse_scoreboard(body, "eng.1")
+    assert len(fixtures) == len(json.loads(body)["events"])
+    assert fixtures[0].league is fixtures[-1].league  # interned
+
+    fixture = parse_fixture(_event(1, 363, 360, KICKOFF, "STATUS_SECOND_HALF", "2", "1"), "eng.1")
+    match = fixture.to_match()
+    assert match["date"] == "2025-08-16T14:00Z" and match["league_code"] == "eng.1"
+    # Each side carries its own score
+    assert (match["home_team"]["id"], match["home_team"]["score"]) == ("363", "2")
+    assert (match["away_team"]["id"], match["away_team"]["score"]) == ("360", "1")
+    assert fixture.to_upcoming_event("Premier League", "Chelsea")["event_date"] == KICKOFF.isoformat()
+    assert parse_scoreboard(b"not json") is None
+
+
+def test_replace_interns_fixtures_from_the_offload_pool():
+    # Results of the pool come back pickled: equal strings, but new objects
+    fixtures = pickle.loads(pickle.dumps(parse_scoreboard(SCOREBOARD.read_bytes(), "eng.1")))
+    status = fixtures[0].status
+    assert status is not sys.intern("".join(status))
+
+    stored = FixtureStore().replace("eng.1", fixtures).fixtures
+    for fixture in stored:
+        assert fixture.league is sys.intern("".join("eng.1"))
+        assert fixture.status is sys.intern("".join(fixture.status))
+        assert fixture.home.name is sys.intern("".join(fixture.home.name))
+
+
+def test_query_by_team_window_and_status():
+    store = FixtureStore()
+    store.replace("eng.1", [
+        parse_fixture(_event(3, 363, 360, KICKOFF + timedelta(days=7)), "eng.1"),
+        parse_fixture(_event(1, 363, 359, KICKOFF - timedelta(days=7), "STATUS_FULL_TIME"), "eng.1"),
+        parse_fixture(_event(2, 361, 362, KICKOFF, "STATUS_FIRST_HALF"), "eng.1"),
+    ])
+    store.replace("uefa.champions", [parse_fixture(_event(4, 86, 363, KICKOFF + timedelta(days=3)), "uefa.champions")])
+
+    def ids(**filters):
+        return [fixture.id for fixture in store.query(**filters)]
+
+    assert ids() == ["1", "2", "4", "3"]
+    assert ids(team_id=363) == ["1", "4", "3"]
+    assert ids(team_id=363, start=KICKOFF) == ["4", "3"]
+    assert ids(team_id=363, start=KICKOFF, end=KICKOFF + timedelta(days=7)) == ["4"]
+    assert ids(statuses=["live"]) == ["2"]
+    assert ids(team_id=363, statuses=["finished"], leagues=["eng.1"]) == ["1"]
+    assert ids(team_id=999) == []
+    assert store.get("eng.1", max_age=60) is not None and store.get("eng.1", max_age=-1) is None
@@ -0,0 +1,16 @@
+"""
+Tests that the API process loads the Agents and OpenAI SDKs only on first use of a generation route
+"""
+from benchmarks.import_time import measure_import
+
+
+def test_api_import_does_not_load_generation_sdks():
+    assert measure_import("import src.api.main")["lazy_modules_loaded"] == []
+
+
+def test_generator_import_loads_only_its_own_module():
+    result = measure_import(
+        "import sys, src.ai_agents.clash_quest_generator\n"
+        "assert 'src.ai_agents.collective_quest_generator' not in sys.modules"
+    )
+    assert "agents" in result["lazy_modules_loaded"]
@@ -0,0 +1,147 @@
+"""
+Tests for the leaderboard ranking structure
+"""
+import bisect
+import random
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from src.api.routes import leaderboard
+from src.models import Quest, QuestAssignment, QuestStatus, QuestType, User, XPLedgerEntry
+from src.services.leaderboard import IndexableSkipList, LeaderboardService, leaderboard_service
+from src.services.winner_snapshot import (
+    build_batches, encode_set_winners, keccak256, merkle_leaf, merkle_proof, merkle_tree, verify_merkle_proof
+)
+
+
+def test_skiplist_matches_sorted_list():
+    rng = random.Random(3)
+    skiplist = IndexableSkipList(seed=1)
+    reference = []
+
+    for _ in range(2000):
+        key = (rng.randint(-50, 0), rng.randint(1, 300))
+        if key in reference and rng.random() < 0.5:
+            skiplist.remove(key)
+            reference.remove(key)
+        elif key not in reference:
+            skiplist.insert(key)
+            bisect.insort(reference, key)
+
+    assert len(skiplist) == len(reference)
+    assert list(skiplist.iter_from(0, len(reference))) == reference
+    for position in rng.sample(range(len(reference)), 50):
+        assert skiplist[position] == reference[position]
+        assert skiplist.index(reference[position]) == position
+    assert list(skiplist.iter_from(10, 5)) == reference[10:15]
+
+
+def test_bulk_build_supports_updates():
+    keys = sorted((-(index % 17), index) for index in range(500))
+    skiplist = IndexableSkipList.from_sorted(keys, seed=2)
+    assert [skiplist[position] for position in range(len(keys))] == keys
+
+    skiplist.remove(keys[0])
+    skiplist.insert((-100, 999))
+    assert skiplist[0] == (-100, 999)
+    assert skiplist.index(keys[1]) == 1
+    assert len(skiplist) == 500
+
+
+async def test_ranking_queries():
+    service = LeaderboardService()
+    service.loaded = True
+    for user_id, xp in [(1, 50), (2, 120), (3, 50), (4, 10)]:
+        service._apply(user_id, xp, 1)
+    service._apply(4, 100, 1)
+
+    assert [entry["user_id"] for entry in await service.top(3)] == [2, 4, 1]
+    assert (await service.rank_of(3)) == {"rank": 4, "user_id": 3, "xp": 50, "completed_quests": 1}
+    assert (await service.rank_of(4))["completed_quests"] == 2
+    assert [entry["rank"] for entry in await service.around(1, radius=1)] == [2, 3, 4]
+    assert await service.rank_of(99) is None
+
+
+@pytest.fixture
+async def sessions(make_sessions):
+    return await make_sessions(
+        "src.services.leaderboard", "src.api.routes.leaderboard",
+        seed=[User(id=user_id, address=f"0x{user_id}") for user_id in (1, 2)]
+    )
+
+
+async def test_sync_applies_rows_committed_out_of_id_order(sessions):
+    service = LeaderboardService()
+    async with sessions() as session:
+        session.add_all([XPLedgerEntry(id=1, user_id=1, amount=10, reason="bonus"),
+                         XPLedgerEntry(id=3, user_id=1, amount=30, reason="bonus")])
+        await session.commit()
+    await service.load()
+    assert service.high_water_id == 3
+
+    # Id 2 was allocated first but committed after id 3 was read
+    async with sessions() as session:
+        session.add_all([XPLedgerEntry(id=2, user_id=2, amount=20, reason="bonus"),
+                         XPLedgerEntry(id=4, user_id=2, amount=5, reason="bonus")])
+        await session.commit()
+    assert await service.sync() == 2
+    assert await service.sync() == 0
+    assert service.scores == {1: 40, 2: 25}
+
+
+async def test_award_requires_a_completed_quest(sessions, monkeypatch):
+    monkeypatch.setattr(leaderboard_service, "loaded", False)
+    async with sessions() as session:
+        session.add_all([
+            Quest(id=1, title="Mine", description="Personal", quest_type=QuestType.INDIVIDUAL, user_id=1, team_id=1,
+                  target_value=2, status=QuestStatus.ACTIVE),
+            Quest(id=2, title="Team", description="Team quest", quest_type=QuestType.INDIVIDUAL, team_id=1,
+                  target_value=2, status=QuestStatus.ACTIVE),
+        ])
+        session.add_all([QuestAssignment(user_id=1, quest_id=2, progress=2), QuestAssignment(user_id=2, quest_id=2, progress=1)])
+        await session.commit()
+
+    app = FastAPI()
+    app.include_router(leaderboard.write_router, prefix="/api/leaderboard")
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        async def award(quest_id, user_id):
+            return await client.post("/api/leaderboard/award", json={"quest_id": quest_id, "user_id": user_id})
+
+        assert (await award(1, 1)).status_code == 409
+        assert (await award(1, 2)).status_code == 403
+        # Team quests are judged on the caller's own inbox row
+        assert (await award(2, 2)).status_code == 409
+        assert (await award(2, 1)).json()["xp"] == 20
+
+        async with sessions() as session:
+            (await session.get(Quest, 1)).status = QuestStatus.COMPLETED
+            await session.commit()
+        assert (await award(1, 1)).json()["awarded"] is True
+        assert (await award(1, 1)).json()["awarded"] is False
+
+
+def test_keccak_and_set_winners_calldata():
+    assert keccak256(b"").hex() == "c5d2460186f7233c927e7db2dcc703c0e500b653ca82273b7bfad8045d85a470"
+    assert keccak256(b"hello world").hex() == "47173285a8d7341e5e972fc677286384f802f8ef42a5ec5f03bbfa254cb01fad"
+
+    address = "0x" + "ab" * 20
+    calldata = encode_set_winners([address])
+    assert calldata[:10] == "0x445e6b39"
+    assert len(calldata) == 2 + 8 + 3 * 64
+    assert calldata.endswith("0" * 24 + "ab" * 20)
+
+
+def test_winner_batches_and_merkle_proofs():
+    addresses = ["0x%040x" % index for index in range(1, 24)]
+    batches = build_batches(addresses, gas_limit=10_000_000)
+    assert [len(batch["addresses"]) for batch in batches] == [10, 10, 3]
+    assert [batch["first_rank"] for batch in batches] == [1, 11, 21]
+    assert len(build_batches(addresses, gas_limit=200_000)[0]["addresses"]) < 10
+
+    leaves = [merkle_leaf(address) for address in addresses]
+    levels = merkle_tree(leaves)
+    for index, leaf in enumerate(leaves):
+        assert verify_merkle_proof(leaf, merkle_proof(levels, index), levels[-1][0])
+    assert not verify_merkle_proof(merkle_leaf("0x" + "ff" * 20), merkle_proof(levels, 0), levels[-1][0])
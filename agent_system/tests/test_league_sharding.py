@@ -0,0 +1,70 @@
+"""
+Tests for the consistent-hash shard ring, shard membership and league poll budgets
+"""
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.models import Base
+from src.services.event_scheduler import EventScheduler
+from src.services.league_registry import league_registry
+from src.services.shard_ring import HashRing, ShardMembership
+
+
+LEAGUES = [f"league.{i}" for i in range(120)]
+
+
+def test_ring_spreads_leagues_and_moves_few_on_join():
+    ring = HashRing(["a", "b", "c"])
+    counts = {member: len(keys) for member, keys in ring.assignments(LEAGUES).items()}
+    assert sum(counts.values()) == 120
+    assert all(28 <= count <= 52 for count in counts.values()), counts
+
+    grown = HashRing(["a", "b", "c", "d"])
+    moved = [key for key in LEAGUES if ring.owner(key) != grown.owner(key)]
+    # Only keys taken over by the new member move
+    assert all(grown.owner(key) == "d" for key in moved)
+    assert 15 <= len(moved) <= 45
+
+
+async def test_workers_split_leagues_and_take_over_on_leave(monkeypatch):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    monkeypatch.setattr("src.services.shard_ring.async_session", async_sessionmaker(engine, expire_on_commit=False))
+
+    first = ShardMembership("event_scheduler", "host:1:aaaa", ttl_seconds=30)
+    second = ShardMembership("event_scheduler", "host:2:bbbb", ttl_seconds=30)
+    await first.heartbeat()
+    await second.heartbeat()
+    await first.heartbeat()
+
+    owned_first = {key for key in LEAGUES if first.owns(key)}
+    owned_second = {key for key in LEAGUES if second.owns(key)}
+    assert owned_first and owned_second
+    assert owned_first.isdisjoint(owned_second) and owned_first | owned_second == set(LEAGUES)
+
+    await second.stop()
+    await first.heartbeat()
+    assert all(first.owns(key) for key in LEAGUES)
+    await engine.dispose()
+
+
+async def test_scheduler_skips_foreign_leagues_and_applies_budget(monkeypatch):
+    scheduler = EventScheduler()
+    scheduler.membership = type("Membership", (), {"heartbeat_interval": 10.0, "owns": staticmethod(lambda key: key == "eng.1")})()
+    polled = []
+
+    async def fake_matches(league_code):
+        polled.append(league_code)
+        return [{"id": "1", "status": "STATUS_FIRST_HALF"}]
+
+    async def fake_update(matches):
+        return 0
+
+    monkeypatch.setattr("src.services.event_scheduler.espn_football_service.get_matches_by_league", fake_matches)
+    monkeypatch.setattr("src.services.database_integration.db_integration.update_event_statuses", fake_update)
+    monkeypatch.setattr(league_registry, "budgets", {"eng.1": 120})
+
+    assert await scheduler._run_due("esp.1") == 10
+    # A live league would be polled every 10 s, its budget allows one poll every 30 s
+    assert await scheduler._run_due("eng.1") == 30
+    assert polled == ["eng.1"]
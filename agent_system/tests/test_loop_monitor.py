@@ -0,0 +1,78 @@
+"""
+Tests for the event loop lag monitor and the CPU offload pool
+"""
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+
+from src.core.loop_monitor import LoopLagMonitor
+from src.core.offload import CPUOffload
+from src.services.espn_football_service import parse_scoreboard
+
+
+SCOREBOARD = Path(__file__).parent.parent / "benchmarks" / "fixtures" / "eng.1_scoreboard.json"
+
+
+def crash_once(marker: str) -> int:
+    """Kills the pool worker on the first call, succeeds on later ones"""
+    if not os.path.exists(marker):
+        Path(marker).touch()
+        os._exit(1)
+    return os.getpid()
+
+
+def crash_outside(parent_pid: int) -> int:
+    """Kills every pool worker; only returns in the parent process"""
+    if os.getpid() != parent_pid:
+        os._exit(1)
+    return parent_pid
+
+
+async def test_monitor_reports_blocking_code(monkeypatch):
+    monitor = LoopLagMonitor()
+    monitor.interval, monitor.block_threshold = 0.02, 0.05
+    warnings = []
+    monkeypatch.setattr("src.core.loop_monitor.logger.warning", warnings.append)
+
+    await monitor.start()
+    await asyncio.sleep(0.05)
+    time.sleep(0.3)  # blocks the loop
+    await asyncio.sleep(0.05)
+    await monitor.stop()
+
+    assert monitor.totals["blocked"] == 1
+    assert monitor.totals["max_lag_seconds"] >= 0.2
+    assert "test_monitor_reports_blocking_code" in warnings[0]
+
+
+async def test_offload_runs_in_process_pool_and_matches_inline():
+    offload = CPUOffload()
+    offload.processes = 1
+    body = SCOREBOARD.read_bytes()
+    try:
+        pooled = await offload.run(parse_scoreboard, body)
+    finally:
+        await offload.stop()
+
+    assert pooled == await offload.run(parse_scoreboard, body, inline=True)
+    assert len(pooled) == len(json.loads(body)["events"])
+    assert offload.totals["process"] == 1 and offload.totals["inline"] == 1
+
+
+async def test_broken_pool_is_shut_down_and_the_call_retried(tmp_path):
+    offload = CPUOffload()
+    offload.processes = 1
+    try:
+        first = offload._executor()
+        worker_pid = await offload.run(crash_once, str(tmp_path / "crashed"))
+        assert worker_pid != os.getpid()
+        assert offload.pool is not first and first._processes is None  # reaped by shutdown()
+        assert offload.totals == {"process": 1, "thread": 0, "inline": 0, "pool_restarts": 1}
+
+        # A call that breaks the fresh pool too runs in a thread instead
+        assert await offload.run(crash_outside, os.getpid()) == os.getpid()
+        assert offload.totals["thread"] == 1 and offload.totals["pool_restarts"] == 3
+    finally:
+        await offload.stop()
@@ -0,0 +1,92 @@
+"""
+Tests for the Prometheus registry, the latency middleware and the /metrics output
+"""
+import httpx
+from fastapi import FastAPI
+
+from src.core.instrumentation import PrometheusMiddleware, http_request_duration
+from src.core.metrics import MetricsRegistry, metrics_registry
+from src.core.response_cache import ResponseCache, ResponseCacheMiddleware
+
+
+def test_exposition_format_and_label_escaping():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests by path", ["path"])
+    in_flight = registry.gauge("in_flight", "Requests in flight")
+    requests.inc(path='/a"b\\c\nd')
+    requests.inc(2, path="/plain")
+    in_flight.set(1.5)
+    assert registry.counter("requests_total", "registered twice", ["path"]) is requests
+
+    assert registry.render() == (
+        "# HELP in_flight Requests in flight\n"
+        "# TYPE in_flight gauge\n"
+        "in_flight 1.5\n"
+        "# HELP requests_total Requests by path\n"
+        "# TYPE requests_total counter\n"
+        'requests_total{path="/a\\"b\\\\c\\nd"} 1\n'
+        'requests_total{path="/plain"} 2\n'
+    )
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency", ["route"], buckets=(0.5, 0.1, 1.0))
+    for value in (0.05, 0.1, 0.3, 2.0):
+        latency.observe(value, route="/x")
+
+    lines = registry.render().splitlines()[2:]
+    assert lines == [
+        'latency_seconds_bucket{route="/x",le="0.1"} 2',
+        'latency_seconds_bucket{route="/x",le="0.5"} 3',
+        'latency_seconds_bucket{route="/x",le="1"} 3',
+        'latency_seconds_bucket{route="/x",le="+Inf"} 4',
+        'latency_seconds_sum{route="/x"} 2.45',
+        'latency_seconds_count{route="/x"} 4',
+    ]
+
+
+async def test_middleware_labels_routes_and_cache_hits():
+    app = FastAPI()
+    app.add_middleware(ResponseCacheMiddleware, cache=ResponseCache())
+    app.add_middleware(PrometheusMiddleware)
+
+    @app.get("/api/teams/{team_id}")
+    async def team(team_id: int):
+        return {"id": team_id}
+
+    @app.get("/api/users/{user_id}")
+    async def user(user_id: int):
+        return {"id": user_id}
+
+    @app.get("/api/users/{user_id}/users")
+    async def followers(user_id: str):
+        return {"id": user_id}
+
+    labels = {"method": "GET", "status": "200"}
+    before_team = http_request_duration.get_count(route="/api/teams/{team_id}", **labels)
+    before_user = http_request_duration.get_count(route="/api/users/{user_id}", **labels)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        assert (await client.get("/api/teams/3")).headers["x-cache"] == "MISS"
+        assert (await client.get("/api/teams/3")).headers["x-cache"] == "HIT"
+        await client.get("/api/users/7")
+        await client.get("/api/users/8")
+        await client.get("/api/users/users/users")  # a value equal to a literal segment
+
+    # The hit never reached the router but is counted under the same template
+    assert http_request_duration.get_count(route="/api/teams/{team_id}", **labels) == before_team + 2
+    assert http_request_duration.get_count(route="/api/users/{user_id}", **labels) == before_user + 2
+    assert http_request_duration.get_count(route="/api/users/{user_id}/users", **labels) == 1
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/users/{user_id}",status="200"}' in metrics_registry.render()
+
+
+async def test_metrics_endpoint_serves_the_registry():
+    from src.api.main import app
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        await client.get("/health")
+        response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE http_request_duration_seconds histogram" in response.text
+    assert 'route="/health"' in response.text
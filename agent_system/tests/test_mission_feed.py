@@ -0,0 +1,52 @@
+"""
+Tests for the precomputed mission feed
+"""
+import json
+
+from src.services.mission_feed import MissionFeedService, build_snapshot, etag_matches
+
+
+MISSIONS = [
+    {"id": 2, "title": "Clash", "team_id": 1, "quest_type": "clash"},
+    {"id": 1, "title": "Solo", "team_id": 2, "quest_type": "individual"},
+]
+
+
+def test_snapshot_has_full_feed_and_team_slices():
+    snapshot = build_snapshot(MISSIONS, version=3)
+
+    full = json.loads(snapshot.full.body)
+    assert full["version"] == 3 and full["total"] == 2
+    assert [mission["id"] for mission in json.loads(snapshot.teams[2].body)["missions"]] == [1]
+    assert snapshot.full.etag != snapshot.teams[1].etag
+
+    # Same content keeps the same ETag, whatever the version
+    assert build_snapshot(MISSIONS, version=4).full.etag == snapshot.full.etag
+
+
+def test_etag_matching():
+    etag = build_snapshot(MISSIONS, version=1).full.etag
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('"other"', etag)
+
+
+async def test_version_moves_only_when_content_changes(monkeypatch):
+    service = MissionFeedService()
+    missions = list(MISSIONS)
+
+    async def load():
+        return list(missions)
+
+    monkeypatch.setattr(service, "_load_missions", load)
+
+    assert (await service.refresh()).version == 1
+    assert (await service.refresh()).version == 1
+
+    missions.append({"id": 3, "title": "New", "team_id": 1, "quest_type": "individual"})
+    snapshot, team_slice = await service.get_slice(team_id=1)
+    assert snapshot.version == 1
+    assert (await service.refresh()).version == 2
+    assert json.loads(service.snapshot.teams[1].body)["total"] == 2
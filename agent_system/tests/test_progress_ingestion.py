@@ -0,0 +1,102 @@
+"""
+Tests for progress event coalescing and the atomic flush
+"""
+import json
+
+import pytest
+from sqlalchemy import select
+
+from src.models import Quest, QuestAssignment, QuestStatus, QuestType, User, XPLedgerEntry
+from src.services.progress_ingestion import ProgressIngestionService, ProgressEvent
+
+
+def test_submit_coalesces_per_quest_and_user():
+    service = ProgressIngestionService()
+    counts = service.submit([
+        ProgressEvent(quest_id=1, delta=2, user_id=7),
+        ProgressEvent(quest_id=1, delta=3, user_id=7),
+        ProgressEvent(quest_id=1, delta=1, address="0xABC"),
+        ProgressEvent(quest_id=1, delta=1, address="0xabc"),
+        ProgressEvent(quest_id=2, delta=0, user_id=7),
+        ProgressEvent(quest_id=2, delta=service.max_delta + 1, user_id=7),
+        ProgressEvent(quest_id=2, delta=1),
+    ])
+
+    assert counts == {"accepted": 4, "rejected": 3}
+    assert service.pending == {(1, 7, None): 5, (1, None, "0xabc"): 2}
+    assert service.get_status()["pending_events"] == 4
+
+
+@pytest.fixture
+async def sessions(make_sessions):
+    return await make_sessions("src.services.progress_ingestion", "src.services.leaderboard", seed=[
+        *(User(id=user_id, address=f"0x{user_id}") for user_id in (1, 2, 3)),
+        Quest(id=1, title="Mine", description="Personal", quest_type=QuestType.INDIVIDUAL, user_id=1, team_id=1,
+              target_value=3, status=QuestStatus.ACTIVE, quest_metadata=json.dumps({"rewards": {"points": 40}})),
+        Quest(id=2, title="Team", description="Team quest", quest_type=QuestType.INDIVIDUAL, team_id=1,
+              target_value=2, status=QuestStatus.ACTIVE),
+        Quest(id=3, title="Everyone", description="Community goal", quest_type=QuestType.COLLECTIVE, team_id=1,
+              target_value=4, status=QuestStatus.ACTIVE),
+        QuestAssignment(user_id=1, quest_id=1), QuestAssignment(user_id=1, quest_id=2), QuestAssignment(user_id=2, quest_id=2),
+    ])
+
+
+async def _quests(factory):
+    async with factory() as session:
+        rows = (await session.execute(select(Quest.id, Quest.current_progress, Quest.status).order_by(Quest.id))).all()
+        return {quest_id: (progress, status) for quest_id, progress, status in rows}
+
+
+async def _xp(factory):
+    async with factory() as session:
+        rows = (await session.execute(select(XPLedgerEntry.user_id, XPLedgerEntry.quest_id, XPLedgerEntry.amount))).all()
+        return sorted(rows)
+
+
+async def test_flush_increments_and_completes_personal_quest(sessions):
+    service = ProgressIngestionService()
+    service.submit([ProgressEvent(quest_id=1, delta=1, user_id=1), ProgressEvent(quest_id=1, delta=1, address="0X1"),
+                    ProgressEvent(quest_id=3, delta=2, user_id=2)])
+    assert await service.flush() == {"events": 3, "updated_rows": 2, "completed": 0, "completed_by_fans": 0}
+
+    # Increments add to what is stored, the flip comes back through RETURNING once the target is reached
+    service.submit([ProgressEvent(quest_id=1, delta=2, user_id=1), ProgressEvent(quest_id=3, delta=2, user_id=3)])
+    summary = await service.flush()
+    assert summary["completed"] == 2
+    assert await _quests(sessions) == {1: (4, QuestStatus.COMPLETED), 2: (0, QuestStatus.ACTIVE), 3: (4, QuestStatus.COMPLETED)}
+    # The personal quest pays its owner; the community goal pays nobody
+    assert await _xp(sessions) == [(1, 1, 40)]
+
+    # Completed quests take no more progress
+    service.submit([ProgressEvent(quest_id=1, delta=5, user_id=1)])
+    assert (await service.flush())["updated_rows"] == 0
+
+
+async def test_flush_rejects_events_for_someone_elses_quest(sessions):
+    service = ProgressIngestionService()
+    service.submit([ProgressEvent(quest_id=1, delta=3, user_id=2), ProgressEvent(quest_id=1, delta=3, address="0x3")])
+    assert (await service.flush())["updated_rows"] == 0
+    assert await _quests(sessions) == {1: (0, QuestStatus.ACTIVE), 2: (0, QuestStatus.ACTIVE), 3: (0, QuestStatus.ACTIVE)}
+    assert await _xp(sessions) == []
+
+
+async def test_team_quest_progress_completes_and_pays_per_fan(sessions):
+    service = ProgressIngestionService()
+    # User 3 has no inbox row for the team quest and is ignored
+    service.submit([ProgressEvent(quest_id=2, delta=2, user_id=1), ProgressEvent(quest_id=2, delta=1, user_id=2),
+                    ProgressEvent(quest_id=2, delta=5, user_id=3)])
+    assert (await service.flush())["completed_by_fans"] == 1
+
+    async with sessions() as session:
+        inbox = (await session.execute(
+            select(QuestAssignment.user_id, QuestAssignment.progress, QuestAssignment.completed_at.is_not(None))
+            .where(QuestAssignment.quest_id == 2).order_by(QuestAssignment.user_id)
+        )).all()
+    assert [tuple(row) for row in inbox] == [(1, 2, True), (2, 1, False)]
+    # The quest stays open for the other fans and keeps the team-wide total
+    assert (await _quests(sessions))[2] == (3, QuestStatus.ACTIVE)
+    assert await _xp(sessions) == [(1, 2, 20)]
+
+    service.submit([ProgressEvent(quest_id=2, delta=1, user_id=2), ProgressEvent(quest_id=2, delta=1, user_id=1)])
+    assert (await service.flush())["completed_by_fans"] == 1
+    assert await _xp(sessions) == [(1, 2, 20), (2, 2, 20)]
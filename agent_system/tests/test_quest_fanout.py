@@ -0,0 +1,94 @@
+"""
+Tests for quest inboxes: fan-out on creation, duplicate suppression, backfill and the inbox read
+"""
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import func, select
+
+from src.api.routes import quests
+from src.models import QuestAssignment, QuestStatus, Team, User, UserTeam
+from src.models.database import get_db
+from src.services.quest_fanout import quest_fanout
+from src.tools.database_tools import create_quest
+
+
+@pytest.fixture
+async def sessions(make_sessions, monkeypatch):
+    monkeypatch.setattr(quest_fanout, "batch_size", 2)  # several INSERT ... SELECT slices
+    return await make_sessions("src.services.quest_fanout", "src.tools.database_tools", seed=[
+        Team(id=2, name="Chelsea", display_name="Chelsea", sport="football"),
+        *(User(id=user_id, address=f"0x{user_id}") for user_id in range(1, 6)),
+        *(UserTeam(user_id=user_id, team_id=1) for user_id in (1, 2, 3)),
+        UserTeam(user_id=4, team_id=2),
+    ])
+
+
+async def _inbox(factory, user_id):
+    async with factory() as session:
+        return (await session.execute(
+            select(QuestAssignment.quest_id).where(QuestAssignment.user_id == user_id).order_by(QuestAssignment.quest_id)
+        )).scalars().all()
+
+
+def _client(factory) -> httpx.AsyncClient:
+    app = FastAPI()
+    app.include_router(quests.router, prefix="/api/quests")
+
+    async def test_db():
+        async with factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = test_db
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+async def test_create_quest_fans_out_once_per_follower(sessions):
+    team_quest = await create_quest("Team", "Team quest", "individual", team_id=1, target_value=2)
+    personal = await create_quest("Mine", "Personal quest", "individual", team_id=2, user_id=5)
+
+    assert [await _inbox(sessions, user_id) for user_id in (1, 2, 3, 4, 5)] == [[team_quest]] * 3 + [[], [personal]]
+    # Re-running the fan-out writes nothing new
+    assert await quest_fanout.fan_out([team_quest, personal]) == 0
+    async with sessions() as session:
+        assert (await session.execute(select(func.count()).select_from(QuestAssignment))).scalar_one() == 4
+
+
+async def test_late_followers_get_open_team_quests_and_read_their_inbox(sessions):
+    first = await create_quest("First", "Open quest", "individual", team_id=1)
+    second = await create_quest("Second", "Open quest", "clash", team_id=1)
+    closed = await create_quest("Closed", "Expired quest", "individual", team_id=1)
+    async with sessions() as session:
+        (await session.get(quests.Quest, closed)).status = QuestStatus.EXPIRED
+        session.add(UserTeam(user_id=5, team_id=1))  # followed without the follow route
+        await session.commit()
+
+    assert await quest_fanout.backfill_inboxes() == 2
+    assert await _inbox(sessions, 5) == [first, second]
+    assert await quest_fanout.backfill_inboxes() == 0
+    assert await quest_fanout.assign_open_team_quests(4, 1) == 2
+
+    async with _client(sessions) as client:
+        inbox = (await client.get("/api/quests/5")).json()
+    assert [quest["title"] for quest in inbox["quests"]] == ["Second", "First"]  # newest first
+
+
+async def test_quest_listing_and_per_fan_inbox_progress(sessions):
+    team_quest = await create_quest("Team", "Team quest", "individual", team_id=1, target_value=3)
+    await create_quest("Mine", "Personal quest", "individual", team_id=2, user_id=5, target_value=2)
+    async with sessions() as session:
+        assignment = (await session.execute(
+            select(QuestAssignment).where(QuestAssignment.user_id == 1, QuestAssignment.quest_id == team_quest)
+        )).scalar_one()
+        assignment.progress = 2
+        await session.commit()
+
+    async with _client(sessions) as client:
+        listing = await client.get("/api/quests/")
+        by_team = await client.get("/api/quests/", params={"team_id": 1})
+        fan, other_fan = [(await client.get(f"/api/quests/{user_id}")).json()["quests"] for user_id in (1, 2)]
+
+    assert listing.status_code == 200 and sorted(quest["title"] for quest in listing.json()["quests"]) == ["Mine", "Team"]
+    assert by_team.status_code == 200 and [quest["title"] for quest in by_team.json()["quests"]] == ["Team"]
+    # Team quests show each fan their own progress
+    assert [quest["current_progress"] for quest in fan + other_fan] == [2, 0]
@@ -0,0 +1,66 @@
+"""
+Tests for quest lifecycle scheduling and the status sweep
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+
+from src.models import Quest, QuestStatus, QuestType
+from src.services.quest_lifecycle import QuestLifecycleService, as_utc
+
+
+@pytest.fixture
+async def sessions(make_sessions):
+    return await make_sessions("src.services.quest_lifecycle")
+
+
+def _quest(quest_id, status, start_time=None, end_time=None):
+    return Quest(id=quest_id, title=f"Quest {quest_id}", description="Lifecycle", quest_type=QuestType.INDIVIDUAL,
+                 team_id=1, status=status, start_time=start_time, end_time=end_time)
+
+
+async def test_schedule_keeps_transitions_within_horizon_in_time_order(sessions):
+    service = QuestLifecycleService()
+    now = datetime.now(timezone.utc)
+
+    # Processes without the sweeper keep no heap
+    service.schedule(1, None, now + timedelta(seconds=30))
+    assert service.heap == []
+
+    await service.start()
+    try:
+        service.schedule(1, None, now + timedelta(seconds=30))
+        service.schedule(2, now + timedelta(seconds=10), now + timedelta(days=30))
+        service.schedule(3, (now + timedelta(seconds=5)).replace(tzinfo=None), None)
+
+        assert [(quest_id, transition) for _, quest_id, transition in sorted(service.heap)] == [
+            (3, "activate"), (2, "activate"), (1, "expire")
+        ]
+        assert service.heap[0][0] == as_utc((now + timedelta(seconds=5)).replace(tzinfo=None))
+    finally:
+        await service.stop()
+
+
+async def test_sweep_activates_and_expires_due_quests(sessions):
+    now = datetime.now(timezone.utc)
+    async with sessions() as session:
+        session.add_all([
+            _quest(1, QuestStatus.PENDING, start_time=now - timedelta(minutes=1), end_time=now + timedelta(hours=1)),
+            _quest(2, QuestStatus.PENDING, start_time=now + timedelta(hours=1)),
+            _quest(3, QuestStatus.ACTIVE, end_time=now - timedelta(minutes=1)),
+            _quest(4, QuestStatus.PENDING, start_time=now - timedelta(hours=2), end_time=now - timedelta(hours=1)),
+            _quest(5, QuestStatus.COMPLETED, end_time=now - timedelta(minutes=1)),
+        ])
+        await session.commit()
+
+    service = QuestLifecycleService()
+    assert await service.sweep() == {"activated": 1, "expired": 2}
+    async with sessions() as session:
+        statuses = dict((await session.execute(select(Quest.id, Quest.status))).all())
+    assert statuses == {
+        1: QuestStatus.ACTIVE, 2: QuestStatus.PENDING, 3: QuestStatus.EXPIRED,
+        4: QuestStatus.EXPIRED, 5: QuestStatus.COMPLETED
+    }
+    # Transitions are idempotent
+    assert await service.sweep() == {"activated": 0, "expired": 0}
@@ -0,0 +1,74 @@
+"""
+Tests for shared research: topic deduplication, batched searches and the entity index
+"""
+import asyncio
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.models import Base
+from src.services.research_service import ResearchService
+
+
+TEAMS = ["Chelsea", "Manchester United", "Real Madrid", "Barcelona", "PSG", "Bayern Munich"]
+
+
+async def _use_memory_db(monkeypatch):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    monkeypatch.setattr("src.services.research_service.async_session", async_sessionmaker(engine, expire_on_commit=False))
+
+
+def _fake_search(monkeypatch, runs, fail_batches=False):
+    async def search_topics(topics):
+        runs.append([description for _, description in topics])
+        await asyncio.sleep(0.01)
+        if fail_batches and len(topics) > 1:
+            raise ValueError("context overflow")
+        return {key: f"Brief about {description}" for key, description in topics}
+
+    monkeypatch.setattr("src.tools.web_search_tools.search_topics", search_topics)
+
+
+async def test_generators_share_documents_and_searches(monkeypatch):
+    await _use_memory_db(monkeypatch)
+    runs = []
+    _fake_search(monkeypatch, runs)
+    service = ResearchService()
+    service.topics_per_search = 4
+
+    news = await service.team_news(TEAMS)
+    assert all(news[team].startswith("Brief about Team: " + team) for team in TEAMS)
+    assert len(runs) == 2  # 6 teams, 4 per search
+
+    # Clash context: only the match preview is new, both teams' news is reused
+    context = await service.match_context("Chelsea", "Manchester United", fixture_id="401", competition="eng.1")
+    assert len(runs) == 3 and len(runs[-1]) == 1 and runs[-1][0].startswith("Match: Chelsea vs Manchester United")
+    assert "Match News:" in context and "Chelsea News:" in context and "Manchester United News:" in context
+
+    # Concurrent community runs join one search
+    events = await asyncio.gather(*(service.global_events() for _ in range(3)))
+    assert len(runs) == 4 and len(set(events)) == 1
+    assert service.totals["joined"] == 2
+
+    # Another process finds the stored documents, and they are indexed by entity
+    other = ResearchService()
+    assert await other.team_news(["Chelsea", "PSG"]) == {"Chelsea": news["Chelsea"], "PSG": news["PSG"]}
+    assert len(runs) == 4 and other.totals["stored"] == 2
+    chelsea = {document["scope"] for document in await other.documents_for("team", " chelsea ")}
+    assert chelsea == {"team", "fixture"}
+    assert len(await other.documents_for("competition", "eng.1")) == 3
+    assert len(await other.documents_for("fixture", "401")) == 1
+
+
+async def test_failed_search_is_split_and_retried(monkeypatch):
+    await _use_memory_db(monkeypatch)
+    runs = []
+    _fake_search(monkeypatch, runs, fail_batches=True)
+    service = ResearchService()
+    service.topics_per_search = 4
+
+    news = await service.team_news(TEAMS[:4])
+    assert all(news.values())
+    assert [len(run) for run in runs] == [4, 2, 2, 1, 1, 1, 1]
+    assert service.totals["searched"] == 4 and service.totals["failed"] == 0
@@ -0,0 +1,66 @@
+"""
+Tests for the catalog response cache and its generation-based invalidation
+"""
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.core.response_cache import ResponseCache, ResponseCacheMiddleware, install_cache_invalidation, response_cache
+from src.models import Base, CacheGeneration, SportsEvent, Team
+
+
+def catalog_app(cache):
+    app = FastAPI()
+    app.add_middleware(ResponseCacheMiddleware, cache=cache)
+    calls = []
+
+    @app.get("/api/teams/")
+    async def teams(league: str = "", limit: int = 10):
+        calls.append((league, limit))
+        return [{"name": "Chelsea", "league": league}]
+
+    return app, calls
+
+
+async def test_cached_until_generation_bump_with_etag_revalidation():
+    cache = ResponseCache()
+    app, calls = catalog_app(cache)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        first = await client.get("/api/teams/?limit=5&league=eng")
+        same = await client.get("/api/teams/?league=eng&limit=5&sport=")
+        assert first.headers["x-cache"] == "MISS" and same.headers["x-cache"] == "HIT"
+        assert same.json() == first.json() and len(calls) == 1
+
+        revalidated = await client.get("/api/teams/?league=eng&limit=5", headers={"If-None-Match": first.headers["etag"]})
+        assert revalidated.status_code == 304 and revalidated.headers["etag"] == first.headers["etag"]
+
+        cache.bump("teams")
+        assert (await client.get("/api/teams/?league=eng&limit=5")).headers["x-cache"] == "MISS"
+        assert len(calls) == 2
+
+
+async def test_writes_bump_generations_in_the_same_transaction():
+    install_cache_invalidation()
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    async with sessions() as session:
+        session.add_all([CacheGeneration(namespace="teams", generation=0), CacheGeneration(namespace="events", generation=0)])
+        await session.commit()
+
+    before = dict(response_cache.generations)
+    async with sessions() as session:
+        session.add(Team(name="Chelsea", display_name="Chelsea FC", sport="football"))
+        await session.commit()
+        # A bulk UPDATE that matches nothing changes nothing
+        await session.execute(update(SportsEvent).where(SportsEvent.external_id == "missing").values(status="live"))
+        await session.commit()
+
+        stored = dict((await session.execute(select(CacheGeneration.namespace, CacheGeneration.generation))).all())
+    await engine.dispose()
+
+    assert stored == {"teams": 1, "events": 0}
+    assert response_cache.generations["teams"] == before["teams"] + 1
+    assert response_cache.generations["events"] == before["events"]
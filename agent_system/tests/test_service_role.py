@@ -0,0 +1,45 @@
+"""
+Tests for the SERVICE_ROLE split of routers between read, write and worker processes
+"""
+import pytest
+from fastapi import FastAPI
+
+from src.api.main import include_role_routers
+from src.core.service_role import runs, service_role
+
+
+def mounted_paths(role):
+    app = FastAPI()
+    include_role_routers(app, role)
+    return set(app.openapi()["paths"])
+
+
+@pytest.mark.filterwarnings("ignore:Duplicate Operation ID")  # ESPN routes repeat a few read paths
+def test_roles_mount_only_their_routers():
+    read, write, worker, everything = (mounted_paths(role) for role in ("api-read", "api-write", "worker", "all"))
+
+    assert {"/api/teams/", "/api/quests/{user_id}", "/api/feed/missions"} <= read
+    assert not any(path.startswith(("/api/quests/new", "/api/quests/generate", "/api/sync")) for path in read)
+    assert "/api/leaderboard/top" in read
+    assert not {"/api/leaderboard/award", "/api/leaderboard/snapshot"} & read
+    assert not any(path.startswith("/api/progress") for path in read)
+
+    assert {"/api/quests/new/individual", "/api/quests/generate/all", "/api/sync/full"} <= write
+    assert {"/api/leaderboard/award", "/api/leaderboard/snapshot", "/api/progress/events"} <= write
+    assert "/api/teams/" not in write and "/api/leaderboard/top" not in write
+    assert not any(path.startswith("/api/feed") for path in write)
+
+    assert worker and all(path.startswith("/debug/") for path in worker)
+    assert everything == read | write
+
+
+def test_service_role_from_environment(monkeypatch):
+    monkeypatch.delenv("SERVICE_ROLE", raising=False)
+    assert service_role() == "all" and runs("read") and runs("worker")
+
+    monkeypatch.setenv("SERVICE_ROLE", "API-Read")
+    assert service_role() == "api-read" and runs("read") and not runs("write")
+
+    monkeypatch.setenv("SERVICE_ROLE", "reader")
+    with pytest.raises(ValueError):
+        service_role()
@@ -0,0 +1,89 @@
+"""
+Tests for coalescing identical concurrent generation calls
+"""
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from src.core.single_flight import coalesce, single_flight
+
+
+async def test_concurrent_identical_requests_share_one_run():
+    app = FastAPI()
+    runs = []
+
+    @app.get("/generate/{team_name}")
+    @coalesce()
+    async def generate(team_name: str, batch: bool = True):
+        runs.append((team_name, batch))
+        await asyncio.sleep(0.05)
+        return {"team": team_name, "run": len(runs)}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        burst = await asyncio.gather(*(client.get("/generate/Chelsea") for _ in range(10)), client.get("/generate/Chelsea?batch=true"))
+        assert {r.json()["run"] for r in burst} == {1}
+        assert runs == [("Chelsea", True)]
+
+        # Finished results are reused within the window; other parameters run on their own
+        assert (await client.get("/generate/Chelsea")).json()["run"] == 1
+        assert (await client.get("/generate/Arsenal")).json()["run"] == 2
+
+        single_flight.forget()
+        assert (await client.get("/generate/Chelsea")).json()["run"] == 3
+
+
+async def test_failures_are_shared_but_not_kept():
+    calls = []
+
+    @coalesce()
+    async def flaky(team_name: str):
+        calls.append(team_name)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("model unavailable")
+
+    results = await asyncio.gather(flaky("Leeds"), flaky(team_name="Leeds"), return_exceptions=True)
+    assert len(calls) == 1 and all(isinstance(r, RuntimeError) for r in results)
+
+    with pytest.raises(RuntimeError):
+        await flaky("Leeds")
+    assert len(calls) == 2
+
+
+async def test_shared_run_owns_its_session_and_outlives_a_cancelled_caller(monkeypatch):
+    sessions = []
+
+    class Session:
+        closed = False
+
+        async def __aenter__(self):
+            sessions.append(self)
+            return self
+
+        async def __aexit__(self, *exc):
+            self.closed = True
+
+    monkeypatch.setattr("src.core.single_flight.async_session", Session)
+    request_session = object()
+    release = asyncio.Event()
+
+    @coalesce()
+    async def generate(team_name: str, db=None):
+        assert db is not request_session and not db.closed
+        await release.wait()
+        assert not db.closed  # still open after the first caller went away
+        return team_name
+
+    first = asyncio.create_task(generate("Porto", db=request_session))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(generate("Porto", db=request_session))
+    await asyncio.sleep(0)
+    first.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+    release.set()
+    assert await second == "Porto"
+    assert len(sessions) == 1 and sessions[0].closed
+    single_flight.forget()
@@ -0,0 +1,45 @@
+"""
+Tests for tolerant structured output parsing
+"""
+import pytest
+from agents.exceptions import ModelBehaviorError
+
+from src.ai_agents.clash_quest_generator import ClashQuestList
+from src.tools.structured_output import ArrayItemStream, TolerantOutputSchema, parse_partial_json, structured_output_parses
+
+
+def test_parse_partial_json_tolerates_common_damage():
+    assert parse_partial_json('Here you go:\n[{"a": 1}, {"a": 2}] Enjoy!') == [{"a": 1}, {"a": 2}]
+    assert parse_partial_json('```json\n{"quests": [{"a": 1,}, {"a": 2},],}\n```') == {"quests": [{"a": 1}, {"a": 2}]}
+    assert parse_partial_json('{"text": "first line\nsecond } line"}') == {"text": "first line\nsecond } line"}
+
+    # Truncated: keep the complete elements, drop the one cut off
+    assert parse_partial_json('{"quests": [{"a": 1}, {"a": 2, "b": "cut') == {"quests": [{"a": 1}]}
+    assert parse_partial_json('{"title": "cut') is None
+    assert parse_partial_json("no json here") is None
+
+
+def test_tolerant_schema_repairs_and_counts():
+    schema = TolerantOutputSchema(ClashQuestList)
+    quest = '{"title": "⚔️ Roar", "description": "Complete this quest by tweeting.", "target_value": 2, "difficulty": "easy", "team_side": "%s"}'
+    before = {outcome: structured_output_parses.get(schema="ClashQuestList", outcome=outcome) for outcome in ("ok", "repaired", "failed")}
+
+    assert len(schema.validate_json('{"quests": [%s, %s]}' % (quest % "A", quest % "B")).quests) == 2
+    repaired = schema.validate_json('Sure!\n{"quests": [%s, %s' % (quest % "A", (quest % "B")[:40]))
+    assert [item.team_side for item in repaired.quests] == ["A"]
+    with pytest.raises(ModelBehaviorError):
+        schema.validate_json('{"quests": [{"title": "missing fields"}]}')
+
+    after = {outcome: structured_output_parses.get(schema="ClashQuestList", outcome=outcome) for outcome in ("ok", "repaired", "failed")}
+    assert {outcome: after[outcome] - before[outcome] for outcome in after} == {"ok": 1, "repaired": 1, "failed": 1}
+
+
+def test_array_item_stream_yields_items_as_they_complete():
+    text = 'Sure! {"quests": [{"title": "a } [\\" x", "tags": {"k": [1]}}, {"title": "b"}, {"title": "c'
+    stream = ArrayItemStream()
+    seen = []
+    for index in range(0, len(text), 3):
+        seen.extend((index, item["title"]) for item in stream.feed(text[index:index + 3]))
+
+    assert [title for _, title in seen] == ['a } [" x', "b"]
+    assert seen[0][0] < text.index('{"title": "b"')
@@ -0,0 +1,53 @@
+"""
+Tests for per-run tracing
+"""
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+
+from src.core.tracing import TracingMiddleware, span, start_run, trace_store, traced
+
+
+@traced()
+async def fetch_stage(delay: float):
+    with span("inner", delay=delay):
+        await asyncio.sleep(delay)
+
+
+async def test_spans_nest_across_concurrent_tasks():
+    with start_run("pipeline", team="Chelsea") as run:
+        await asyncio.gather(fetch_stage(0.01), fetch_stage(0.02))
+
+    names = [span.name for span in run.spans]
+    assert names.count("fetch_stage") == 2 and names.count("inner") == 2
+
+    breakdown = run.breakdown()
+    assert [stage["depth"] for stage in breakdown["stages"]] == [0, 1, 2, 1, 2]
+    assert breakdown["by_stage"]["inner"]["count"] == 2
+    assert trace_store.get(run.run_id) is run
+
+    spans = run.to_otlp()["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert all(item["traceId"] == run.run_id for item in spans)
+
+
+async def test_span_outside_run_is_noop():
+    with span("orphan") as current:
+        assert current is None
+
+
+async def test_middleware_sets_run_id_header():
+    app = FastAPI()
+
+    @app.post("/api/quests/new/clash")
+    async def clash():
+        await fetch_stage(0)
+        return {"ok": True}
+
+    app.add_middleware(TracingMiddleware)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post("/api/quests/new/clash")
+
+    run = trace_store.get(response.headers["x-run-id"])
+    assert run is not None
+    assert [span.name for span in run.spans] == ["POST /api/quests/new/clash", "fetch_stage", "inner"]
@@ -0,0 +1,68 @@
+const { ethers, network } = require("hardhat");
+const fs = require("fs");
+
+// Sends the setWinners batches of a winner snapshot written by the agent system
+// (POST /api/leaderboard/snapshot). The calldata is used as-is.
+//
+// Local run:
+//   npx hardhat node
+//   SNAPSHOT_FILE=snapshots/winners-<label>.json npx hardhat run scripts/set-winners.js --network localhost
+//
+// setWinners replaces the stored winner list, so every batch is a separate
+// payout round: with BATCH_INDEX set only that batch is sent, otherwise the
+// batches are sent in order and the last one stays on chain.
+
+async function main() {
+  const snapshotFile = process.env.SNAPSHOT_FILE;
+  if (!snapshotFile) {
+    throw new Error("Set SNAPSHOT_FILE to a winners-<label>.json snapshot");
+  }
+  const snapshot = JSON.parse(fs.readFileSync(snapshotFile, "utf8"));
+  console.log(`🏁 Snapshot ${snapshot.label}: ${snapshot.winners.length} winners, ${snapshot.batches.length} batches`);
+  console.log(`Merkle root: ${snapshot.merkle_root}`);
+
+  const [owner] = await ethers.getSigners();
+  let contractAddress = process.env.LEADERBOARD_REWARDS_ADDRESS;
+
+  if (!contractAddress && (network.name === "localhost" || network.name === "hardhat")) {
+    console.log("No LEADERBOARD_REWARDS_ADDRESS, deploying a local LeaderboardRewards...");
+    const LeaderboardRewards = await ethers.getContractFactory("LeaderboardRewards");
+    const deployed = await LeaderboardRewards.deploy();
+    await deployed.waitForDeployment();
+    contractAddress = await deployed.getAddress();
+  } else if (!contractAddress) {
+    contractAddress = JSON.parse(fs.readFileSync("deployment-info.json", "utf8")).contractAddress;
+  }
+
+  console.log(`LeaderboardRewards: ${contractAddress} (${network.name})`);
+  const leaderboardRewards = await ethers.getContractAt("LeaderboardRewards", contractAddress);
+
+  const batches = process.env.BATCH_INDEX !== undefined
+    ? [snapshot.batches[Number(process.env.BATCH_INDEX)]]
+    : snapshot.batches;
+
+  for (const batch of batches) {
+    const tx = await owner.sendTransaction({
+      to: contractAddress,
+      data: batch.calldata,
+      gasLimit: snapshot.gas_limit,
+    });
+    const receipt = await tx.wait();
+    console.log(`✅ Batch ${batch.index} (ranks ${batch.first_rank}-${batch.first_rank + batch.addresses.length - 1}): gas ${receipt.gasUsed} (estimated ${batch.estimated_gas})`);
+
+    const onChain = (await leaderboardRewards.getWinners()).map((address) => address.toLowerCase());
+    const expected = batch.addresses.map((address) => address.toLowerCase());
+    if (onChain.join(",") !== expected.join(",")) {
+      throw new Error(`Batch ${batch.index}: on-chain winners do not match the snapshot`);
+    }
+  }
+
+  console.log("Winners set successfully");
+}
+
+main()
+  .then(() => process.exit(0))
+  .catch((error) => {
+    console.error(error);
+    process.exit(1);
+  });
@@ -1,6 +1,8 @@
 import { NextResponse } from 'next/server';
 import { privy } from '../../../utils/privy-client';
 
+const BACKEND_URL = process.env.BACKEND_URL ?? 'http://localhost:8000';
+
 type PrivyMetadata = {
   [key: string]: string | number | boolean;
   xp: number;
@@ -28,8 +30,18 @@ export async function POST(request: Request) {
       xp: newXp,
     });
 
-    // Update mission status in your database here if needed
-    // TODO: Implement mission status update logic
+    // Record the completion in the backend XP ledger (feeds the leaderboard)
+    const address = user?.wallet?.address;
+    if (address) {
+      const ledgerResponse = await fetch(`${BACKEND_URL}/api/leaderboard/award`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ quest_id: missionId, address }),
+      });
+      if (!ledgerResponse.ok) {
+        console.error('XP ledger award failed:', ledgerResponse.status);
+      }
+    }
 
     return NextResponse.json({
       success: true,
@@ -1,6 +1,6 @@
 "use client"
 
-import React from 'react';
+import React, { useEffect, useState } from 'react';
 import Navbar from '../../components/Navbar';
 
 type LeaderboardEntry = {
@@ -10,15 +10,45 @@ type LeaderboardEntry = {
   completedMissions: number;
 };
 
-const leaderboardData: LeaderboardEntry[] = [
-  { rank: 1, address: "0x1234...5678", points: 1500, completedMissions: 12 },
-  { rank: 2, address: "0x8765...4321", points: 1200, completedMissions: 10 },
-  { rank: 3, address: "0x9876...1234", points: 1000, completedMissions: 8 },
-  { rank: 4, address: "0x4567...8901", points: 800, completedMissions: 7 },
-  { rank: 5, address: "0x2345...6789", points: 600, completedMissions: 5 },
-];
+type LeaderboardApiEntry = {
+  rank: number;
+  user_id: number;
+  address: string | null;
+  xp: number;
+  completed_quests: number;
+};
+
+const API_URL = process.env.NEXT_PUBLIC_API_URL ?? 'http://localhost:8000';
+const LEADERBOARD_URL = `${API_URL}/api/leaderboard/top?limit=50`;
+
+const shortenAddress = (address: string | null) =>
+  address && address.length > 10 ? `${address.slice(0, 6)}...${address.slice(-4)}` : address ?? 'Unknown';
 
 export default function LeaderboardPage() {
+  const [leaderboardData, setLeaderboardData] = useState<LeaderboardEntry[]>([]);
+
+  useEffect(() => {
+    const fetchLeaderboard = async () => {
+      try {
+        const response = await fetch(LEADERBOARD_URL);
+        if (!response.ok) {
+          throw new Error('Failed to fetch leaderboard');
+        }
+        const data = await response.json();
+        setLeaderboardData(data.entries.map((entry: LeaderboardApiEntry) => ({
+          rank: entry.rank,
+          address: shortenAddress(entry.address),
+          points: entry.xp,
+          completedMissions: entry.completed_quests,
+        })));
+      } catch (error) {
+        console.error('Error fetching leaderboard:', error);
+      }
+    };
+
+    fetchLeaderboard();
+  }, []);
+
   return (
     <div className="min-h-screen w-full relative bg-white">
       {/* Background Pattern */}
@@ -4,7 +4,7 @@ import React, { useState, useEffect } from 'react';
 import { usePrivy } from '@privy-io/react-auth';
 import { MissionType } from '../../types/mission';
 import Navbar from '../../components/Navbar';
-import MissionList from '../../components/MissionList';
+import MissionList, { MISSION_FEED_URL } from '../../components/MissionList';
 import MissionDetail from '../../components/MissionDetail';
 import ScrollingBanner from '../../components/ScrollingBanner';
 
@@ -51,12 +51,12 @@ export default function MainPage() {
   useEffect(() => {
     const fetchMissions = async () => {
       try {
-        const response = await fetch('https://cors-anywhere.herokuapp.com/http://89.117.55.209:3001/api/quests/?skip=0&limit=100'); //'http://localhost:8000/api/quests/?skip=0&limit=100'); //'https://89.117.55.209:3443/api/quests/?skip=0&limit=100');
+        const response = await fetch(MISSION_FEED_URL);
         if (!response.ok) {
           throw new Error('Failed to fetch missions');
         }
         const data = await response.json();
-        setMissions(data.quests);
+        setMissions(data.missions);
         setIsLoading(false);
       } catch (err) {
         setError(err instanceof Error ? err.message : 'An error occurred');
@@ -1,6 +1,9 @@
-import { useState } from 'react';
+import { useRef, useState } from 'react';
 import type { MissionType } from '@/types/mission';
 
+// Precomputed feed: served from a snapshot, never starts quest generation
+export const MISSION_FEED_URL = 'https://cors-anywhere.herokuapp.com/http://89.117.55.209:3001/api/feed/missions'; //'http://localhost:8000/api/feed/missions';
+
 interface MissionListProps {
   missions: MissionType[];
   onMissionClick: (mission: MissionType) => void;
@@ -9,18 +12,25 @@ interface MissionListProps {
 
 export default function MissionList({ missions, onMissionClick, onMissionsUpdate }: MissionListProps) {
   const [isLoading, setIsLoading] = useState(false);
+  const feedEtag = useRef<string | null>(null);
 
-  const handleGenerateMissions = async () => {
+  const handleRefreshMissions = async () => {
     setIsLoading(true);
     try {
-      const response = await fetch('https://cors-anywhere.herokuapp.com/http://89.117.55.209:3001/api/quests/generate/all'); //'http://localhost:8000/api/quests/generate/all');
+      const response = await fetch(MISSION_FEED_URL, {
+        headers: feedEtag.current ? { 'If-None-Match': feedEtag.current } : {},
+      });
+      if (response.status === 304) {
+        return;
+      }
       if (!response.ok) {
-        throw new Error('Failed to generate missions');
+        throw new Error('Failed to refresh missions');
       }
-      const newMissions = await response.json();
-      onMissionsUpdate(newMissions);
+      feedEtag.current = response.headers.get('ETag');
+      const feed = await response.json();
+      onMissionsUpdate(feed.missions);
     } catch (error) {
-      console.error('Error generating missions:', error);
+      console.error('Error refreshing missions:', error);
     } finally {
       setIsLoading(false);
     }
@@ -74,10 +84,10 @@ export default function MissionList({ missions, onMissionClick, onMissionsUpdate
       <div className="flex p-4 pb-8">
         <button 
           className={`bg-white text-black px-4 py-4 rounded-md hover:bg-gray-100 transition-colors ${isLoading ? 'opacity-50 cursor-not-allowed' : ''}`}
-          onClick={handleGenerateMissions}
+          onClick={handleRefreshMissions}
           disabled={isLoading}
         >
-          {isLoading ? 'Generating...' : 'Generate New Missions'}
+          {isLoading ? 'Refreshing...' : 'Refresh Missions'}
         </button>
       </div>
     </div>